@@ -5,15 +5,29 @@ and PRN files conform to an interface definition (CID).
 Additionally to the command line tool the functionality of cutplace is also
 accessible through a Python API.
 """
-import pkg_resources
+import sys
 
 from cutplace.errors import Location
 from cutplace.interface import Cid
 from cutplace.ranges import Range
 from cutplace.validio import Reader, Writer, validate, rows
 
-#: Package version information.
-__version__ = pkg_resources.get_distribution(__name__).version
+if sys.version_info >= (3, 8):
+    def __getattr__(name):
+        # Determine ``__version__`` on first access because reading the
+        # package metadata takes longer than importing all of cutplace.
+        if name != '__version__':
+            raise AttributeError('module %r has no attribute %r' % (__name__, name))
+        from importlib import metadata
+
+        result = metadata.version(__name__)
+        globals()['__version__'] = result
+        return result
+else:
+    import pkg_resources
+
+    #: Package version information.
+    __version__ = pkg_resources.get_distribution(__name__).version
 
 #: Public classes and functions.
 __all__ = [
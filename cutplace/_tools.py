@@ -21,9 +21,11 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import errno
+import importlib
 import logging
 import os
 import io
+import time
 import token
 import tokenize
 
@@ -41,6 +43,61 @@ LOG_LEVEL_NAME_TO_LEVEL_MAP = {
     "critical": logging.CRITICAL
 }
 
+#: Function returning the wall time in seconds, suitable to measure durations.
+wall_time = getattr(time, 'perf_counter', time.time)
+
+#: Function returning the CPU time of the current process in seconds.
+cpu_time = getattr(time, 'process_time', None) or time.clock
+
+
+class LazyModule(object):
+    """
+    Stand-in for the module ``name`` that imports it on the first access to
+    one of its attributes. This keeps ``import cutplace`` from spending time
+    on modules that are only needed for certain data formats or features.
+    Attributes are remembered once looked up so later accesses are as fast
+    as with the module itself.
+    """
+    def __init__(self, name):
+        assert name is not None
+        self._lazy_module_name = name
+        self._lazy_module = None
+
+    def __getattr__(self, name):
+        # Only called for attributes not already remembered by the proxy.
+        if name.startswith('_lazy_module'):
+            raise AttributeError(name)
+        if self._lazy_module is None:
+            self._lazy_module = importlib.import_module(self._lazy_module_name)
+        result = getattr(self._lazy_module, name)
+        setattr(self, name, result)
+        return result
+
+    def __repr__(self):
+        return '<lazy module %r%s>' % (
+            self._lazy_module_name, '' if self._lazy_module is not None else ' (not imported yet)')
+
+
+def is_module_available(name):
+    """
+    ``True`` if the top level module ``name`` can be imported, which is
+    determined without actually importing it.
+    """
+    assert name is not None
+    assert '.' not in name
+
+    if six.PY2:
+        import imp
+        try:
+            imp.find_module(name)
+            result = True
+        except ImportError:
+            result = False
+    else:
+        import importlib.util
+        result = importlib.util.find_spec(name) is not None
+    return result
+
 
 def mkdirs(folder):
     """
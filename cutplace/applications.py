@@ -24,25 +24,71 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import argparse
+import copy
+import json
 import logging
+import multiprocessing
+import signal
 import sys
 
+from cutplace import checks
 from cutplace import errors
-from cutplace import gui
 from cutplace import interface
 from cutplace import validio
 from cutplace import rowio
-from cutplace import sql
+from cutplace import _compat
 from cutplace import _tools
-from cutplace import __version__
 
 DEFAULT_CID_ENCODING = 'utf-8'
 DEFAULT_LOG_LEVEL = 'info'
 assert DEFAULT_LOG_LEVEL in _tools.LOG_LEVEL_NAME_TO_LEVEL_MAP
+DEFAULT_CACHE = 0
+DEFAULT_JOBS = 1
+DEFAULT_UNIQUE_KEYS = 0
 DEFAULT_VALIDATE_UNTIL = -1
 
 _log = logging.getLogger("cutplace")
 
+# Application used by worker processes to validate data files, set up by `_init_data_path_worker()`.
+_worker_cutplace_app = None
+
+
+class _LogRecordCollector(logging.Handler):
+    """
+    Handler that collects log records in :py:attr:`records` instead of
+    emitting them. Messages and exceptions are converted to text so the
+    records can be passed to another process.
+    """
+    def __init__(self):
+        super(_LogRecordCollector, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info is not None:
+            if record.exc_text is None:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+class _VersionAction(argparse.Action):
+    """
+    Same as argparse's ``action='version'`` but determines the version only
+    if :option:`--version` actually is specified because reading the package
+    metadata takes a while.
+    """
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None):
+        super(_VersionAction, self).__init__(
+            option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        import cutplace
+
+        print('%s %s' % (parser.prog, cutplace.__version__))
+        parser.exit()
+
 
 class CutplaceApp(object):
     """
@@ -56,12 +102,25 @@ class CutplaceApp(object):
         self.cid = None
         self.cid_encoding = DEFAULT_CID_ENCODING
         self.cid_path = None
+        self.cid_cache_folder = None
         self.is_gui = False
         self.is_create_sql = False
+        self.serve_address = None
         self.data_paths = None
         self.last_validation_was_ok = False
         self.all_validations_were_ok = True
         self.validate_until = None
+        self.jobs = DEFAULT_JOBS
+        self.validation_cache_size = None
+        self.max_unique_keys_in_memory = None
+        self.stats_path = None
+        #: Statistics about reading the CID as :py:class:`dict` with the
+        #: ``path`` of the CID and its ``wall_time`` and ``cpu_time``.
+        self.cid_statistics = None
+        #: Statistics of each validated data file as :py:class:`dict` with
+        #: the ``path`` of the data file, whether it is ``valid`` and the
+        #: items of :py:meth:`cutplace.validio.ValidationStatistics.as_dict`.
+        self.data_statistics = []
 
     def set_options(self, argv):
         """
@@ -70,25 +129,48 @@ class CutplaceApp(object):
         assert argv is not None
 
         description = 'validate DATA-FILE against interface description CID-FILE'
-        version = '%(prog)s ' + __version__
 
         parser = argparse.ArgumentParser(description=description)
+        parser.add_argument(
+            '--cache', metavar='COUNT', dest='validation_cache_size', default=DEFAULT_CACHE, type=int,
+            help='number of distinct values per field to remember validation results for; fields with too many '
+            'distinct values stop caching; 0=no caching (default: %d)' % DEFAULT_CACHE)
+        parser.add_argument(
+            '--cid-cache', metavar='FOLDER', dest='cid_cache_folder',
+            help='folder to cache compiled CIDs in for faster startup (default: no caching)')
         parser.add_argument(
             '--create', '-C', action='store_true', dest='is_create_sql',
             help='write SQL statement to create a table representing CID-FILE')
         parser.add_argument(
             '--gui', '--g', action='store_true', dest='is_gui',
             help='provide a graphical user interface to set CID-FILE and DATA-FILE')
+        parser.add_argument(
+            '--jobs', '-j', metavar='COUNT', dest='jobs', default=DEFAULT_JOBS, type=int,
+            help='number of processes to validate multiple data files or the shards of a single delimited or fixed '
+            'data file with (default: %d)' % DEFAULT_JOBS)
         parser.add_argument(
             '--log', metavar='LEVEL', choices=sorted(_tools.LOG_LEVEL_NAME_TO_LEVEL_MAP.keys()), dest='log_level',
             default=DEFAULT_LOG_LEVEL, help='set log level to LEVEL (default: %s)' % DEFAULT_LOG_LEVEL)
         parser.add_argument(
             '--plugins', '-P', metavar='FOLDER', dest='plugins_folder',
             help='folder to scan for plugins (default: no plugins)')
+        parser.add_argument(
+            '--serve', metavar='ADDRESS', dest='serve_address',
+            help='keep running and validate data files sent as JSON jobs by HTTP to ADDRESS, which is '
+            '[HOST:]PORT or the path of a Unix domain socket; use CID-FILE to read it before the first job')
+        parser.add_argument(
+            '--stats', metavar='FILE', dest='stats_path',
+            help='write performance statistics about validating each DATA-FILE as JSON to FILE, for example the '
+            'time spent reading, validating fields and performing checks and the number of rejected rows per '
+            'field and check (default: no statistics)')
+        parser.add_argument(
+            '--unique-keys', metavar='COUNT', dest='max_unique_keys_in_memory', default=DEFAULT_UNIQUE_KEYS,
+            type=int, help='maximum number of keys per IsUnique check to keep in memory before writing them to '
+            'temporary files; 0=no limit (default: %d)' % DEFAULT_UNIQUE_KEYS)
         parser.add_argument(
             '--until', '-u', metavar='COUNT', dest='validate_until', default=DEFAULT_VALIDATE_UNTIL, type=int,
             help='maximum number of rows to validate; -1=all, 0=none (default: %d)' % DEFAULT_VALIDATE_UNTIL)
-        parser.add_argument('--version', action='version', version=version)
+        parser.add_argument('--version', action=_VersionAction, help="show program's version number and exit")
         parser.add_argument(
             'cid_path', metavar='CID-FILE', nargs='?', help='file containing a cutplace interface definition (CID)')
         parser.add_argument(
@@ -106,19 +188,52 @@ class CutplaceApp(object):
                 self.validate_until = args.validate_until
             else:
                 parser.error('option --until is %d but must be at least -1' % args.validate_until)
+        if args.jobs >= 1:
+            self.jobs = args.jobs
+        else:
+            parser.error('option --jobs is %d but must be at least 1' % args.jobs)
+        if args.validation_cache_size >= 1:
+            self.validation_cache_size = args.validation_cache_size
+        elif args.validation_cache_size == 0:
+            self.validation_cache_size = None
+        else:
+            parser.error('option --cache is %d but must be at least 0' % args.validation_cache_size)
+        if args.max_unique_keys_in_memory >= 1:
+            self.max_unique_keys_in_memory = args.max_unique_keys_in_memory
+        elif args.max_unique_keys_in_memory == 0:
+            self.max_unique_keys_in_memory = None
+        else:
+            parser.error('option --unique-keys is %d but must be at least 0' % args.max_unique_keys_in_memory)
+        self.cid_cache_folder = args.cid_cache_folder
+        self.stats_path = args.stats_path
         if args.plugins_folder is not None:
             interface.import_plugins(args.plugins_folder)
         if args.data_paths is not None:
             self.data_paths = args.data_paths
+        if args.serve_address is not None:
+            # Import the server only when needed to not slow down other uses.
+            from cutplace import server
+            try:
+                self.serve_address = server.parsed_address(args.serve_address)
+            except ValueError as error:
+                parser.error('option --serve must specify a proper address: %s' % error)
+            if self.data_paths:
+                parser.error('with --serve, DATA-FILE must be sent as job instead of being specified')
+            if self.stats_path is not None:
+                parser.error('option --stats cannot be used with --serve')
         if args.is_gui:
+            # Import the GUI only when needed because tkinter takes a while to load.
+            from cutplace import gui
             if not gui.has_tk:
                 parser.error('tkinter package must be installed in order for --gui to work')
         if args.cid_path is not None:
             self.set_cid_from_path(args.cid_path)
-        elif not args.is_gui:
-            parser.error('CID_PATH or --gui must be specified')
+        elif not args.is_gui and (self.serve_address is None):
+            parser.error('CID_PATH, --gui or --serve must be specified')
 
-        self._log.debug('cutplace %s', __version__)
+        if self._log.isEnabledFor(logging.DEBUG):
+            import cutplace
+            self._log.debug('cutplace %s', cutplace.__version__)
         self._log.debug('arguments=%s', args)
 
     def set_cid_from_path(self, cid_path):
@@ -127,17 +242,29 @@ class CutplaceApp(object):
         application from ``cid_path``.
         """
         assert cid_path is not None
-        new_cid = interface.Cid()
         _log.info('read CID from "%s"', cid_path)
-        cid_rows = rowio.auto_rows(cid_path)
-        new_cid.read(cid_path, cid_rows)
+        wall_start_time = _tools.wall_time()
+        cpu_start_time = _tools.cpu_time()
+        if self.cid_cache_folder is not None:
+            new_cid = interface.cached_cid(cid_path, self.cid_cache_folder)
+        else:
+            new_cid = interface.Cid()
+            cid_rows = rowio.auto_rows(cid_path)
+            new_cid.read(cid_path, cid_rows)
         self.cid = new_cid
         self.cid_path = cid_path
+        self.cid_statistics = {
+            'path': cid_path,
+            'wall_time': _tools.wall_time() - wall_start_time,
+            'cpu_time': _tools.cpu_time() - cpu_start_time,
+        }
 
     def validate(self, data_path):
         """
         Validate data stored in file ``data_path`` and log possible errors
-        of type :py:exc:`cutplace.errors.CutplaceError` to the log.
+        of type :py:exc:`cutplace.errors.CutplaceError` to the log. If
+        :py:attr:`stats_path` is set, also add the statistics of the
+        validation to :py:attr:`data_statistics`.
         """
         assert data_path is not None
         assert self.cid is not None
@@ -145,13 +272,159 @@ class CutplaceApp(object):
 
         _log.info('validate "%s"', data_path)
 
+        for check in self.cid.check_map.values():
+            if isinstance(check, checks.IsUniqueCheck):
+                check.max_keys_in_memory = self.max_unique_keys_in_memory
+        reader = None
+        validation_was_ok = False
         try:
-            with validio.Reader(self.cid, data_path, validate_until=self.validate_until) as reader:
+            with validio.Reader(
+                    self.cid, data_path, validate_until=self.validate_until, workers=self.jobs,
+                    validation_cache_size=self.validation_cache_size,
+                    collect_statistics=self.stats_path is not None) as reader:
                 reader.validate_rows()
+            validation_was_ok = True
             _log.info('  accepted %d rows', reader.accepted_rows_count)
+            for field_name, validation_cache in reader.field_names_and_validation_caches:
+                lookup_count = validation_cache.hit_count + validation_cache.miss_count
+                if lookup_count:
+                    _log.info(
+                        '  found %d of %d values of field %s in cache (%.1f%%)%s',
+                        validation_cache.hit_count, lookup_count, _compat.text_repr(field_name),
+                        100.0 * validation_cache.hit_ratio,
+                        '' if validation_cache.is_active else ', stopped caching due too many distinct values')
         except errors.CutplaceError as error:
             _log.error('  %s', error)
             self.all_validations_were_ok = False
+        finally:
+            if (self.stats_path is not None) and (reader is not None):
+                data_statistics = reader.statistics.as_dict()
+                data_statistics.update(path=data_path, valid=validation_was_ok)
+                self.data_statistics.append(data_statistics)
+
+    def validate_all(self, data_paths):
+        """
+        Validate all data files in ``data_paths`` and log possible errors
+        the same way as :py:meth:`~.validate`. If there are multiple data
+        files and :py:attr:`jobs` is greater than 1, the data files are
+        validated concurrently by up to :py:attr:`jobs` processes, each of
+        them using its own copy of :py:attr:`cid`. Log messages are still
+        written for one data file after another in the same order as
+        ``data_paths``.
+
+        :raises EnvironmentError: if a data file cannot be read, in which \
+          case the remaining data files are not validated (or at least not \
+          logged) anymore
+        """
+        assert data_paths is not None
+
+        if (self.jobs >= 2) and (len(data_paths) >= 2):
+            worker_count = min(self.jobs, len(data_paths))
+            pool = multiprocessing.Pool(worker_count, _init_data_path_worker, (self, _log.level))
+            try:
+                for data_path, log_records, validation_was_ok, environment_error, data_statistics in pool.imap(
+                        _validated_data_path, data_paths):
+                    for log_record in log_records:
+                        logging.getLogger(log_record.name).handle(log_record)
+                    self.data_statistics.extend(data_statistics)
+                    if environment_error is not None:
+                        raise EnvironmentError("cannot read data file %r: %s" % (data_path, environment_error))
+                    if not validation_was_ok:
+                        self.all_validations_were_ok = False
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            for data_path in data_paths:
+                try:
+                    self.validate(data_path)
+                except (EnvironmentError, OSError) as error:
+                    raise EnvironmentError("cannot read data file %r: %s" % (data_path, error))
+
+    def write_statistics(self):
+        """
+        Write :py:attr:`cid_statistics` and :py:attr:`data_statistics` as
+        JSON object with the keys ``cid`` and ``data`` to
+        :py:attr:`stats_path`.
+        """
+        assert self.stats_path is not None
+
+        _log.info('write statistics to "%s"', self.stats_path)
+        statistics = {
+            'cid': self.cid_statistics,
+            'data': self.data_statistics,
+        }
+        try:
+            with open(self.stats_path, 'w') as stats_file:
+                json.dump(statistics, stats_file, indent=2, sort_keys=True)
+        except (EnvironmentError, OSError) as error:
+            raise EnvironmentError('cannot write statistics to %r: %s' % (self.stats_path, error))
+
+
+def _init_data_path_worker(cutplace_app, log_level):
+    global _worker_cutplace_app
+
+    _log.setLevel(log_level)
+    # Worker processes cannot start processes of their own to validate shards.
+    _worker_cutplace_app = copy.copy(cutplace_app)
+    _worker_cutplace_app.jobs = 1
+
+
+def _validated_data_path(data_path):
+    """
+    Result of validating ``data_path`` in a worker process as tuple
+    ``(data_path, log_records, validation_was_ok, environment_error, data_statistics)``.
+    """
+    assert _worker_cutplace_app is not None
+
+    # Collect the log records instead of emitting them so the main process
+    # can emit them in the same order as without multiple workers.
+    log_record_collector = _LogRecordCollector()
+    original_handlers = _log.handlers
+    was_propagating = _log.propagate
+    _log.handlers = [log_record_collector]
+    _log.propagate = False
+    environment_error = None
+    _worker_cutplace_app.all_validations_were_ok = True
+    _worker_cutplace_app.data_statistics = []
+    try:
+        _worker_cutplace_app.validate(data_path)
+    except (EnvironmentError, OSError) as error:
+        environment_error = error
+    finally:
+        _log.propagate = was_propagating
+        _log.handlers = original_handlers
+    return (
+        data_path, log_record_collector.records, _worker_cutplace_app.all_validations_were_ok, environment_error,
+        _worker_cutplace_app.data_statistics)
+
+
+def serve(cutplace_app):
+    """
+    Validate data files sent as jobs to
+    :py:attr:`~cutplace.applications.CutplaceApp.serve_address` until
+    interrupted by Ctrl+C or ``SIGTERM``.
+    """
+    assert cutplace_app.serve_address is not None
+
+    from cutplace import server
+
+    cid_paths = [cutplace_app.cid_path] if cutplace_app.cid_path is not None else []
+    with server.ValidationServer(
+            cutplace_app.serve_address, workers=cutplace_app.jobs, cid_paths=cid_paths,
+            validate_until=cutplace_app.validate_until,
+            validation_cache_size=cutplace_app.validation_cache_size,
+            max_unique_keys_in_memory=cutplace_app.max_unique_keys_in_memory,
+            cid_cache_folder=cutplace_app.cid_cache_folder) as validation_server:
+        # Stop on SIGTERM the same way as on Ctrl+C. Set up only now so the workers do not inherit it.
+        previous_sigterm_handler = signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            _log.info('serve validation jobs at %s with %d worker(s)', validation_server.address, cutplace_app.jobs)
+            validation_server.serve_forever()
+        except KeyboardInterrupt:
+            _log.info('stop serving validation jobs')
+        finally:
+            signal.signal(signal.SIGTERM, previous_sigterm_handler)
 
 
 def process(argv=None):
@@ -174,17 +447,21 @@ def process(argv=None):
     cutplace_app = CutplaceApp()
     cutplace_app.set_options(argv)
     if cutplace_app.is_gui:
+        from cutplace import gui
         data_path = cutplace_app.data_paths[0] if len(cutplace_app.data_paths) >= 1 else None
         gui.open_gui(cutplace_app.cid_path, data_path)
     elif cutplace_app.is_create_sql:
+        from cutplace import sql
         cid_reader = interface.Cid()
         sql.write_create(cutplace_app.cid_path, cid_reader)
+    elif cutplace_app.serve_address is not None:
+        serve(cutplace_app)
     elif cutplace_app.data_paths:
-        for data_path in cutplace_app.data_paths:
-            try:
-                cutplace_app.validate(data_path)
-            except (EnvironmentError, OSError) as error:
-                raise EnvironmentError("cannot read data file %r: %s" % (data_path, error))
+        try:
+            cutplace_app.validate_all(cutplace_app.data_paths)
+        finally:
+            if cutplace_app.stats_path is not None:
+                cutplace_app.write_statistics()
         if not cutplace_app.all_validations_were_ok:
             result = 1
     return result
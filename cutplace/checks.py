@@ -21,9 +21,14 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import copy
+import hashlib
+import math
+import struct
+import tempfile
 import tokenize
 
 import six
+from six.moves import cPickle as pickle
 
 from cutplace import fields
 from cutplace import errors
@@ -32,6 +37,18 @@ from cutplace import _tools
 from cutplace._compat import python_2_unicode_compatible
 
 
+#: Default for :py:attr:`cutplace.checks.IsUniqueCheck.max_keys_in_memory`;
+#: ``None`` means all keys remain in memory.
+DEFAULT_MAX_UNIQUE_KEYS_IN_MEMORY = None
+
+#: Default for :py:attr:`cutplace.checks.ApproximateDistinctCountCheck.relative_error`.
+DEFAULT_RELATIVE_DISTINCT_COUNT_ERROR = 0.01
+
+# Entry in the index of a run written by ``IsUniqueCheck``: the hash of a
+# key, its line and the offset and number of bytes of the pickled key.
+_UNIQUE_KEY_INDEX_ENTRY = struct.Struct('<qqQI')
+
+
 @python_2_unicode_compatible
 class AbstractCheck(object):
     """
@@ -159,15 +176,67 @@ class AbstractCheck(object):
         return self._field_names
 
 
+class _BloomFilter(object):
+    """
+    Bloom filter for the hashes of up to ``capacity`` keys, which tells
+    whether a key might have been added or certainly has not been added.
+    With 12 bits and 3 hashes per key, a key that has not been added is
+    mistaken for one that has in about 1% of the cases.
+    """
+    _BITS_PER_KEY = 12
+    _HASH_COUNT = 3
+
+    def __init__(self, capacity):
+        assert capacity >= 1
+
+        self.capacity = capacity
+        self._bit_count = capacity * _BloomFilter._BITS_PER_KEY
+        self._bits = bytearray((self._bit_count + 7) // 8)
+
+    def add(self, key_hash):
+        # Derive all bit indices from the two halves of the 64 bit hash.
+        bit_index = key_hash & 0xffffffff
+        bit_index_step = ((key_hash >> 32) & 0xffffffff) | 1
+        bit_count = self._bit_count
+        bits = self._bits
+        for _ in range(_BloomFilter._HASH_COUNT):
+            bit_index %= bit_count
+            bits[bit_index >> 3] |= 1 << (bit_index & 7)
+            bit_index += bit_index_step
+
+    def might_contain(self, key_hash):
+        bit_index = key_hash & 0xffffffff
+        bit_index_step = ((key_hash >> 32) & 0xffffffff) | 1
+        bit_count = self._bit_count
+        bits = self._bits
+        for _ in range(_BloomFilter._HASH_COUNT):
+            bit_index %= bit_count
+            if not bits[bit_index >> 3] & (1 << (bit_index & 7)):
+                return False
+            bit_index += bit_index_step
+        return True
+
+
 class IsUniqueCheck(AbstractCheck):
     """
     Check to ensure that all rows are unique concerning certain key fields.
+
+    If more than :py:attr:`~.max_keys_in_memory` keys have been collected,
+    they are written to a temporary file sorted by their hash, and
+    collecting starts over with an empty memory. A Bloom filter of the keys
+    in such files tells if a key might be a duplicate of one of them, in
+    which case the files are searched for the key to make sure and to find
+    its first occurrence.
     """
     def __init__(self, description, rule, available_field_names, location=None):
         super(IsUniqueCheck, self).__init__(description, rule, available_field_names, location)
 
         self._field_names_to_check = []
-        self._row_key_to_location_map = None
+        self._row_key_to_line_map = None
+        self._runs = []
+        self._run_keys_filter = None
+        self._run_key_count = 0
+        self._max_keys_in_memory = DEFAULT_MAX_UNIQUE_KEYS_IN_MEMORY
         self.reset()
 
         # Extract field names to check from rule.
@@ -204,18 +273,141 @@ class IsUniqueCheck(AbstractCheck):
             raise errors.InterfaceError(
                 "rule must contain at least one field name to check for uniqueness", self.location_of_rule)
 
+    @property
+    def max_keys_in_memory(self):
+        """
+        Maximum number of keys to keep in memory before writing them to a
+        temporary file, or ``None`` if all keys remain in memory.
+
+        Duplicates are detected right away by :py:meth:`~.check_row` in
+        either case and refer to the first occurrence of the key. Keys
+        written to a file still need about 12 bits of memory each for a
+        Bloom filter that avoids searching the files for most keys.
+        """
+        return self._max_keys_in_memory
+
+    @max_keys_in_memory.setter
+    def max_keys_in_memory(self, new_max_keys_in_memory):
+        assert (new_max_keys_in_memory is None) or (new_max_keys_in_memory >= 1)
+        self._max_keys_in_memory = new_max_keys_in_memory
+
     def reset(self):
-        self._row_key_to_location_map = {}
+        self.cleanup()
+        # Only remember the line of each key, which needs much less memory
+        # than a copy of the whole location.
+        self._row_key_to_line_map = {}
+
+    def cleanup(self):
+        for run_file, _, _ in self._runs:
+            run_file.close()
+        self._runs = []
+        self._run_keys_filter = None
+        self._run_key_count = 0
+
+    def _duplicate_error(self, row_key, location, see_also_location):
+        return errors.CheckError(
+            "values for %r must be unique: %s" % (self._field_names_to_check, row_key), location,
+            see_also_message="location of first occurrence", see_also_location=see_also_location)
 
     def check_row(self, field_name_to_value_map, location):
         row_key = tuple(field_name_to_value_map[field_name] for field_name in self._field_names_to_check)
-        see_also_location = self._row_key_to_location_map.get(row_key)
-        if see_also_location is not None:
-            raise errors.CheckError(
-                "values for %r must be unique: %s" % (self._field_names_to_check, row_key), location,
-                see_also_message="location of first occurrence", see_also_location=see_also_location)
+        see_also_line = self._row_key_to_line_map.get(row_key)
+        if (see_also_line is None) and self._runs:
+            row_key_hash = hash(row_key)
+            if self._run_keys_filter.might_contain(row_key_hash):
+                see_also_line = self._line_in_runs(row_key, row_key_hash)
+        if see_also_line is not None:
+            raise self._duplicate_error(row_key, location, location.copy_at_line(see_also_line))
         else:
-            self._row_key_to_location_map[row_key] = copy.copy(location)
+            self._row_key_to_line_map[row_key] = location.line
+            if (self._max_keys_in_memory is not None) \
+                    and (len(self._row_key_to_line_map) >= self._max_keys_in_memory):
+                self._write_run()
+
+    def _sorted_keys_in_memory(self):
+        """
+        Tuples ``(hash, line, row_key)`` for all keys in memory sorted by
+        their hash and line.
+        """
+        return sorted(
+            (hash(row_key), line, row_key) for row_key, line in six.iteritems(self._row_key_to_line_map))
+
+    def _write_run(self):
+        """
+        Write the keys in memory to a temporary file sorted by their hash
+        and forget about them.
+
+        The file contains the pickled keys followed by an index with an
+        entry of fixed size for each key, which allows to search for a hash
+        using bisection.
+        """
+        run_file = tempfile.TemporaryFile(prefix='cutplace_unique_')
+        pack_index_entry = _UNIQUE_KEY_INDEX_ENTRY.pack
+        index_entries = []
+        row_key_hashes = []
+        offset = 0
+        for row_key_hash, line, row_key in self._sorted_keys_in_memory():
+            pickled_row_key = pickle.dumps(row_key, pickle.HIGHEST_PROTOCOL)
+            run_file.write(pickled_row_key)
+            index_entries.append(pack_index_entry(row_key_hash, line, offset, len(pickled_row_key)))
+            row_key_hashes.append(row_key_hash)
+            offset += len(pickled_row_key)
+        run_file.write(b''.join(index_entries))
+        self._runs.append((run_file, offset, len(index_entries)))
+        self._run_key_count += len(index_entries)
+        if (self._run_keys_filter is None) or (self._run_key_count > self._run_keys_filter.capacity):
+            # Rebuild the filter with room for more keys, which includes the
+            # keys just written.
+            self._run_keys_filter = _BloomFilter(2 * self._run_key_count)
+            for run in self._runs:
+                for row_key_hash in self._run_key_hashes(run):
+                    self._run_keys_filter.add(row_key_hash)
+        else:
+            for row_key_hash in row_key_hashes:
+                self._run_keys_filter.add(row_key_hash)
+        self._row_key_to_line_map = {}
+
+    def _run_key_hashes(self, run):
+        """
+        The hashes of all keys in ``run``.
+        """
+        run_file, index_offset, key_count = run
+        run_file.seek(index_offset)
+        index = run_file.read(key_count * _UNIQUE_KEY_INDEX_ENTRY.size)
+        unpack_index_entry_from = _UNIQUE_KEY_INDEX_ENTRY.unpack_from
+        return [
+            unpack_index_entry_from(index, entry_offset)[0]
+            for entry_offset in range(0, len(index), _UNIQUE_KEY_INDEX_ENTRY.size)]
+
+    def _line_in_runs(self, row_key, row_key_hash):
+        """
+        The line where ``row_key`` with ``row_key_hash`` occurred according
+        to the runs, or ``None`` if it is not in any of them. Keys with the
+        same hash are compared to rule out hash collisions.
+        """
+        entry_size = _UNIQUE_KEY_INDEX_ENTRY.size
+        unpack_index_entry = _UNIQUE_KEY_INDEX_ENTRY.unpack
+        for run_file, index_offset, key_count in self._runs:
+            # Find the first index entry with a hash of at least `row_key_hash`.
+            lower_entry_index = 0
+            upper_entry_index = key_count
+            while lower_entry_index < upper_entry_index:
+                middle_entry_index = (lower_entry_index + upper_entry_index) // 2
+                run_file.seek(index_offset + middle_entry_index * entry_size)
+                if unpack_index_entry(run_file.read(entry_size))[0] < row_key_hash:
+                    lower_entry_index = middle_entry_index + 1
+                else:
+                    upper_entry_index = middle_entry_index
+            for entry_index in range(lower_entry_index, key_count):
+                run_file.seek(index_offset + entry_index * entry_size)
+                entry_hash, line, key_offset, key_size = unpack_index_entry(run_file.read(entry_size))
+                if entry_hash != row_key_hash:
+                    break
+                run_file.seek(key_offset)
+                if pickle.loads(run_file.read(key_size)) == row_key:
+                    # Each key is only stored at its first occurrence.
+                    return line
+        return None
 
 
 class DistinctCountCheck(AbstractCheck):
@@ -243,15 +435,29 @@ class DistinctCountCheck(AbstractCheck):
 
         # Build and test Python expression for validation.
         self._expression = DistinctCountCheck._COUNT_NAME + rule[column_where_field_name_ends:]
-        self._distinct_value_to_count_map = None
+        self._distinct_values = None
         self.reset()
         self._eval()
 
     def reset(self):
-        self._distinct_value_to_count_map = {}
+        # Only the number of distinct values matters, so a set is enough.
+        self._distinct_values = set()
+
+    def merge(self, other):
+        """
+        Include the distinct values found by ``other``, which has to be
+        a check of the same type and for the same field, for example one
+        that has processed another part of the data.
+        """
+        assert type(other) is type(self)
+        assert other._field_name_to_count == self._field_name_to_count
+        self._distinct_values.update(other._distinct_values)
 
     def _distinct_count(self):
-        return len(self._distinct_value_to_count_map)
+        return len(self._distinct_values)
+
+    def _distinct_count_text(self):
+        return '%d' % self._distinct_count()
 
     def _eval(self):
         """
@@ -270,13 +476,153 @@ class DistinctCountCheck(AbstractCheck):
         return result
 
     def check_row(self, field_name_to_value_map, location):
-        value = field_name_to_value_map[self._field_name_to_count]
-        try:
-            self._distinct_value_to_count_map[value] += 1
-        except KeyError:
-            self._distinct_value_to_count_map[value] = 1
+        self._distinct_values.add(field_name_to_value_map[self._field_name_to_count])
 
     def check_at_end(self, location):
         if not self._eval():
             raise errors.CheckError(
-                "distinct count is %d but check requires: %r" % (self._distinct_count(), self._expression), location)
+                "distinct count is %s but check requires: %r" % (self._distinct_count_text(), self._expression),
+                location)
+
+
+class _HyperLogLog(object):
+    """
+    HyperLogLog sketch to estimate the number of distinct values with a
+    standard error of about ``relative_error`` using a few kilobytes of
+    memory regardless of the number of values.
+
+    Values are hashed using a cryptographic hash instead of :py:func:`hash`
+    so sketches from different processes can be merged.
+    """
+    _MIN_PRECISION = 4
+    _MAX_PRECISION = 18
+
+    def __init__(self, relative_error):
+        assert 0 < relative_error < 1
+
+        ideal_register_count = (1.04 / relative_error) ** 2
+        self._precision = min(
+            max(int(math.ceil(math.log(ideal_register_count, 2))), _HyperLogLog._MIN_PRECISION),
+            _HyperLogLog._MAX_PRECISION)
+        self._register_count = 1 << self._precision
+        self._rank_bit_count = 64 - self._precision
+        self._rank_mask = (1 << self._rank_bit_count) - 1
+        self._registers = bytearray(self._register_count)
+
+    def add(self, value):
+        if not isinstance(value, six.text_type):
+            value = six.text_type(value)
+        value_hash = struct.unpack('<Q', hashlib.sha1(value.encode('utf-8')).digest()[:8])[0]
+        register_index = value_hash >> self._rank_bit_count
+        rank = self._rank_bit_count - (value_hash & self._rank_mask).bit_length() + 1
+        if rank > self._registers[register_index]:
+            self._registers[register_index] = rank
+
+    def merge(self, other):
+        assert other._precision == self._precision
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    def count(self):
+        register_count = self._register_count
+        if register_count == 16:
+            alpha = 0.673
+        elif register_count == 32:
+            alpha = 0.697
+        elif register_count == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / register_count)
+        estimate = alpha * register_count * register_count / sum(2.0 ** -rank for rank in self._registers)
+        if estimate <= 2.5 * register_count:
+            empty_register_count = self._registers.count(0)
+            if empty_register_count:
+                # Small range correction using linear counting.
+                estimate = register_count * math.log(register_count / empty_register_count)
+        return int(round(estimate))
+
+
+class ApproximateDistinctCountCheck(DistinctCountCheck):
+    """
+    Same as :py:class:`~cutplace.checks.DistinctCountCheck` but estimates
+    the number of different values using a HyperLogLog sketch, which needs
+    only a few kilobytes of memory regardless of the number of different
+    values. The estimate has a standard error of about
+    :py:attr:`~.relative_error`, which the rule can specify after the
+    expression separated by a comma, for example ``"branch_id < 5, 0.02"``.
+    """
+    def __init__(self, description, rule, available_field_names, location=None):
+        self._relative_error = DEFAULT_RELATIVE_DISTINCT_COUNT_ERROR
+        self._sketch = None
+        count_rule, relative_error_text = ApproximateDistinctCountCheck._count_rule_and_relative_error_text(rule)
+        super(ApproximateDistinctCountCheck, self).__init__(
+            description, count_rule, available_field_names, location)
+        if relative_error_text is not None:
+            try:
+                relative_error = float(relative_error_text)
+            except ValueError:
+                relative_error = None
+            if (relative_error is None) or not (0 < relative_error < 1):
+                raise errors.InterfaceError(
+                    "relative error is %s but must be a number greater than 0 and less than 1"
+                    % _compat.text_repr(relative_error_text), self.location_of_rule)
+            self.relative_error = relative_error
+
+    @staticmethod
+    def _count_rule_and_relative_error_text(rule):
+        """
+        Split ``rule`` at the last comma outside of parentheses, brackets
+        and braces into the rule for the count and the text of the relative
+        error, which is ``None`` if there is no such comma.
+        """
+        last_comma_column = None
+        nesting_level = 0
+        try:
+            for token_type, token_text, (_, column), _, _ in tokenize.generate_tokens(
+                    _compat.token_io_readline(rule)):
+                if token_type == tokenize.OP:
+                    if token_text in ('(', '[', '{'):
+                        nesting_level += 1
+                    elif token_text in (')', ']', '}'):
+                        nesting_level -= 1
+                    elif (token_text == ',') and (nesting_level == 0):
+                        last_comma_column = column
+        except tokenize.TokenError:
+            # Leave reporting the broken expression to DistinctCountCheck.
+            last_comma_column = None
+        if last_comma_column is None:
+            result = rule, None
+        else:
+            result = rule[:last_comma_column].rstrip(), rule[last_comma_column + 1:].strip()
+        return result
+
+    @property
+    def relative_error(self):
+        """
+        The standard error of the estimated number of different values
+        relative to the actual number, for example 0.01 for 1%. Smaller
+        errors need more memory. Changing it resets the check.
+        """
+        return self._relative_error
+
+    @relative_error.setter
+    def relative_error(self, new_relative_error):
+        assert 0 < new_relative_error < 1
+        self._relative_error = new_relative_error
+        self.reset()
+
+    def reset(self):
+        self._sketch = _HyperLogLog(self._relative_error)
+
+    def merge(self, other):
+        assert type(other) is type(self)
+        assert other._field_name_to_count == self._field_name_to_count
+        self._sketch.merge(other._sketch)
+
+    def check_row(self, field_name_to_value_map, location):
+        self._sketch.add(field_name_to_value_map[self._field_name_to_count])
+
+    def _distinct_count(self):
+        return self._sketch.count()
+
+    def _distinct_count_text(self):
+        return 'approximately %d' % self._distinct_count()
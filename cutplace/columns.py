@@ -0,0 +1,257 @@
+"""
+Validated data read into columns for analysis, for example with NumPy or
+pandas.
+
+Columns based on NumPy are only available if :py:mod:`numpy` is installed,
+and data frames also need :py:mod:`pandas`. You can check for their
+availability using :py:data:`cutplace.columns.has_numpy` and
+:py:data:`cutplace.columns.has_pandas`.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import array
+import calendar
+import collections
+import itertools
+
+from cutplace import fields
+from cutplace import validio
+from cutplace import _tools
+
+#: ``True`` if :py:mod:`numpy` is installed.
+has_numpy = _tools.is_module_available('numpy')
+#: ``True`` if :py:mod:`numpy` and :py:mod:`pandas` are installed.
+has_pandas = has_numpy and _tools.is_module_available('pandas')
+
+numpy = _tools.LazyModule('numpy')
+pandas = _tools.LazyModule('pandas')
+
+#: Container for columns: :py:class:`array.array` for integer fields and
+#: :py:class:`list` for all other fields.
+CONTAINER_ARRAY = 'array'
+#: Container for columns: :py:class:`numpy.ndarray`.
+CONTAINER_NUMPY = 'numpy'
+#: Container for all columns together: :py:class:`pandas.DataFrame`.
+CONTAINER_PANDAS = 'pandas'
+
+#: Default number of rows in a chunk produced by :py:func:`cutplace.columns.column_chunks`.
+DEFAULT_CHUNK_SIZE = 100000
+
+_CONTAINERS = (CONTAINER_ARRAY, CONTAINER_NUMPY, CONTAINER_PANDAS)
+
+# Value of a NumPy ``datetime64`` meaning "not a time", which represents
+# empty date and time fields.
+_NOT_A_TIME = -2 ** 63
+
+# Typecodes of :py:mod:`array` for signed integers with a certain number of
+# bytes. Python 2 has no ``'q'``, but ``'l'`` has 8 bytes on most 64 bit
+# platforms.
+_INT_BYTE_COUNT_TO_TYPECODE_MAP = {}
+for _typecode in 'bhilq':
+    try:
+        _INT_BYTE_COUNT_TO_TYPECODE_MAP.setdefault(array.array(_typecode).itemsize, _typecode)
+    except ValueError:
+        pass
+
+
+def column_type(field_format):
+    """
+    NumPy ``dtype`` name for the column containing the native values of
+    ``field_format`` derived from its
+    :py:meth:`~cutplace.fields.AbstractFieldFormat.sql_ansi_type`:
+
+    * ``'int8'``, ``'int16'``, ``'int32'`` or ``'int64'``: integer fields
+      that cannot be empty, using the smallest type that can hold all values
+      of their range.
+    * ``'datetime64[s]'``: date and time fields; empty values are ``NaT``.
+    * ``'object'``: all other fields, for example text or decimal fields,
+      and integer fields that can be empty or have an open range.
+
+    :param cutplace.fields.AbstractFieldFormat field_format: the field \
+      format to derive the column type from
+    :rtype: str
+    """
+    assert field_format is not None
+
+    result = 'object'
+    if isinstance(field_format, fields.IntegerFieldFormat):
+        valid_range = field_format.valid_range
+        # Integer fields with an open range have no ``sql_ansi_type()``.
+        has_limits = (valid_range.lower_limit is not None) and (valid_range.upper_limit is not None)
+        if has_limits and not field_format.is_allowed_to_be_empty:
+            ansi_type, limit = field_format.sql_ansi_type()
+            assert ansi_type == 'int', 'ansi_type=%r' % ansi_type
+            for bit_count in (8, 16, 32, 64):
+                if limit < 2 ** (bit_count - 1):
+                    result = 'int%d' % bit_count
+                    break
+    elif field_format.sql_ansi_type()[0] == 'date':
+        result = 'datetime64[s]'
+    return result
+
+
+def _seconds_since_epoch(time_struct):
+    return _NOT_A_TIME if time_struct is None else calendar.timegm(time_struct)
+
+
+class _ColumnBuffer(object):
+    """
+    Buffer to collect the native values of a column for a ``container``.
+    Integer and (except for :py:const:`CONTAINER_ARRAY`) date and time
+    values are collected in an :py:class:`array.array` of the same size as
+    the resulting column so they can be turned into a NumPy array without
+    copying them.
+    """
+    def __init__(self, column_type, container):
+        self._column_type = column_type
+        self._container = container
+        self._is_datetime = column_type.startswith('datetime64') and (container != CONTAINER_ARRAY)
+        if column_type.startswith('int'):
+            byte_count = int(column_type[3:]) // 8
+        elif self._is_datetime:
+            byte_count = 8
+        else:
+            byte_count = None
+        typecode = _INT_BYTE_COUNT_TO_TYPECODE_MAP.get(byte_count)
+        if typecode is not None:
+            self._values = array.array(typecode)
+        else:
+            self._values = []
+            if byte_count is not None:
+                # This platform has no array typecode of the needed size.
+                self._column_type = 'object'
+                self._is_datetime = False
+
+    def extend(self, values):
+        if self._is_datetime:
+            self._values.extend(map(_seconds_since_epoch, values))
+        else:
+            self._values.extend(values)
+
+    def column(self):
+        """
+        The collected values in a container according to ``container``. The
+        buffer must not be extended anymore after this.
+        """
+        if self._container == CONTAINER_ARRAY:
+            result = self._values
+        elif isinstance(self._values, array.array):
+            result = numpy.frombuffer(self._values, dtype=self._column_type)
+        else:
+            result = numpy.empty(len(self._values), dtype=object)
+            result[:] = self._values
+        return result
+
+
+def column_chunks(
+        cid_or_path, data_stream_or_path, chunk_size=DEFAULT_CHUNK_SIZE, container=CONTAINER_NUMPY, workers=1,
+        validation_cache_size=None):
+    """
+    Validated data read from ``data_stream_or_path`` in chunks of up to
+    ``chunk_size`` rows. Each chunk contains the native values of the fields
+    in columns, which depending on ``container`` is either a
+    :py:class:`pandas.DataFrame` or an ordered dictionary that maps the
+    field names to their column. The column types are derived from the
+    field formats using :py:func:`~cutplace.columns.column_type`.
+
+    The values are collected in buffers of the size of the resulting
+    columns, so apart from a batch of rows currently being validated, the
+    memory needed is close to the size of the columns. Checks at the end of
+    the data are validated after the last chunk has been produced.
+
+    :param chunk_size: maximum number of rows in a chunk; ``None`` means \
+      that all rows end up in a single chunk, which is produced even if \
+      there are no rows at all
+    :type chunk_size: int or None
+    :param str container: one of :py:const:`CONTAINER_ARRAY`, \
+      :py:const:`CONTAINER_NUMPY` or :py:const:`CONTAINER_PANDAS`
+    :param int workers: number of processes to validate the data as \
+      described with :py:class:`cutplace.validio.Reader`
+    :param validation_cache_size: number of distinct values to remember \
+      the validation results for as described with \
+      :py:class:`cutplace.validio.Reader`
+    :raises ImportError: if ``container`` needs :py:mod:`numpy` or \
+      :py:mod:`pandas` but they are not installed
+    :raises cutplace.errors.DataError: on broken data
+    """
+    assert (chunk_size is None) or (chunk_size >= 1)
+    assert container in _CONTAINERS, 'container=%r' % container
+
+    # Check the packages right away instead of only once the first chunk is requested.
+    if (container == CONTAINER_PANDAS) and not has_pandas:
+        raise ImportError('numpy and pandas packages must be installed in order to read columns into %r' % container)
+    if (container == CONTAINER_NUMPY) and not has_numpy:
+        raise ImportError('numpy package must be installed in order to read columns into %r' % container)
+    return _column_chunks(cid_or_path, data_stream_or_path, chunk_size, container, workers, validation_cache_size)
+
+
+def _column_chunks(cid_or_path, data_stream_or_path, chunk_size, container, workers, validation_cache_size):
+    with validio.Reader(
+            cid_or_path, data_stream_or_path, workers=workers,
+            validation_cache_size=validation_cache_size) as reader:
+        field_names = list(reader.cid.field_names)
+        column_types = [column_type(field_format) for field_format in reader.cid.field_formats]
+        if chunk_size is None:
+            batch_size = validio.DEFAULT_ROW_BATCH_SIZE
+        else:
+            batch_size = min(chunk_size, validio.DEFAULT_ROW_BATCH_SIZE)
+        native_rows = reader.native_rows(batch_size)
+        has_more_rows = True
+        while has_more_rows:
+            column_buffers = [_ColumnBuffer(type_of_column, container) for type_of_column in column_types]
+            row_count = 0
+            while (chunk_size is None) or (row_count < chunk_size):
+                if chunk_size is None:
+                    rows_to_read_count = batch_size
+                else:
+                    rows_to_read_count = min(batch_size, chunk_size - row_count)
+                batch = list(itertools.islice(native_rows, rows_to_read_count))
+                if not batch:
+                    has_more_rows = False
+                    break
+                for column_buffer, values in zip(column_buffers, zip(*batch)):
+                    column_buffer.extend(values)
+                row_count += len(batch)
+            if (row_count >= 1) or (chunk_size is None):
+                columns = collections.OrderedDict(
+                    (field_name, column_buffer.column())
+                    for field_name, column_buffer in zip(field_names, column_buffers))
+                if container == CONTAINER_PANDAS:
+                    yield pandas.DataFrame(columns, columns=field_names, copy=False)
+                else:
+                    yield columns
+
+
+def read_columns(
+        cid_or_path, data_stream_or_path, container=CONTAINER_NUMPY, workers=1, validation_cache_size=None):
+    """
+    All validated data read from ``data_stream_or_path`` in columns as
+    described with :py:func:`~cutplace.columns.column_chunks`.
+
+    :raises ImportError: if ``container`` needs :py:mod:`numpy` or \
+      :py:mod:`pandas` but they are not installed
+    :raises cutplace.errors.DataError: on broken data
+    """
+    result = None
+    for chunk in column_chunks(
+            cid_or_path, data_stream_or_path, None, container, workers, validation_cache_size):
+        assert result is None
+        result = chunk
+    return result
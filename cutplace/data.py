@@ -117,6 +117,7 @@ class DataFormat(object):
         self._is_valid = False
         self._allowed_characters = None
         self._encoding = 'cp1252'
+        self._cid_folder = None
         if self.format == FORMAT_DELIMITED:
             self._escape_character = '"'
             self._item_delimiter = ','
@@ -141,6 +142,19 @@ class DataFormat(object):
     def format(self):
         return self._format
 
+    @property
+    def cid_folder(self):
+        """
+        Folder of the CID declaring the data format, which relative paths
+        in the CID refer to, or ``None`` if the CID was not read from a
+        file, in which case relative paths refer to the current folder.
+        """
+        return self._cid_folder
+
+    @cid_folder.setter
+    def cid_folder(self, new_cid_folder):
+        self._cid_folder = new_cid_folder
+
     @property
     def encoding(self):
         return self._encoding
@@ -242,7 +256,7 @@ class DataFormat(object):
         assert self.format in (FORMAT_EXCEL, FORMAT_ODS)
         assert new_sheet >= 1
 
-        self._sheet == new_sheet
+        self._sheet = new_sheet
 
     @property
     def skip_initial_space(self):
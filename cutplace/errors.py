@@ -44,7 +44,13 @@ class Location(object):
     Location in an input file, consisting of ``line``, an optional ``column``
     (pointing at a single character) and an optional cell (pointing to a cell
     in a structured input such as CSV).
+
+    Locations use ``__slots__`` to reduce the memory and time needed to copy
+    them. To remember the location of many rows, consider only storing
+    their :py:attr:`~.line` and obtaining a full location using
+    :py:meth:`~.copy_at_line` when it is actually needed.
     """
+    __slots__ = ('file_path', '_line', '_column', '_cell', '_sheet', '_has_column', '_has_cell', '_has_sheet')
 
     def __init__(self, file_path, has_column=False, has_cell=False, has_sheet=False):
         """
@@ -102,8 +108,26 @@ class Location(object):
         self._has_sheet = has_sheet
 
     def __copy__(self):
-        result = type(self)(self.file_path)
-        result.__dict__.update(self.__dict__)
+        result = type(self).__new__(type(self))
+        result.file_path = self.file_path
+        result._line = self._line
+        result._column = self._column
+        result._cell = self._cell
+        result._sheet = self._sheet
+        result._has_column = self._has_column
+        result._has_cell = self._has_cell
+        result._has_sheet = self._has_sheet
+        return result
+
+    def copy_at_line(self, line):
+        """
+        A copy of this location pointing to the first cell or column of
+        ``line``.
+        """
+        result = copy.copy(self)
+        result.set_line(line)
+        result._column = 0
+        result._cell = 0
         return result
 
     def advance_column(self, amount=1):
@@ -124,6 +148,14 @@ class Location(object):
         assert self._has_cell
         self._cell = new_cell
 
+    def set_line(self, new_line):
+        """
+        Set the line to ``new_line`` without resetting column or cell.
+        """
+        assert new_line is not None
+        assert new_line >= 0
+        self._line = new_line
+
     def advance_line(self, amount=1):
         assert amount is not None
         assert amount > 0
@@ -321,6 +353,12 @@ class CutplaceError(Exception):
         """
         return self._cause
 
+    def __reduce__(self):
+        # HACK: ``Exception.__reduce__()`` does not work because ``args``
+        # contains ``self``, which results in an endless recursion.
+        return (type(self), (
+            self._message, self._location, self._see_also_message, self._see_also_location, self._cause))
+
     def prepend_message(self, prefix, new_location):
         """
         Add ``prefix`` and ``': '`` at the beginning of :py:attr:`message`
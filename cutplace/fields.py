@@ -20,13 +20,20 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
+import copy
+import datetime
 import decimal
 import fnmatch
+import functools
+import io
 import keyword
+import os
 import re
 import string
 import sys
 import time
+import token
 
 import six
 
@@ -46,6 +53,9 @@ _FieldFormatClassSuffix = "FieldFormat"
 _ASCII_LETTERS = set(string.ascii_letters)
 _ASCII_LETTERS_DIGITS_AND_UNDERSCORE = set(string.ascii_letters + string.digits + '_')
 
+#: Function to convert a text to a form suitable for caseless comparisons.
+_casefolded = getattr(six.text_type, 'casefold', six.text_type.lower)
+
 
 @python_2_unicode_compatible
 class AbstractFieldFormat(object):
@@ -75,6 +85,7 @@ class AbstractFieldFormat(object):
         self._data_format = data_format
         self._empty_value = empty_value
         self._example = None
+        self._validation_cache_size = None
 
     @property
     def field_name(self):
@@ -132,6 +143,16 @@ class AbstractFieldFormat(object):
         """
         return self._empty_value
 
+    @property
+    def external_paths(self):
+        """
+        Absolute paths of files other than the CID that have been read to
+        declare the field format, for example choices read from a file. By
+        default there are none. Field formats reading files must list them
+        here so cached CIDs are read again once they change.
+        """
+        return []
+
     def _get__example(self):
         return self._example
 
@@ -142,6 +163,27 @@ class AbstractFieldFormat(object):
 
     example = property(_get__example, _set_example, doc="Example value or ``None`` if no example is provided.")
 
+    @property
+    def validation_cache_size(self):
+        """
+        The number of distinct values for which the results of
+        :py:meth:`~cutplace.fields.AbstractFieldFormat.validated()` should
+        be remembered by a :py:class:`~cutplace.fields.ValidationCache`
+        while validating data, or ``None`` to not cache them (the default).
+
+        This pays off for fields with only a few distinct values that are
+        repeated many times, for example country codes or status flags.
+
+        :rtype: int or None
+        """
+        return self._validation_cache_size
+
+    @validation_cache_size.setter
+    def validation_cache_size(self, new_validation_cache_size):
+        assert (new_validation_cache_size is None) or (new_validation_cache_size >= 1), \
+            'new_validation_cache_size=%r' % new_validation_cache_size
+        self._validation_cache_size = new_validation_cache_size
+
     def sql_ansi_type(self):
         """
         A tuple describing the ANSI SQL type and it size, which has to be one
@@ -173,11 +215,13 @@ class AbstractFieldFormat(object):
         """
         valid_character_range = self.data_format.allowed_characters
         if valid_character_range is not None:
-            for character_column, character in enumerate(value, 1):
-                character_code = ord(character)
-                try:
-                    valid_character_range.validate("character", character_code)
-                except errors.RangeValueError:
+            invalid_character_regex = valid_character_range.invalid_character_regex()
+            if invalid_character_regex is not None:
+                invalid_character_match = invalid_character_regex.search(value)
+                if invalid_character_match is not None:
+                    character = invalid_character_match.group()
+                    character_code = ord(character)
+                    character_column = invalid_character_match.start() + 1
                     raise errors.FieldValueError(
                         "character %s (code point U+%04x, decimal %d) in field '%s' at column %d must be an allowed "
                         "character: %s" % (
@@ -218,7 +262,7 @@ class AbstractFieldFormat(object):
                             'fixed format field must have at most %d characters instead of %d: %s'
                             % (fixed_length, value_length, _compat.text_repr(value))
                         )
-                else:
+                elif not self.length.contains(len(value)):
                     self.length.validate(
                         "length of '%s' with value %s" % (self.field_name, _compat.text_repr(value)), len(value))
             except errors.RangeValueError as error:
@@ -262,20 +306,281 @@ class AbstractFieldFormat(object):
             result = self.empty_value
         return result
 
+    def _overrides(self, method_name):
+        """
+        ``True`` if the class of this field format overrides
+        ``method_name`` of :py:class:`AbstractFieldFormat`.
+        """
+        own_function = six.get_unbound_function(getattr(type(self), method_name))
+        base_function = six.get_unbound_function(getattr(AbstractFieldFormat, method_name))
+        return own_function is not base_function
+
+    def _defining_class(self, method_name):
+        """
+        The class in the hierarchy of this field format that defines the
+        method ``method_name`` used by it.
+        """
+        return next(cls for cls in type(self).__mro__ if method_name in cls.__dict__)
+
+    def _overrides_any_validate(self):
+        """
+        ``True`` if the class of this field format overrides
+        :py:meth:`~cutplace.fields.AbstractFieldFormat.validated()` or any of
+        the ``validate*()`` methods it calls.
+        """
+        return any(self._overrides(method_name) for method_name in (
+            'validated', 'validate_characters', 'validate_empty', 'validate_length'))
+
+    def compiled_validated(self):
+        """
+        A function that takes a single ``value`` and behaves exactly like
+        :py:meth:`~cutplace.fields.AbstractFieldFormat.validated()` but
+        with all decisions that do not depend on ``value`` already resolved,
+        for instance whether there are any allowed characters to check or
+        whether values have to be stripped because the data format is fixed.
+
+        This is intended to be called once before validating many values.
+        Consequently the result does not reflect later changes to the field
+        format or its data format.
+
+        Field formats that override any of the ``validate*()`` methods get
+        :py:meth:`~cutplace.fields.AbstractFieldFormat.validated()` as is.
+        """
+        if self._overrides_any_validate():
+            return self.validated
+
+        allowed_characters = self.data_format.allowed_characters
+        invalid_character_regex = allowed_characters.invalid_character_regex() if allowed_characters is not None \
+            else None
+        search_invalid_character = invalid_character_regex.search if invalid_character_regex is not None else None
+        validate_characters = self.validate_characters
+        validate_length = self.validate_length if self.length.items is not None else None
+        validated_value = self.validated_value
+        empty_value = self.empty_value
+        is_allowed_to_be_empty = self.is_allowed_to_be_empty
+        is_fixed = (self.data_format.format == data.FORMAT_FIXED)
+
+        def validated(value):
+            if (search_invalid_character is not None) and (search_invalid_character(value) is not None):
+                # Only collect the details for the error message in case there actually is an invalid character.
+                validate_characters(value)
+            if not value and not is_allowed_to_be_empty:
+                raise errors.FieldValueError("value must not be empty")
+            if validate_length is not None:
+                validate_length(value)
+            if is_fixed:
+                value = value.strip()
+            if value:
+                return validated_value(value)
+            return empty_value
+
+        return validated
+
+    def validated_values(self, values):
+        """
+        List of :py:meth:`~cutplace.fields.AbstractFieldFormat.validated_value()`
+        for each of the ``values``, with the same preconditions for each
+        value.
+
+        Field formats can override this to validate many values at once
+        more efficiently. The default implementation simply validates one
+        value after another.
+
+        :raises cutplace.errors.FieldValueError: if any of the ``values`` \
+          is broken; if several are, which of them is reported is unspecified
+        """
+        validated_value = self.validated_value
+        return [validated_value(value) for value in values]
+
+    def _validated_distinct_values(self, values):
+        """
+        Same as :py:meth:`~cutplace.fields.AbstractFieldFormat.validated_values()`
+        but validating each distinct value only once, which requires
+        results that can be shared.
+        """
+        validated_value = self.validated_value
+        value_to_result_map = dict((value, validated_value(value)) for value in set(values))
+        return [value_to_result_map[value] for value in values]
+
+    def validated_column(self, values):
+        """
+        List of :py:meth:`~cutplace.fields.AbstractFieldFormat.validated()`
+        for each of the ``values``, typically all values of this field in a
+        batch of rows. Checks that do not depend on a particular value are
+        prepared only once, and checks for allowed characters, empty values
+        and the length are performed on all values at once. The remaining
+        non empty values are passed on to
+        :py:meth:`~cutplace.fields.AbstractFieldFormat.validated_values()`.
+
+        :raises cutplace.errors.FieldValueError: if any of the ``values`` \
+          is broken; if several are, which of them is reported is unspecified
+        """
+        assert values is not None
+
+        if not self._overrides_any_validate():
+            has_broken_values = False
+            allowed_characters = self.data_format.allowed_characters
+            if allowed_characters is not None:
+                invalid_character_regex = allowed_characters.invalid_character_regex()
+                if invalid_character_regex is not None:
+                    # Concatenating all values is a lot faster than searching each of them.
+                    has_broken_values = invalid_character_regex.search(''.join(values)) is not None
+            if not has_broken_values and not self.is_allowed_to_be_empty:
+                has_broken_values = not all(values)
+            is_fixed = (self.data_format.format == data.FORMAT_FIXED)
+            if not has_broken_values and (self.length.items is not None) and values:
+                if is_fixed:
+                    has_broken_values = max(len(value) for value in values) > self.length.lower_limit
+                else:
+                    lengths = set(len(value) for value in values)
+                    if self.is_allowed_to_be_empty:
+                        lengths.discard(0)
+                    has_broken_values = not self.length.contains_all(list(lengths))
+            if not has_broken_values:
+                if is_fixed:
+                    values = [value.strip() for value in values]
+                if issubclass(self._defining_class('validated_values'), self._defining_class('validated_value')):
+                    validated_values = self.validated_values
+                else:
+                    # Do not skip a validated_value() that overrides the one validated_values() is based on.
+                    validated_values = functools.partial(AbstractFieldFormat.validated_values, self)
+                if all(values):
+                    result = validated_values(values)
+                else:
+                    non_empty_results = iter(validated_values([value for value in values if value]))
+                    empty_value = self.empty_value
+                    result = [next(non_empty_results) if value else empty_value for value in values]
+                return result
+
+        # Validate one value after another in order to find and report the broken one.
+        validated = self.validated
+        return [validated(value) for value in values]
+
     def __str__(self):
         return "%s(%s, %s, %s, %s)" % (
             self.__class__.__name__, _compat.text_repr(self.field_name), self.is_allowed_to_be_empty,
             _compat.text_repr(self.length), _compat.text_repr(self.rule))
 
 
+class ValidationCache(object):
+    """
+    Results of validating values with a field format, remembering at most
+    ``size`` distinct values and forgetting the ones remembered first in
+    order to make room for new ones. Values that were rejected are
+    remembered too, and validating them again raises a copy of the original
+    :py:exc:`~cutplace.errors.FieldValueError`.
+
+    An adaptive cache stops remembering values once it turns out that the
+    field has too many distinct values for the cache to be of any use.
+    """
+    #: Minimum ratio of values an adaptive cache has to find in order to keep caching.
+    MIN_ADAPTIVE_HIT_RATIO = 0.5
+
+    def __init__(self, size, is_adaptive=False):
+        assert size >= 1, 'size=%r' % size
+
+        self._size = size
+        self._is_adaptive = is_adaptive
+        self._is_active = True
+        self._value_to_result_and_error_map = collections.OrderedDict()
+        self.hit_count = 0
+        self.miss_count = 0
+
+    @property
+    def size(self):
+        """
+        The maximum number of distinct values to remember.
+        """
+        return self._size
+
+    @property
+    def is_adaptive(self):
+        return self._is_adaptive
+
+    @property
+    def is_active(self):
+        """
+        ``False`` if an adaptive cache gave up remembering values.
+        """
+        return self._is_active
+
+    @property
+    def hit_ratio(self):
+        """
+        The ratio of values validated so far that were found in the cache
+        as a number between 0 and 1.
+        """
+        lookup_count = self.hit_count + self.miss_count
+        return self.hit_count / lookup_count if lookup_count else 0.0
+
+    def _deactivate_if_useless(self):
+        lookup_count = self.hit_count + self.miss_count
+        if (lookup_count >= 4 * self._size) and (self.hit_ratio < ValidationCache.MIN_ADAPTIVE_HIT_RATIO):
+            self._is_active = False
+            self._value_to_result_and_error_map.clear()
+
+    def cached(self, validated):
+        """
+        A function that behaves like ``validated`` but looks up the result
+        for values validated before in the cache.
+        """
+        assert validated is not None
+
+        value_to_result_and_error_map = self._value_to_result_and_error_map
+        get_result_and_error = value_to_result_and_error_map.get
+        size = self._size
+        is_adaptive = self._is_adaptive
+
+        def validated_and_remembered(value):
+            self.miss_count += 1
+            try:
+                result_and_error = (validated(value), None)
+            except errors.FieldValueError as error:
+                result_and_error = (None, error)
+            if self._is_active:
+                if len(value_to_result_and_error_map) >= size:
+                    value_to_result_and_error_map.popitem(last=False)
+                    if is_adaptive:
+                        self._deactivate_if_useless()
+                if self._is_active:
+                    value_to_result_and_error_map[value] = result_and_error
+            return result_and_error
+
+        def cached_validated(value):
+            result_and_error = get_result_and_error(value)
+            if result_and_error is None:
+                result_and_error = validated_and_remembered(value)
+            else:
+                self.hit_count += 1
+            result, error = result_and_error
+            if error is not None:
+                raise copy.copy(error)
+            return result
+
+        return cached_validated
+
+
 class ChoiceFieldFormat(AbstractFieldFormat):
     """
     Field format accepting only values from a pool of choices.
+
+    The rule is a comma separated list of choices. Instead of a single
+    choice, ``@"path/to/choices.txt"`` reads all choices from a UTF-8 text
+    file with one choice per line, ignoring empty lines. Relative paths
+    refer to the folder of the CID, see
+    :py:attr:`cutplace.data.DataFormat.cid_folder`. In case the rule starts with
+    ``ignore_case:``, values can use any case, so for example ``"Red"``
+    matches the choice ``"red"``.
     """
+    #: Maximum number of choices to list in the error message for an improper value.
+    _MAX_CHOICES_TO_REPORT = 20
+
     def __init__(self, field_name, is_allowed_to_be_empty, length, rule, data_format):
         super(ChoiceFieldFormat, self).__init__(
             field_name, is_allowed_to_be_empty, length, rule, data_format, empty_value='')
         self.choices = []
+        self._choices_paths = []
+        self._ignore_case = False
 
         # Split rule into tokens, ignoring white space.
         tokens = _tools.tokenize_without_space(rule)
@@ -283,6 +588,16 @@ class ChoiceFieldFormat(AbstractFieldFormat):
         # Extract choices from rule tokens.
         previous_toky = None
         toky = next(tokens)
+        if (toky[0] == token.NAME) and (toky[1] == 'ignore_case'):
+            ignore_case_toky = toky
+            toky = next(tokens)
+            if (toky[0] == token.OP) and (toky[1] == ':'):
+                self._ignore_case = True
+                toky = next(tokens)
+            else:
+                # Handle a choice that just happens to be named "ignore_case".
+                tokens = iter([ignore_case_toky, toky] + list(tokens))
+                toky = next(tokens)
         while not _tools.is_eof_token(toky):
             if _tools.is_comma_token(toky):
                 # Handle comma after comma without choice.
@@ -292,11 +607,24 @@ class ChoiceFieldFormat(AbstractFieldFormat):
                     previous_toky_text = None
                 raise errors.InterfaceError(
                     "choice value must precede a comma (,) but found: %s" % _compat.text_repr(previous_toky_text))
-            choice = _tools.token_text(toky)
-            if not choice:
-                raise errors.InterfaceError(
-                    "choice field must be allowed to be empty instead of containing an empty choice")
-            self.choices.append(choice)
+            if (toky[0] == token.OP) and (toky[1] == '@'):
+                toky = next(tokens)
+                if toky[0] != token.STRING:
+                    raise errors.InterfaceError(
+                        "at sign (@) must be followed by the path to a file with choices in quotes but found: %s"
+                        % _compat.text_repr(toky[1]))
+                choice = _tools.token_text(toky)
+                choices_path = choice
+                if data_format.cid_folder is not None:
+                    choices_path = os.path.join(data_format.cid_folder, choices_path)
+                self.choices.extend(ChoiceFieldFormat._choices_read_from(choices_path))
+                self._choices_paths.append(os.path.abspath(choices_path))
+            else:
+                choice = _tools.token_text(toky)
+                if not choice:
+                    raise errors.InterfaceError(
+                        "choice field must be allowed to be empty instead of containing an empty choice")
+                self.choices.append(choice)
             toky = next(tokens)
             if not _tools.is_eof_token(toky):
                 if not _tools.is_comma_token(toky):
@@ -310,15 +638,60 @@ class ChoiceFieldFormat(AbstractFieldFormat):
         if not self.is_allowed_to_be_empty and not self.choices:
             raise errors.InterfaceError("choice field without any choices must be allowed to be empty")
 
+        # Index the choices for lookups in constant time while keeping `choices` in the declared order.
+        if self._ignore_case:
+            self._choice_set = frozenset(_casefolded(choice) for choice in self.choices)
+        else:
+            self._choice_set = frozenset(self.choices)
+
+    @staticmethod
+    def _choices_read_from(choices_path):
+        try:
+            with io.open(choices_path, 'r', encoding='utf-8-sig') as choices_file:
+                result = [line.strip() for line in choices_file]
+        except (EnvironmentError, UnicodeError) as error:
+            raise errors.InterfaceError(
+                'cannot read choices from %s: %s' % (_compat.text_repr(choices_path), error))
+        return [choice for choice in result if choice]
+
+    @property
+    def external_paths(self):
+        return list(self._choices_paths)
+
+    @property
+    def ignore_case(self):
+        """
+        ``True`` if values can use any case to match a choice.
+        """
+        return self._ignore_case
+
     def validated_value(self, value):
         assert value
 
-        if value not in self.choices:
+        if self._ignore_case:
+            is_valid_choice = _casefolded(value) in self._choice_set
+        else:
+            is_valid_choice = value in self._choice_set
+        if not is_valid_choice:
+            choice_count = len(self.choices)
+            if choice_count <= ChoiceFieldFormat._MAX_CHOICES_TO_REPORT:
+                raise errors.FieldValueError(
+                    "value is %s but must be one of: %s"
+                    % (_compat.text_repr(value), _tools.human_readable_list(self.choices)))
             raise errors.FieldValueError(
-                "value is %s but must be one of: %s"
-                % (_compat.text_repr(value), _tools.human_readable_list(self.choices)))
+                "value is %s but must be one of %d choices, for example: %s"
+                % (_compat.text_repr(value), choice_count,
+                   _tools.human_readable_list(self.choices[:ChoiceFieldFormat._MAX_CHOICES_TO_REPORT])))
         return value
 
+    def validated_values(self, values):
+        distinct_values = set(values)
+        if self._ignore_case:
+            distinct_values = set(_casefolded(value) for value in distinct_values)
+        if self._choice_set.issuperset(distinct_values):
+            return list(values)
+        return super(ChoiceFieldFormat, self).validated_values(values)
+
 
 class ConstantFieldFormat(AbstractFieldFormat):
     """
@@ -391,37 +764,71 @@ class DecimalFieldFormat(AbstractFieldFormat):
     def validated_value(self, value):
         assert value
 
-        translated_value = ""
-        found_decimal_separator = False
-        for character_to_process in value:
-            if character_to_process == self.decimal_separator:
-                if found_decimal_separator:
-                    raise errors.FieldValueError(
-                        "decimal field must contain only one decimal separator (%s): %s"
-                        % (_compat.text_repr(self.decimal_separator), _compat.text_repr(value)))
-                translated_value += "."
-                found_decimal_separator = True
-            elif self.thousands_separator and (character_to_process == self.thousands_separator):
-                if found_decimal_separator:
-                    raise errors.FieldValueError(
-                        "decimal field must contain thousands separator (%r) only before "
-                        "decimal separator (%r): %r "
-                        % (self.thousands_separator, self.decimal_separator, value))
+        decimal_separator_index = value.find(self.decimal_separator)
+        if decimal_separator_index != -1:
+            # Report whichever misplaced separator comes first.
+            after_decimal_separator_index = decimal_separator_index + 1
+            other_decimal_separator_index = value.find(self.decimal_separator, after_decimal_separator_index)
+            if self.thousands_separator:
+                misplaced_thousands_separator_index = value.find(
+                    self.thousands_separator, after_decimal_separator_index)
             else:
-                translated_value += character_to_process
-
+                misplaced_thousands_separator_index = -1
+            if (other_decimal_separator_index != -1) and (
+                    (misplaced_thousands_separator_index == -1)
+                    or (other_decimal_separator_index < misplaced_thousands_separator_index)):
+                raise errors.FieldValueError(
+                    "decimal field must contain only one decimal separator (%s): %s"
+                    % (_compat.text_repr(self.decimal_separator), _compat.text_repr(value)))
+            if misplaced_thousands_separator_index != -1:
+                raise errors.FieldValueError(
+                    "decimal field must contain thousands separator (%r) only before "
+                    "decimal separator (%r): %r "
+                    % (self.thousands_separator, self.decimal_separator, value))
+
+        # Turn the value into something that `decimal.Decimal` can parse.
+        translated_value = value
+        if self.thousands_separator:
+            translated_value = translated_value.replace(self.thousands_separator, '')
+        if self.decimal_separator != '.':
+            translated_value = translated_value.replace(self.decimal_separator, '.')
         try:
             result = decimal.Decimal(translated_value)
         except Exception as error:
             # TODO: limit exception handler to decimal exception or whatever decimal.Decimal raises.
             message = "value is %r but must be a decimal number: %s" % (value, error)
             raise errors.FieldValueError(message)
+        if result.is_nan():
+            raise errors.FieldValueError("value is %r but must be a decimal number" % value)
 
-        try:
-            self.valid_range.validate(self._field_name, result)
-        except errors.RangeValueError as error:
-            raise errors.FieldValueError(str(error))
+        if not self.valid_range.contains(result):
+            try:
+                self.valid_range.validate(self._field_name, result)
+            except errors.RangeValueError as error:
+                raise errors.FieldValueError(str(error))
+
+        return result
 
+    def validated_values(self, values):
+        result = None
+        thousands_separator = self.thousands_separator
+        if not thousands_separator or (thousands_separator not in ''.join(values)):
+            # Without thousands separators, decimal.Decimal rejects misplaced decimal separators too.
+            if self.decimal_separator != '.':
+                decimal_separator = self.decimal_separator
+                values_to_parse = [value.replace(decimal_separator, '.') for value in values]
+            else:
+                values_to_parse = values
+            try:
+                result = list(map(decimal.Decimal, values_to_parse))
+            except decimal.DecimalException:
+                result = None
+            if (result is not None) and (
+                    any(value.is_nan() for value in result) or not self.valid_range.contains_all(result)):
+                result = None
+        if result is None:
+            # Validate the values again one by one in order to report the broken one.
+            result = self._validated_distinct_values(values)
         return result
 
 
@@ -513,12 +920,22 @@ class IntegerFieldFormat(AbstractFieldFormat):
             value_as_int = int(value)
         except ValueError:
             raise errors.FieldValueError("value must be an integer number: %s" % _compat.text_repr(value))
-        try:
-            self.valid_range.validate("value", value_as_int)
-        except errors.RangeValueError as error:
-            raise errors.FieldValueError(six.text_type(error))
+        if not self.valid_range.contains(value_as_int):
+            try:
+                self.valid_range.validate("value", value_as_int)
+            except errors.RangeValueError as error:
+                raise errors.FieldValueError(six.text_type(error))
         return value_as_int
 
+    def validated_values(self, values):
+        try:
+            result = list(map(int, values))
+        except ValueError:
+            result = None
+        if (result is None) or not self.valid_range.contains_all(result):
+            result = super(IntegerFieldFormat, self).validated_values(values)
+        return result
+
 
 class DateTimeFieldFormat(AbstractFieldFormat):
     """
@@ -538,8 +955,20 @@ class DateTimeFieldFormat(AbstractFieldFormat):
     )
     _STRPTIME_TIME_DIRECTIVES = ('%H', '%M', '%S')
     _STRPTIME_DATE_DIRECTIVES = ('%d', '%m', '%y', '%Y')
+    # Directives the compiled parser can handle mapped to the number of digits they use.
+    _COMPILABLE_STRPTIME_DIRECTIVE_TO_DIGIT_COUNT_MAP = {
+        'd': 2,
+        'm': 2,
+        'Y': 4,
+        'y': 2,
+        'H': 2,
+        'M': 2,
+        'S': 2,
+    }
     _NO_EXCEL_TIME = ' 00:00:00'
     _NO_EXCEL_TIME_LENGTH = len(_NO_EXCEL_TIME)
+    #: Maximum number of recently validated values to remember.
+    PARSED_VALUE_CACHE_SIZE = 256
 
     def __init__(self, field_name, is_allowed_to_be_empty, length, rule, data_format, empty_value=None):
         super(DateTimeFieldFormat, self).__init__(
@@ -553,11 +982,60 @@ class DateTimeFieldFormat(AbstractFieldFormat):
             directive in self.strptime_format for directive in DateTimeFieldFormat._STRPTIME_TIME_DIRECTIVES)
         self._has_date = any(
             directive in self.strptime_format for directive in DateTimeFieldFormat._STRPTIME_DATE_DIRECTIVES)
+        self._compiled_regex, self._compiled_directives = _compiled_strptime_format(self.strptime_format)
+        self._value_to_parsed_time_map = collections.OrderedDict()
 
     def sql_ansi_type(self):
         # FIXME: Use timestamp for ANSI, date, datetime and time for others.
         return ('date',)
 
+    def _compiled_parsed_time(self, value):
+        """
+        The :py:class:`time.struct_time` for ``value`` using the compiled
+        parser, or ``None`` if it cannot handle ``value`` and
+        :py:func:`time.strptime` has to decide.
+        """
+        match = self._compiled_regex.match(value)
+        if match is None:
+            return None
+        year = None
+        month = 1
+        day = 1
+        hour = 0
+        minute = 0
+        second = 0
+        for directive, digits in zip(self._compiled_directives, match.groups()):
+            number = int(digits)
+            if directive == 'Y':
+                year = number
+            elif directive == 'y':
+                # Same as strptime: 00 to 68 are in the 21st century, 69 to 99 in the 20th.
+                year = number + (2000 if number <= 68 else 1900)
+            elif directive == 'm':
+                month = number
+            elif directive == 'd':
+                day = number
+            elif directive == 'H':
+                hour = number
+            elif directive == 'M':
+                minute = number
+            else:
+                assert directive == 'S', 'directive=%r' % directive
+                second = number
+        if (hour > 23) or (minute > 59) or (second > 61):
+            return None
+        if year is None:
+            if (month == 2) and (day == 29):
+                # Leave strptime's special treatment of leap days without year to strptime.
+                return None
+            year = 1900
+        try:
+            date = datetime.date(year, month, day)
+        except ValueError:
+            return None
+        day_of_year = date.toordinal() - datetime.date(year, 1, 1).toordinal() + 1
+        return time.struct_time((year, month, day, hour, minute, second, date.weekday(), day_of_year, -1))
+
     def validated_value(self, value):
         assert value
 
@@ -566,14 +1044,61 @@ class DateTimeFieldFormat(AbstractFieldFormat):
         else:
             value_to_validate = value
 
-        try:
-            result = time.strptime(value_to_validate, self.strptime_format)
-        except ValueError:
-            raise errors.FieldValueError(
-                "date must match format %s (%s) but is: %s (%s)"
-                % (self.human_readable_format, self.strptime_format, _compat.text_repr(value_to_validate), sys.exc_info()[1]))
+        value_to_parsed_time_map = self._value_to_parsed_time_map
+        result = value_to_parsed_time_map.pop(value_to_validate, None)
+        if result is None:
+            if self._compiled_regex is not None:
+                result = self._compiled_parsed_time(value_to_validate)
+            if result is None:
+                try:
+                    result = time.strptime(value_to_validate, self.strptime_format)
+                except ValueError:
+                    raise errors.FieldValueError(
+                        "date must match format %s (%s) but is: %s (%s)"
+                        % (self.human_readable_format, self.strptime_format, _compat.text_repr(value_to_validate),
+                           sys.exc_info()[1]))
+            if len(value_to_parsed_time_map) >= DateTimeFieldFormat.PARSED_VALUE_CACHE_SIZE:
+                value_to_parsed_time_map.popitem(last=False)
+        # Add the value again as most recently used.
+        value_to_parsed_time_map[value_to_validate] = result
         return result
 
+    def validated_values(self, values):
+        return self._validated_distinct_values(values)
+
+
+def _compiled_strptime_format(strptime_format):
+    """
+    Pair of a regular expression matching values of ``strptime_format``
+    that use all digits of each directive and the directives in the order
+    of their groups. If ``strptime_format`` contains directives that need
+    :py:func:`time.strptime` the result is ``(None, None)``.
+    """
+    assert strptime_format is not None
+
+    regex_parts = []
+    directives = []
+    format_index = 0
+    format_length = len(strptime_format)
+    while format_index < format_length:
+        format_character = strptime_format[format_index]
+        if format_character == '%':
+            directive = strptime_format[format_index + 1:format_index + 2]
+            if directive == '%':
+                regex_parts.append('%')
+            else:
+                digit_count = DateTimeFieldFormat._COMPILABLE_STRPTIME_DIRECTIVE_TO_DIGIT_COUNT_MAP.get(directive)
+                if (digit_count is None) or (directive in directives):
+                    return None, None
+                regex_parts.append('([0-9]{%d})' % digit_count)
+                directives.append(directive)
+            format_index += 2
+        else:
+            regex_parts.append(re.escape(format_character))
+            format_index += 1
+    regex_parts.append(r'\Z')
+    return re.compile(''.join(regex_parts)), tuple(directives)
+
 
 class RegExFieldFormat(AbstractFieldFormat):
     """
@@ -593,6 +1118,12 @@ class RegExFieldFormat(AbstractFieldFormat):
                 % (_compat.text_repr(value), _compat.text_repr(self.rule)))
         return value
 
+    def validated_values(self, values):
+        match = self.regex.match
+        if all(match(value) for value in set(values)):
+            return list(values)
+        return super(RegExFieldFormat, self).validated_values(values)
+
 
 class PatternFieldFormat(AbstractFieldFormat):
     """
@@ -613,6 +1144,12 @@ class PatternFieldFormat(AbstractFieldFormat):
                 % (_compat.text_repr(value), _compat.text_repr(self.rule), _compat.text_repr(self.pattern)))
         return value
 
+    def validated_values(self, values):
+        match = self.regex.match
+        if all(match(value) for value in set(values)):
+            return list(values)
+        return super(PatternFieldFormat, self).validated_values(values)
+
 
 class TextFieldFormat(AbstractFieldFormat):
     """
@@ -627,6 +1164,9 @@ class TextFieldFormat(AbstractFieldFormat):
         # TODO: Validate Text with rules like: 32..., a...z and so on.
         return value
 
+    def validated_values(self, values):
+        return list(values)
+
 
 def field_name_index(field_name_to_look_up, available_field_names, location):
     """
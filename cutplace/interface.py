@@ -21,13 +21,17 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import glob
+import hashlib
 import imp  # TODO: deprecated; with Python 3, use importlib.
 import inspect
 import io
 import logging
 import os.path
+import sys
+import tempfile
 
 import six
+from six.moves import cPickle as pickle
 
 from cutplace import data
 from cutplace import fields
@@ -62,6 +66,7 @@ class Cid(object):
         * an :py:class:`io.StringIO` containing a CSV
         """
         self._cid_path = cid_path
+        self._cid_folder = None
         self._data_format = None
         self._field_names = []
         self._field_formats = []
@@ -78,6 +83,20 @@ class Cid(object):
         else:
             self.set_location_to_caller()
 
+    def __getstate__(self):
+        # Leave out the classes available for field formats and checks;
+        # plugins imported more than once result in stale classes that
+        # cannot be pickled, and they are easy to collect again anyway.
+        result = dict(self.__dict__)
+        del result['_check_name_to_class_map']
+        del result['_field_format_name_to_class_map']
+        return result
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._check_name_to_class_map = Cid._create_name_to_class_map(checks.AbstractCheck)
+        self._field_format_name_to_class_map = Cid._create_name_to_class_map(fields.AbstractFieldFormat)
+
     def __str__(self):
         result = 'Cid('
         if self.data_format is not None:
@@ -123,6 +142,16 @@ class Cid(object):
         """
         return self._field_formats
 
+    @property
+    def external_paths(self):
+        """
+        Sorted list of the absolute paths of all files other than the CID
+        itself that have been read to declare it, see
+        :py:attr:`cutplace.fields.AbstractFieldFormat.external_paths`.
+        """
+        return sorted(set(
+            external_path for field_format in self._field_formats for external_path in field_format.external_paths))
+
     @property
     def check_names(self):
         """
@@ -153,7 +182,14 @@ class Cid(object):
         assert base_class is not None
         result = {}
         # Note: we use a ``set`` of sub classes to ignore duplicates.
-        for class_to_process in set(base_class.__subclasses__()):
+        classes_to_process = set()
+        base_classes_to_scan = [base_class]
+        while base_classes_to_scan:
+            for sub_class in base_classes_to_scan.pop().__subclasses__():
+                if sub_class not in classes_to_process:
+                    classes_to_process.add(sub_class)
+                    base_classes_to_scan.append(sub_class)
+        for class_to_process in classes_to_process:
             qualified_class_name = class_to_process.__name__
             plain_class_name = qualified_class_name.split('.')[-1]
             clashing_class = result.get(plain_class_name)
@@ -226,6 +262,7 @@ class Cid(object):
         lower_value = value.lower()
         if self._data_format is None:
             self._data_format = data.DataFormat(lower_value, self._location)
+            self._data_format.cid_folder = self._cid_folder
         else:
             self._data_format.set_property(name.lower(), value, self._location)
 
@@ -252,6 +289,8 @@ class Cid(object):
         self._location = errors.Location(cid_path, has_cell=True)
         if self._cid_path is None:
             self._cid_path = cid_path
+        if isinstance(cid_path, six.string_types):
+            self._cid_folder = os.path.dirname(os.path.abspath(cid_path))
         for row in rows:
             if row:
                 row_type = row[0].lower().strip()
@@ -557,6 +596,122 @@ def create_cid_from_string(cid_text):
     return result
 
 
+def _plugin_modules_signature():
+    """
+    Sorted list of tuples ``(module_path, modification_time)`` for all
+    modules outside of cutplace that declare field formats or checks,
+    typically plugins imported with :py:func:`import_plugins`.
+    """
+    result = set()
+    for base_class in (checks.AbstractCheck, fields.AbstractFieldFormat):
+        for class_to_inspect in Cid._create_name_to_class_map(base_class).values():
+            module_name = class_to_inspect.__module__
+            if module_name.split('.')[0] != 'cutplace':
+                module_path = getattr(sys.modules.get(module_name), '__file__', None)
+                if module_path is not None:
+                    try:
+                        modification_time = os.path.getmtime(module_path)
+                    except OSError:
+                        modification_time = None
+                    result.add((module_path, modification_time))
+    return sorted(result)
+
+
+def _external_paths_signature(external_paths):
+    """
+    List of tuples ``(path, modification_time, content_hash)`` for all
+    ``external_paths``; both are ``None`` for paths that cannot be read.
+    """
+    result = []
+    for external_path in external_paths:
+        try:
+            modification_time = os.path.getmtime(external_path)
+            with io.open(external_path, 'rb') as external_stream:
+                content_hash = hashlib.sha1(external_stream.read()).hexdigest()
+        except (EnvironmentError, OSError):
+            modification_time = None
+            content_hash = None
+        result.append((external_path, modification_time, content_hash))
+    return result
+
+
+def cached_cid(cid_path, cache_folder):
+    """
+    Same as ``Cid(cid_path)`` but stores the resulting
+    :py:class:`~cutplace.interface.Cid` in ``cache_folder`` so later calls
+    can simply load it instead of reading and compiling it again.
+
+    The cached CID is only used if the path, modification time and content
+    of ``cid_path`` and of other files read to declare it (see
+    :py:attr:`~cutplace.interface.Cid.external_paths`) are still the same
+    as well as the versions of cutplace and Python, and the plugins that
+    provide field formats and checks. Otherwise ``cid_path`` is read again
+    and replaces the cached CID.
+    Broken cache files are ignored.
+
+    :param str cache_folder: folder to store cached CIDs in, which is \
+      created if it does not exist yet
+    """
+    assert cid_path is not None
+    assert cache_folder is not None
+    # Import here because ``cutplace/__init__.py`` imports this module before setting the version.
+    from cutplace import __version__
+
+    absolute_cid_path = os.path.abspath(cid_path)
+    with io.open(cid_path, 'rb') as cid_stream:
+        cid_content = cid_stream.read()
+    cache_key = (
+        __version__, tuple(sys.version_info[:3]), absolute_cid_path, os.path.getmtime(cid_path),
+        hashlib.sha1(cid_content).hexdigest(), _plugin_modules_signature())
+    cache_path = os.path.join(
+        cache_folder, 'cid_%s.pickle' % hashlib.sha1(absolute_cid_path.encode('utf-8')).hexdigest())
+
+    result = None
+    try:
+        with io.open(cache_path, 'rb') as cache_stream:
+            if pickle.load(cache_stream) == cache_key:
+                # Files read by the CID are only known once it has been read.
+                external_paths_signature = pickle.load(cache_stream)
+                current_external_paths = [external_path for external_path, _, _ in external_paths_signature]
+                if external_paths_signature == _external_paths_signature(current_external_paths):
+                    result = pickle.load(cache_stream)
+                    _log.debug('read cached CID from "%s"', cache_path)
+    except (EnvironmentError, OSError):
+        pass  # No cached CID yet.
+    except Exception as error:
+        _log.debug('ignoring broken cached CID "%s": %s', cache_path, error)
+
+    if result is None:
+        result = Cid(cid_path)
+        if not os.path.exists(cache_folder):
+            os.makedirs(cache_folder)
+        # Write to a temporary file first so concurrent processes never
+        # read a partially written cache file.
+        with tempfile.NamedTemporaryFile(dir=cache_folder, prefix='cid_', suffix='.tmp', delete=False) as temp_stream:
+            try:
+                pickle.dump(cache_key, temp_stream, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(
+                    _external_paths_signature(result.external_paths), temp_stream, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(result, temp_stream, pickle.HIGHEST_PROTOCOL)
+                is_cacheable = True
+            except Exception as error:
+                # For example a plugin could use something that cannot be pickled.
+                _log.warning('cannot cache CID "%s": %s', cid_path, error)
+                is_cacheable = False
+        if is_cacheable:
+            if six.PY2:
+                if os.path.exists(cache_path):
+                    # Python 2 has no ``os.replace()`` and ``os.rename()`` fails on Windows if the target exists.
+                    os.remove(cache_path)
+                os.rename(temp_stream.name, cache_path)
+            else:
+                os.replace(temp_stream.name, cache_path)
+            _log.debug('wrote cached CID to "%s"', cache_path)
+        else:
+            os.remove(temp_stream.name)
+    return result
+
+
 def field_names_and_lengths(fixed_cid):
     """
     List of tuples ``(field_name, field_length)`` for all field formats in
@@ -22,8 +22,11 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import token
+import bisect
 import decimal
+import re
+import sys
+import token
 
 import six
 
@@ -32,6 +35,11 @@ from cutplace import _compat
 from cutplace import _tools
 from cutplace._compat import python_2_unicode_compatible
 
+#: ``True`` if :py:mod:`numpy` is installed. It is only imported once a
+#: range actually has to validate enough values to benefit from it.
+has_numpy = _tools.is_module_available('numpy')
+numpy = _tools.LazyModule('numpy')
+
 #: '...' as single character.
 ELLIPSIS = '\u2026'
 
@@ -40,6 +48,14 @@ MIN_INTEGER = -2 ** 31
 
 DEFAULT_INTEGER_RANGE_TEXT = '%d...%d' % (MIN_INTEGER, MAX_INTEGER)
 
+#: Minimum number of values for :py:meth:`cutplace.ranges.Range.contains_all()`
+#: to check them using NumPy (if it is installed).
+MIN_NUMPY_VALUE_COUNT = 1000
+
+# Limits of values NumPy can check as ``int64``.
+_MIN_INT64 = -2 ** 63
+_MAX_INT64 = 2 ** 63 - 1
+
 #: Text to describe the upper limit of the default decimal range. 31 digits
 #: are the maximum scale of IBM DB2 decimals, which seems to be the smallest
 #: limit for currently practically relevant databases. Using 12 of these digits
@@ -194,6 +210,8 @@ class Range(object):
         """
         assert default is None or (default.strip() != ''), "default=%r" % default
 
+        self._invalid_character_regex = None
+
         # Find out if a `description` has been specified and if not, use optional `default` instead.
         has_description = (description is not None) and (description.strip() != '')
         if not has_description and default is not None:
@@ -329,6 +347,8 @@ class Range(object):
                 elif (self._upper_limit is not None) and (upper_item > self._upper_limit):
                     self._upper_limit = upper_item
 
+        self._compile_items()
+
     @property
     def description(self):
         """
@@ -444,6 +464,193 @@ class Range(object):
                 result = (value >= lower) and (value <= upper)
         return result
 
+    def _compile_items(self):
+        """
+        Prepare :py:attr:`~cutplace.ranges.Range.items` for
+        :py:meth:`~cutplace.ranges.Range.contains()`: items with an open
+        limit are represented by a single bound; the others are sorted and
+        merged into bounds that can be searched with :py:mod:`bisect`.
+        """
+        self._open_lower_item_upper = None
+        self._open_upper_item_lower = None
+        self._item_lowers = []
+        self._item_uppers = []
+        if self._items is not None:
+            for lower, upper in self._items:
+                if lower is None:
+                    if (self._open_lower_item_upper is None) or (upper > self._open_lower_item_upper):
+                        self._open_lower_item_upper = upper
+                elif upper is None:
+                    if (self._open_upper_item_lower is None) or (lower < self._open_upper_item_lower):
+                        self._open_upper_item_lower = lower
+            # Integer items that are next to each other can be merged too, for example 1...3 and 4...6.
+            adjacent_distance = 1 if not isinstance(self, DecimalRange) else 0
+            for lower, upper in sorted(item for item in self._items if None not in item):
+                if self._item_uppers and (lower <= self._item_uppers[-1] + adjacent_distance):
+                    self._item_uppers[-1] = max(upper, self._item_uppers[-1])
+                else:
+                    self._item_lowers.append(lower)
+                    self._item_uppers.append(upper)
+        self._item_count = len(self._item_lowers)
+        if self._item_count == 1:
+            self._single_item_lower = self._item_lowers[0]
+            self._single_item_upper = self._item_uppers[0]
+        self._limits = self._item_lowers + self._item_uppers + [
+            limit for limit in (self._open_lower_item_upper, self._open_upper_item_lower) if limit is not None]
+        self._can_numpy_represent_limits = self._can_numpy_represent(self._limits)
+        # Limits as NumPy arrays and scalars, prepared by `_numpy_contains_each()` on demand.
+        self._numpy_limits = None
+        self._numpy_item_lowers = None
+        self._numpy_item_uppers = None
+        self._numpy_open_lower_item_upper = None
+        self._numpy_open_upper_item_lower = None
+        has_open_item = (self._open_lower_item_upper is not None) or (self._open_upper_item_lower is not None)
+        has_both_open_items = (self._open_lower_item_upper is not None) and (self._open_upper_item_lower is not None)
+        self._is_single_interval = \
+            ((self._item_count == 1) and not has_open_item) or ((self._item_count == 0) and not has_both_open_items)
+
+    def contains(self, value):
+        """
+        ``True`` if ``value`` is within the range. Unlike
+        :py:meth:`~cutplace.ranges.Range.validate()` this does not convert
+        ``value`` or prepare an error message, and the items are searched
+        in logarithmic time.
+
+        :param value: the value to check, which must be of the same type \
+          as the limits of the range, for example :py:class:`int` for \
+          :py:class:`~cutplace.ranges.Range`
+        """
+        assert value is not None
+
+        if self._items is None:
+            result = True
+        elif (self._open_lower_item_upper is not None) and (value <= self._open_lower_item_upper):
+            result = True
+        elif (self._open_upper_item_lower is not None) and (value >= self._open_upper_item_lower):
+            result = True
+        elif self._item_count == 1:
+            result = self._single_item_lower <= value <= self._single_item_upper
+        else:
+            item_index = bisect.bisect_right(self._item_lowers, value) - 1
+            result = (item_index >= 0) and (value <= self._item_uppers[item_index])
+        return result
+
+    def contains_all(self, values):
+        """
+        ``True`` if all ``values`` are within the range, which is the same
+        as calling :py:meth:`~cutplace.ranges.Range.contains()` for each of
+        them. If NumPy is installed, at least :py:const:`MIN_NUMPY_VALUE_COUNT`
+        values are checked all at once. Without NumPy, ranges without gaps
+        only have to check the smallest and largest value.
+        """
+        assert values is not None
+
+        result = None
+        if (self._items is None) or not values:
+            result = True
+        elif self._can_use_numpy_for(values):
+            result = self._numpy_contains_all(values)
+        if result is None:
+            if self._is_single_interval:
+                result = self.contains(min(values)) and self.contains(max(values))
+            else:
+                contains = self.contains
+                result = all(contains(value) for value in values)
+        return result
+
+    def _can_use_numpy_for(self, values):
+        """
+        ``True`` if NumPy is installed, can represent the limits of the
+        range and there are enough ``values`` to make up for copying them
+        into an array.
+        """
+        return has_numpy and (len(values) >= MIN_NUMPY_VALUE_COUNT) and self._can_numpy_represent_limits
+
+    def _can_numpy_represent(self, limits):
+        """
+        ``True`` if :py:meth:`~cutplace.ranges.Range._numpy_array()` can
+        represent all ``limits`` exactly.
+        """
+        return all(_MIN_INT64 <= limit <= _MAX_INT64 for limit in limits)
+
+    def _numpy_array(self, values):
+        """
+        ``values`` as NumPy array of ``int64``.
+
+        :raises OverflowError: if any of the ``values`` is beyond ``int64``
+        """
+        return numpy.array(values, dtype=numpy.int64)
+
+    def _numpy_contains_all(self, values):
+        """
+        Same as :py:meth:`~cutplace.ranges.Range.contains_all()` but
+        checking all ``values`` at once, or ``None`` if
+        :py:meth:`~cutplace.ranges.Range._numpy_array()` cannot represent
+        them.
+        """
+        try:
+            numpy_values = self._numpy_array(values)
+        except (OverflowError, ValueError):
+            result = None
+        else:
+            result = bool(self._numpy_contains_each(values, numpy_values).all())
+        return result
+
+    def _numpy_contains_each(self, values, numpy_values):
+        """
+        Array of ``bool`` telling for each of the ``values``, which
+        ``numpy_values`` represents, if it is within the range. Items are
+        checked using masks derived from their limits.
+        """
+        if self._numpy_limits is None:
+            numpy_limits = self._numpy_array(self._limits)
+            self._numpy_item_lowers = numpy_limits[:self._item_count]
+            self._numpy_item_uppers = numpy_limits[self._item_count:2 * self._item_count]
+            open_limit_index = 2 * self._item_count
+            if self._open_lower_item_upper is not None:
+                self._numpy_open_lower_item_upper = numpy_limits[open_limit_index]
+                open_limit_index += 1
+            if self._open_upper_item_lower is not None:
+                self._numpy_open_upper_item_lower = numpy_limits[open_limit_index]
+            self._numpy_limits = numpy_limits
+        if self._item_count == 1:
+            result = (numpy_values >= self._numpy_item_lowers[0]) & (numpy_values <= self._numpy_item_uppers[0])
+        elif self._item_count >= 2:
+            item_indices = numpy.searchsorted(self._numpy_item_lowers, numpy_values, side='right') - 1
+            result = (item_indices >= 0) & (numpy_values <= self._numpy_item_uppers[item_indices])
+        else:
+            result = numpy.zeros(len(numpy_values), dtype=bool)
+        if self._numpy_open_lower_item_upper is not None:
+            result |= numpy_values <= self._numpy_open_lower_item_upper
+        if self._numpy_open_upper_item_lower is not None:
+            result |= numpy_values >= self._numpy_open_upper_item_lower
+        return result
+
+    def invalid_character_regex(self):
+        """
+        Compiled regular expression that matches any character whose code is
+        not within the range, or ``None`` if the range has no items and
+        consequently all characters are valid. This allows to check all
+        characters of a text with a single call to ``search()`` instead of
+        calling :py:meth:`~cutplace.ranges.Range.validate()` for each of
+        them. The regular expression is compiled only once per range.
+        """
+        if (self._invalid_character_regex is None) and (self._items is not None):
+            character_class = ''
+            for lower, upper in self._items:
+                lower = 0 if lower is None else max(0, lower)
+                upper = sys.maxunicode if upper is None else min(sys.maxunicode, upper)
+                if lower <= upper:
+                    character_class += re.escape(six.unichr(lower))
+                    if lower < upper:
+                        character_class += '-' + re.escape(six.unichr(upper))
+            if character_class:
+                pattern = '[^' + character_class + ']'
+            else:
+                pattern = '(?s).'
+            self._invalid_character_regex = re.compile(pattern, re.UNICODE)
+        return self._invalid_character_regex
+
     def validate(self, name, value, location=None):
         """
         Validate that ``value`` is within the specified range.
@@ -459,24 +666,9 @@ class Range(object):
         assert name
         assert value is not None
 
-        if self._items is not None:
-            is_valid = False
-            item_index = 0
-            while not is_valid and item_index < len(self._items):
-                lower, upper = self._items[item_index]
-                if lower is None:
-                    assert upper is not None
-                    if value <= upper:
-                        is_valid = True
-                elif upper is None:
-                    if value >= lower:
-                        is_valid = True
-                elif (value >= lower) and (value <= upper):
-                    is_valid = True
-                item_index += 1
-            if not is_valid:
-                raise errors.RangeValueError(
-                    "%s is %r but must be within range: %s" % (name, value, self), location)
+        if not self.contains(value):
+            raise errors.RangeValueError(
+                "%s is %r but must be within range: %s" % (name, value, self), location)
 
 
 @python_2_unicode_compatible
@@ -656,10 +848,36 @@ class DecimalRange(Range):
                 elif (self._upper_limit is not None) and (upper_item > self._upper_limit):
                     self._upper_limit = upper_item
 
+        self._compile_items()
+
     @property
     def precision(self):
         return self._precision
 
+    def _can_use_numpy_for(self, values):
+        # Converting decimals to floats takes longer than finding the smallest and largest of them.
+        return not self._is_single_interval and super(DecimalRange, self)._can_use_numpy_for(values)
+
+    def _can_numpy_represent(self, limits):
+        # Values beyond float64 become infinite, which still compares correctly.
+        return True
+
+    def _numpy_array(self, values):
+        """
+        ``values`` as NumPy array of ``float64``. Because rounding to the
+        nearest float keeps the order of values, such a float compares to
+        the float of a limit the same way as the decimal value compares to
+        the limit itself, unless both floats are equal.
+        """
+        return numpy.fromiter(map(float, values), dtype=numpy.float64, count=len(values))
+
+    def _numpy_contains_each(self, values, numpy_values):
+        result = super(DecimalRange, self)._numpy_contains_each(values, numpy_values)
+        # Check values that round to the same float as a limit exactly.
+        for index in numpy.flatnonzero(numpy.isin(numpy_values, self._numpy_limits)):
+            result[index] = self.contains(values[index])
+        return result
+
     @property
     def scale(self):
         return self._scale
@@ -733,21 +951,6 @@ class DecimalRange(Range):
         else:
             value_as_decimal = value
 
-        if self._items is not None:
-            is_valid = False
-            item_index = 0
-            while not is_valid and item_index < len(self._items):
-                lower, upper = self._items[item_index]
-                if lower is None:
-                    assert upper is not None
-                    if value_as_decimal <= upper:
-                        is_valid = True
-                elif upper is None:
-                    if value_as_decimal >= lower:
-                        is_valid = True
-                elif (value_as_decimal >= lower) and (value_as_decimal <= upper):
-                    is_valid = True
-                item_index += 1
-            if not is_valid:
-                raise errors.RangeValueError(
-                    "%s is %r but must be within range: %r" % (name, value_as_decimal, self), location)
+        if not self.contains(value_as_decimal):
+            raise errors.RangeValueError(
+                "%s is %r but must be within range: %r" % (name, value_as_decimal, self), location)
@@ -21,27 +21,42 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import codecs
+import contextlib
 import csv
 import datetime
 import io
+import mmap
+import operator
 import os
 import re
 import six
-import xlrd
-import xlsxwriter
-import zipfile
+import stat
 from contextlib import closing
-from xml.etree import ElementTree
 
 from cutplace import data
 from cutplace import errors
 from cutplace import _compat
 from cutplace import _tools
 
+# Modules only needed to read or write Excel and ODS documents, imported on
+# first use so delimited and fixed data do not have to wait for them.
+ElementTree = _tools.LazyModule('xml.etree.ElementTree')
+xlrd = _tools.LazyModule('xlrd')
+xlsxwriter = _tools.LazyModule('xlsxwriter')
+zipfile = _tools.LazyModule('zipfile')
+
 # Valid line delimiters for  `fixed_rows()`.
 _VALID_FIXED_ANY_LINE_DELIMITERS = ('\n', '\r', '\r\n')
 _VALID_FIXED_LINE_DELIMITERS = data.LINE_DELIMITER_TO_TEXT_MAP.keys()
 
+# Number of bytes to read at once when looking for the end of a shard.
+_DELIMITED_SHARD_SEARCH_SIZE = 64 * 1024
+
+# Approximate number of characters to read at once from fixed data with a
+# specific line delimiter.
+_FIXED_BLOCK_SIZE = 1024 * 1024
+
 # Namespaces used by OpenOffice.org documents.
 _OOO_NAMESPACES = {
     'chart': 'urn:oasis:names:tc:opendocument:xmlns:chart:1.0',
@@ -73,19 +88,42 @@ _OOO_NAMESPACES = {
     'xsd': 'http://www.w3.org/2001/XMLSchema',
     'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
 }
-_NUMBER_COLUMNS_REPEATED = '{' + _OOO_NAMESPACES['table'] + '}number-columns-repeated'
+# Namespaces, tags and attributes used by Office Open XML spreadsheets (XLSX).
+_XLSX_NAMESPACE_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_XLSX_NAMESPACE_PACKAGE_RELATIONSHIPS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_XLSX_NAMESPACE_RELATIONSHIPS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_XLSX_ATTRIBUTE_RELATIONSHIP_ID = '{' + _XLSX_NAMESPACE_RELATIONSHIPS + '}id'
+_XLSX_ATTRIBUTE_XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+_XLSX_TAG_CELL = '{' + _XLSX_NAMESPACE_MAIN + '}c'
+_XLSX_TAG_CELL_XFS = '{' + _XLSX_NAMESPACE_MAIN + '}cellXfs'
+_XLSX_TAG_INLINE_STRING = '{' + _XLSX_NAMESPACE_MAIN + '}is'
+_XLSX_TAG_NUMBER_FORMAT = '{' + _XLSX_NAMESPACE_MAIN + '}numFmt'
+_XLSX_TAG_RELATIONSHIP = '{' + _XLSX_NAMESPACE_PACKAGE_RELATIONSHIPS + '}Relationship'
+_XLSX_TAG_RICH_TEXT_RUN = '{' + _XLSX_NAMESPACE_MAIN + '}r'
+_XLSX_TAG_ROW = '{' + _XLSX_NAMESPACE_MAIN + '}row'
+_XLSX_TAG_SHARED_STRING_ITEM = '{' + _XLSX_NAMESPACE_MAIN + '}si'
+_XLSX_TAG_SHEET = '{' + _XLSX_NAMESPACE_MAIN + '}sheet'
+_XLSX_TAG_SHEETS = '{' + _XLSX_NAMESPACE_MAIN + '}sheets'
+_XLSX_TAG_SHEET_DATA = '{' + _XLSX_NAMESPACE_MAIN + '}sheetData'
+_XLSX_TAG_TEXT = '{' + _XLSX_NAMESPACE_MAIN + '}t'
+_XLSX_TAG_VALUE = '{' + _XLSX_NAMESPACE_MAIN + '}v'
+_XLSX_TAG_WORKBOOK_PROPERTIES = '{' + _XLSX_NAMESPACE_MAIN + '}workbookPr'
+_XLSX_TAG_XF = '{' + _XLSX_NAMESPACE_MAIN + '}xf'
+
+# Built in number formats of Excel that represent a date or time.
+_XLSX_DATE_NUMBER_FORMAT_IDS = frozenset(list(range(14, 23)) + list(range(45, 48)))
+
+# Characters Excel escapes as ``_xHHHH_`` in XLSX text.
+_XLSX_ESCAPED_CHARACTER_REGEX = re.compile(r'_x[0-9A-Fa-f]{4}_')
 
-if six.PY2:
-    # HACK: Prepare ``ElementTree`` for namespaced find operations.
-    # See also: <http://effbot.org/zone/element-namespaces.htm>.
-    try:
-        register_namespace = ElementTree.register_namespace
-    except AttributeError:
-        def register_namespace(prefix, uri):
-            ElementTree._namespace_map[uri] = prefix
-
-    for short_name, url in _OOO_NAMESPACES.items():
-        register_namespace(short_name, url)
+_NUMBER_COLUMNS_REPEATED = '{' + _OOO_NAMESPACES['table'] + '}number-columns-repeated'
+_OOO_TAG_BODY = '{' + _OOO_NAMESPACES['office'] + '}body'
+_OOO_TAG_DOCUMENT_CONTENT = '{' + _OOO_NAMESPACES['office'] + '}document-content'
+_OOO_TAG_SPREADSHEET = '{' + _OOO_NAMESPACES['office'] + '}spreadsheet'
+_OOO_TAG_TABLE = '{' + _OOO_NAMESPACES['table'] + '}table'
+_OOO_TAG_TABLE_CELL = '{' + _OOO_NAMESPACES['table'] + '}table-cell'
+_OOO_TAG_TABLE_ROW = '{' + _OOO_NAMESPACES['table'] + '}table-row'
+_OOO_TAG_TEXT_P = '{' + _OOO_NAMESPACES['text'] + '}p'
 
 
 def _excel_cell_value(cell, datemode):
@@ -108,33 +146,353 @@ def _excel_cell_value(cell, datemode):
     """
     assert cell is not None
 
-    if cell.ctype == xlrd.XL_CELL_DATE:
-        cell_tuple = xlrd.xldate_as_tuple(cell.value, datemode)
+    return _excel_value(cell.ctype, cell.value, datemode)
+
+
+def _excel_value(cell_type, value, datemode):
+    """
+    Same as :py:func:`_excel_cell_value` but using the :py:mod:`xlrd` cell
+    type and value directly, for instance as returned by
+    :py:meth:`xlrd.sheet.Sheet.row_types` and
+    :py:meth:`xlrd.sheet.Sheet.row_values`.
+    """
+    if cell_type == xlrd.XL_CELL_DATE:
+        cell_tuple = xlrd.xldate_as_tuple(value, datemode)
         assert len(cell_tuple) == 6, "cell_tuple=%r" % cell_tuple
         if cell_tuple[:3] == (0, 0, 0):
             time_tuple = cell_tuple[3:]
             result = six.text_type(datetime.time(*time_tuple))
         else:
             result = six.text_type(datetime.datetime(*cell_tuple))
-    elif cell.ctype == xlrd.XL_CELL_ERROR:
+    elif cell_type == xlrd.XL_CELL_ERROR:
         default_error_text = xlrd.error_text_from_code[0x2a]  # same as "#N/A!"
-        error_code = cell.value
+        error_code = value
         result = six.text_type(xlrd.error_text_from_code.get(error_code, default_error_text))
-    elif isinstance(cell.value, six.text_type):
-        result = cell.value
+    elif isinstance(value, six.text_type):
+        result = value
     else:
-        result = six.text_type(cell.value)
-        if (cell.ctype == xlrd.XL_CELL_NUMBER) and (result.endswith(".0")):
+        result = six.text_type(value)
+        if (cell_type == xlrd.XL_CELL_NUMBER) and (result.endswith(".0")):
             result = result[:-2]
 
     return result
 
 
+def _is_excel_date_format(format_code):
+    """
+    True if the Excel number format ``format_code`` represents a date or
+    time, using the same heuristics as :py:mod:`xlrd`: quoted text, escaped
+    characters and conditions in brackets are ignored, and the remaining
+    date characters (ymdhs) have to outweigh the number placeholders (0#?).
+    """
+    assert format_code is not None
+
+    relevant_format_code = ''
+    quoted = False
+    skip_next = False
+    for character in format_code:
+        if skip_next:
+            skip_next = False
+        elif quoted:
+            quoted = character != '"'
+        elif character == '"':
+            quoted = True
+        elif character in '\\_*':
+            skip_next = True
+        elif character not in '$-+/(): ':
+            relevant_format_code += character
+    relevant_format_code = re.sub(r'\[[^]]*\]', '', relevant_format_code)
+    if relevant_format_code in ('0.00E+00', '##0.0E+0', 'General', 'GENERAL', 'general', '@'):
+        result = False
+    else:
+        date_count = sum(1 for character in relevant_format_code if character in 'ymdhsYMDHS')
+        number_count = sum(1 for character in relevant_format_code if character in '0#?')
+        result = date_count > number_count
+    return result
+
+
+def _xlsx_text(element):
+    """
+    The text in XLSX ``element`` with surrounding white space removed unless
+    it should be preserved, and with ``_xHHHH_`` escapes resolved.
+    """
+    result = element.text
+    if result is None:
+        result = ''
+    else:
+        if element.get(_XLSX_ATTRIBUTE_XML_SPACE) != 'preserve':
+            result = result.strip('\t\n\r ')
+        if '_' in result:
+            result = _XLSX_ESCAPED_CHARACTER_REGEX.sub(lambda match: six.unichr(int(match.group(0)[2:6], 16)), result)
+    return result
+
+
+def _xlsx_rich_text(element):
+    """
+    The text in XLSX shared string item or inline string ``element``,
+    combining all runs in case of rich text.
+    """
+    result = ''
+    for child in element:
+        if child.tag == _XLSX_TAG_TEXT:
+            result += _xlsx_text(child)
+        elif child.tag == _XLSX_TAG_RICH_TEXT_RUN:
+            for run_child in child:
+                if run_child.tag == _XLSX_TAG_TEXT:
+                    result += _xlsx_text(run_child)
+    return result
+
+
+def _xlsx_column_index(cell_reference):
+    """
+    The zero based column index of ``cell_reference``, for example
+    ``'AB12'`` results in 27.
+    """
+    result = 0
+    for character in cell_reference:
+        if 'A' <= character <= 'Z':
+            result = 26 * result + ord(character) - ord('A') + 1
+        elif '0' <= character <= '9':
+            break
+    return result - 1
+
+
+def _xlsx_part_stream(zip_archive, part_name):
+    # Similar to xlrd, ignore the case of names in the archive.
+    for name in zip_archive.namelist():
+        if name.replace('\\', '/').lower() == part_name:
+            return zip_archive.open(name)
+    return None
+
+
+def _xlsx_sheet_part_name_and_datemode(zip_archive, sheet, location):
+    """
+    The name of the part in XLSX ``zip_archive`` that contains the
+    worksheet number ``sheet`` and the datemode of the workbook.
+    """
+    relationships_stream = _xlsx_part_stream(zip_archive, 'xl/_rels/workbook.xml.rels')
+    workbook_stream = _xlsx_part_stream(zip_archive, 'xl/workbook.xml')
+    if (relationships_stream is None) or (workbook_stream is None):
+        raise errors.DataFormatError('cannot read Excel file: archive must contain an XLSX workbook', location)
+    with closing(relationships_stream):
+        relationship_id_to_type_and_part_name_map = {}
+        for relationship in ElementTree.parse(relationships_stream).getroot().iter(_XLSX_TAG_RELATIONSHIP):
+            relationship_type = relationship.get('Type', '').split('/')[-1]
+            target = relationship.get('Target', '').replace('\\', '/').lower()
+            part_name = target[1:] if target.startswith('/') else 'xl/' + target
+            relationship_id_to_type_and_part_name_map[relationship.get('Id')] = (relationship_type, part_name)
+    with closing(workbook_stream):
+        workbook = ElementTree.parse(workbook_stream).getroot()
+    datemode = 0
+    for workbook_properties in workbook.iter(_XLSX_TAG_WORKBOOK_PROPERTIES):
+        datemode = 1 if workbook_properties.get('date1904') in ('1', 'true', 'on') else 0
+    worksheet_part_names = []
+    for sheet_element in workbook.iter(_XLSX_TAG_SHEET):
+        relationship_type, part_name = relationship_id_to_type_and_part_name_map.get(
+            sheet_element.get(_XLSX_ATTRIBUTE_RELATIONSHIP_ID), (None, None))
+        # Like xlrd, consider only worksheets but not for example chart sheets.
+        if relationship_type == 'worksheet':
+            worksheet_part_names.append(part_name)
+    if sheet > len(worksheet_part_names):
+        error_message = 'Excel must contain at least %d sheet(s) instead of just %d' % (
+            sheet, len(worksheet_part_names))
+        raise errors.DataFormatError(error_message, errors.Location(location.file_path))
+    return worksheet_part_names[sheet - 1], datemode
+
+
+def _xlsx_shared_strings(zip_archive):
+    result = []
+    shared_strings_stream = _xlsx_part_stream(zip_archive, 'xl/sharedstrings.xml')
+    if shared_strings_stream is not None:
+        with closing(shared_strings_stream):
+            shared_strings = None
+            for event, element in ElementTree.iterparse(shared_strings_stream, events=('start', 'end')):
+                if shared_strings is None:
+                    shared_strings = element
+                elif (event == 'end') and (element.tag == _XLSX_TAG_SHARED_STRING_ITEM):
+                    result.append(_xlsx_rich_text(element))
+                    shared_strings.remove(element)
+    return result
+
+
+def _xlsx_date_style_indices(zip_archive):
+    """
+    Set of the indices of cell styles in XLSX ``zip_archive`` that use a
+    date format.
+    """
+    result = set()
+    styles_stream = _xlsx_part_stream(zip_archive, 'xl/styles.xml')
+    if styles_stream is not None:
+        with closing(styles_stream):
+            styles = ElementTree.parse(styles_stream).getroot()
+        date_number_format_ids = set(_XLSX_DATE_NUMBER_FORMAT_IDS)
+        for number_format in styles.iter(_XLSX_TAG_NUMBER_FORMAT):
+            number_format_id = int(number_format.get('numFmtId'))
+            if _is_excel_date_format(number_format.get('formatCode', '')):
+                date_number_format_ids.add(number_format_id)
+            else:
+                date_number_format_ids.discard(number_format_id)
+        for cell_styles in styles.iter(_XLSX_TAG_CELL_XFS):
+            for style_index, style in enumerate(cell_styles.iter(_XLSX_TAG_XF)):
+                if int(style.get('numFmtId', '0')) in date_number_format_ids:
+                    result.add(style_index)
+    return result
+
+
+def _xlsx_row(row_element, shared_strings, date_style_indices, datemode, location):
+    """
+    The values of the cells in XLSX ``row_element``, which is empty if the
+    row does not contain any values.
+    """
+    result = []
+    column_index = -1
+    for cell in row_element:
+        cell_reference = cell.get('r')
+        column_index = column_index + 1 if cell_reference is None else _xlsx_column_index(cell_reference)
+        cell_type = cell.get('t', 'n')
+        value = None
+        if cell_type == 'n':
+            value_text = cell.findtext(_XLSX_TAG_VALUE)
+            if value_text:
+                if date_style_indices and (int(cell.get('s', '0')) in date_style_indices):
+                    value = _excel_value(xlrd.XL_CELL_DATE, float(value_text), datemode)
+                else:
+                    value = six.text_type(float(value_text))
+                    if value.endswith('.0'):
+                        value = value[:-2]
+        elif cell_type == 's':
+            value_text = cell.findtext(_XLSX_TAG_VALUE)
+            if value_text:
+                shared_string_index = int(value_text)
+                if not 0 <= shared_string_index < len(shared_strings):
+                    location.set_cell(column_index)
+                    raise errors.DataFormatError(
+                        'cannot read Excel file: shared string index %d must be between 0 and %d'
+                        % (shared_string_index, len(shared_strings) - 1), location)
+                value = shared_strings[shared_string_index]
+        elif cell_type == 'str':
+            value_element = cell.find(_XLSX_TAG_VALUE)
+            value = _xlsx_text(value_element) if value_element is not None else ''
+        elif cell_type == 'b':
+            value = '1' if cell.findtext(_XLSX_TAG_VALUE) in ('1', 'true', 'on') else '0'
+        elif cell_type == 'e':
+            value = cell.findtext(_XLSX_TAG_VALUE)
+            if value not in xlrd.error_text_from_code.values():
+                value = xlrd.error_text_from_code[0x2a]
+        elif cell_type == 'inlineStr':
+            inline_string = cell.find(_XLSX_TAG_INLINE_STRING)
+            if inline_string is not None:
+                value = _xlsx_rich_text(inline_string) or None
+        elif cell_type == 'd':
+            value = cell.findtext(_XLSX_TAG_VALUE) or ''
+        else:
+            location.set_cell(column_index)
+            raise errors.DataFormatError(
+                'cannot read Excel file: cell type %s must be supported' % _compat.text_repr(cell_type), location)
+        if value is not None:
+            missing_value_count = column_index - len(result)
+            if missing_value_count == 0:
+                result.append(value)
+            elif missing_value_count > 0:
+                result.extend([''] * missing_value_count)
+                result.append(value)
+            else:
+                result[column_index] = value
+    return result
+
+
+def _xlsx_rows(source_path, sheet, location):
+    """
+    Rows read from the XLSX document ``source_path`` by parsing the XML of
+    the worksheet incrementally. Similar to :py:mod:`xlrd`, rows are padded
+    to the number of columns of the widest row. Because each row is yielded
+    as soon as it has been read, this only takes the rows up to it into
+    account.
+    """
+    with closing(zipfile.ZipFile(source_path, 'r')) as zip_archive:
+        sheet_part_name, datemode = _xlsx_sheet_part_name_and_datemode(zip_archive, sheet, location)
+        shared_strings = _xlsx_shared_strings(zip_archive)
+        date_style_indices = _xlsx_date_style_indices(zip_archive)
+        sheet_stream = _xlsx_part_stream(zip_archive, sheet_part_name)
+        if sheet_stream is None:
+            raise errors.DataFormatError(
+                'cannot read Excel file: archive must contain worksheet %s' % _compat.text_repr(sheet_part_name),
+                location)
+        with closing(sheet_stream):
+            column_count = 0
+            row_index = -1
+            empty_row_count = 0
+            sheet_data = None
+            for event, element in ElementTree.iterparse(sheet_stream, events=('start', 'end')):
+                if event == 'start':
+                    if element.tag == _XLSX_TAG_SHEET_DATA:
+                        sheet_data = element
+                elif element.tag == _XLSX_TAG_ROW:
+                    row_number = element.get('r')
+                    next_row_index = row_index + 1 if row_number is None else int(row_number) - 1
+                    empty_row_count += next_row_index - row_index - 1
+                    row_index = next_row_index
+                    row = _xlsx_row(element, shared_strings, date_style_indices, datemode, location)
+                    if sheet_data is not None:
+                        sheet_data.remove(element)
+                    if not row:
+                        # Rows without values only count if there are rows with values after them.
+                        empty_row_count += 1
+                        continue
+                    column_count = max(column_count, len(row))
+                    for _ in range(empty_row_count):
+                        yield [''] * column_count
+                        location.advance_line()
+                    empty_row_count = 0
+                    row.extend([''] * (column_count - len(row)))
+                    yield row
+                    location.advance_line()
+
+
+def _is_zip_archive(source_path):
+    """
+    True if ``source_path`` starts like a ZIP archive, for example a XLSX
+    document. Unlike :py:func:`zipfile.is_zipfile` this does not consider
+    XLS documents that happen to contain an embedded ZIP archive.
+    """
+    with io.open(source_path, 'rb') as source_file:
+        return source_file.read(4) == b'PK\x03\x04'
+
+
+def _xls_rows(source_path, sheet, location):
+    """
+    Rows read from the XLS document ``source_path`` using :py:mod:`xlrd`,
+    which loads only ``sheet`` and converts whole rows at once.
+    """
+    with xlrd.open_workbook(source_path, on_demand=True) as book:
+        if sheet > book.nsheets:
+            error_message = 'Excel must contain at least %d sheet(s) instead of just %d' % (sheet, book.nsheets)
+            raise errors.DataFormatError(error_message, errors.Location(source_path))
+        sheet_index = sheet - 1
+        excel_sheet = book.sheet_by_index(sheet_index)
+        try:
+            datemode = book.datemode
+            for y in range(excel_sheet.nrows):
+                yield [
+                    _excel_value(cell_type, value, datemode)
+                    for cell_type, value in zip(excel_sheet.row_types(y), excel_sheet.row_values(y))
+                ]
+                location.advance_line()
+        finally:
+            book.unload_sheet(sheet_index)
+
+
 def excel_rows(source_path, sheet=1):
     """
     Rows read from an Excel document (both :file:`*.xls` and :file:`*.xlsx`
     thanks to :py:mod:`xlrd`).
 
+    Only ``sheet`` is loaded. XLSX documents are parsed incrementally, so
+    the first rows are available before the whole sheet has been read and
+    the memory needed remains about the same for small and large sheets.
+    Unlike with XLS documents, rows are only padded to the number of
+    columns of the widest row read before them.
+
     :param str source_path: path to the Excel file to be read
     :param int sheet: the sheet in the file to be read
     :return: sequence of lists with each list representing a row in the \
@@ -146,17 +504,13 @@ def excel_rows(source_path, sheet=1):
 
     location = errors.Location(source_path, has_cell=True)
     try:
-        with xlrd.open_workbook(source_path) as book:
-            sheet = book.sheet_by_index(0)
-            datemode = book.datemode
-            for y in range(sheet.nrows):
-                row = []
-                for x in range(sheet.ncols):
-                    row.append(_excel_cell_value(sheet.cell(y, x), datemode))
-                    location.advance_cell()
-                yield row
-                location.advance_line()
-    except xlrd.XLRDError as error:
+        if _is_zip_archive(source_path):
+            rows = _xlsx_rows(source_path, sheet, location)
+        else:
+            rows = _xls_rows(source_path, sheet, location)
+        for row in rows:
+            yield row
+    except (xlrd.XLRDError, zipfile.BadZipfile, ElementTree.ParseError, KeyError, ValueError) as error:
         raise errors.DataFormatError('cannot read Excel file: %s' % error, location)
     except UnicodeError as error:
         raise errors.DataFormatError('cannot decode Excel data: %s' % error, location)
@@ -204,6 +558,9 @@ def delimited_rows(delimited_source, data_format):
       a valid delimited file
     """
     if isinstance(delimited_source, six.string_types):
+        # Unlike shards, read the whole file from a text stream rather than
+        # a memory map: the csv module can only split decoded text, and the
+        # stream already decodes it in blocks.
         delimited_stream = io.open(delimited_source, 'r', newline='', encoding=data_format.encoding)
         has_opened_delimited_stream = True
     else:
@@ -222,14 +579,213 @@ def delimited_rows(delimited_source, data_format):
             delimited_stream.close()
 
 
-def _findall(element, xpath, namespaces):
-    if six.PY2:
-        resolved_xpath = xpath
-        for short_name, url in namespaces.items():
-            resolved_xpath = re.sub(r'\b' + short_name + ':', '{' + url + '}', resolved_xpath)
-        result = element.findall(resolved_xpath)
+@contextlib.contextmanager
+def _mapped_data(path):
+    """
+    Context manager for the data of the file ``path`` mapped into memory
+    for reading, or ``None`` if the file cannot be mapped, for example
+    because it is empty or not a regular file. Under Python 3 the result is
+    a :py:class:`memoryview`, so slices of it can be decoded without copying
+    them. Such slices should only be used temporarily because the memory
+    map cannot be closed as long as they exist.
+    """
+    assert path is not None
+
+    with io.open(path, 'rb') as stream:
+        mapped = None
+        if stat.S_ISREG(os.fstat(stream.fileno()).st_mode):
+            try:
+                mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            except (EnvironmentError, ValueError):
+                # Empty files cannot be mapped and some file systems do not
+                # support memory maps at all.
+                pass
+        if mapped is None:
+            yield None
+        else:
+            view = memoryview(mapped) if six.PY3 else mapped
+            try:
+                yield view
+            finally:
+                if view is not mapped:
+                    view.release()
+                try:
+                    mapped.close()
+                except BufferError:
+                    # A slice of the map still exists; the map will be closed once it is garbage collected.
+                    pass
+
+
+def _decoded_shard(path, encoding, start, end):
+    """
+    Text between the byte offsets ``start`` and ``end`` of ``path``.
+
+    :raises UnicodeDecodeError: if the data cannot be decoded
+    """
+    with _mapped_data(path) as mapped:
+        if mapped is not None:
+            return codecs.decode(mapped[start:end], encoding)
+    with io.open(path, 'rb') as stream:
+        stream.seek(start)
+        return stream.read(end - start).decode(encoding)
+
+
+def _is_shardable_delimited_format(data_format):
+    """
+    ``True`` if delimited data using ``data_format`` can be split into
+    shards by looking only at line feeds and quote characters.
+    """
+    assert data_format is not None
+    assert data_format.format == data.FORMAT_DELIMITED
+
+    if data_format.escape_character != data_format.quote_character:
+        # With an escape character like backslash, escaped quotes cannot
+        # be told apart from actual quotes without parsing the data.
+        result = False
     else:
-        result = element.findall(xpath, namespaces)
+        # Line feeds and quotes must be single bytes that cannot be part of
+        # other characters, which holds for ASCII based encodings.
+        line_feed_and_quote = '\n' + data_format.quote_character
+        try:
+            result = line_feed_and_quote.encode(data_format.encoding) == line_feed_and_quote.encode('ascii')
+        except (LookupError, UnicodeError):
+            result = False
+    return result
+
+
+def delimited_shards(delimited_path, data_format, shard_size):
+    """
+    Byte ranges ``(start, end)`` of about ``shard_size`` bytes each that
+    split the delimited file ``delimited_path`` into shards that can be
+    read independently by :py:func:`delimited_shard_rows`.
+
+    Each shard ends after a line feed that is not part of a quoted item, so
+    no record spans across shards. If the file cannot be split safely
+    (for example because it uses an escape character that differs from the
+    quote character or a multi-byte encoding such as UTF-16), the result
+    is a single shard covering the whole file.
+    """
+    assert delimited_path is not None
+    assert data_format is not None
+    assert data_format.is_valid
+    assert shard_size >= 1
+
+    file_size = os.path.getsize(delimited_path)
+    if not _is_shardable_delimited_format(data_format):
+        return [(0, file_size)]
+
+    quote = data_format.quote_character.encode(data_format.encoding)
+    result = []
+    with io.open(delimited_path, 'rb') as delimited_stream:
+        shard_start = 0
+        while shard_start < file_size:
+            shard_end = shard_start + shard_size
+            if shard_end >= file_size:
+                shard_end = file_size
+            else:
+                delimited_stream.seek(shard_start)
+                is_quoted = (delimited_stream.read(shard_size).count(quote) % 2 == 1)
+                shard_end = None
+                while shard_end is None:
+                    block_start = delimited_stream.tell()
+                    block = delimited_stream.read(_DELIMITED_SHARD_SEARCH_SIZE)
+                    if not block:
+                        shard_end = file_size
+                    else:
+                        position = 0
+                        line_feed_index = block.find(b'\n')
+                        while (shard_end is None) and (line_feed_index != -1):
+                            if block.count(quote, position, line_feed_index) % 2 == 1:
+                                is_quoted = not is_quoted
+                            if not is_quoted:
+                                shard_end = block_start + line_feed_index + 1
+                            else:
+                                position = line_feed_index
+                                line_feed_index = block.find(b'\n', position + 1)
+                        if (shard_end is None) and (block.count(quote, position) % 2 == 1):
+                            is_quoted = not is_quoted
+            result.append((shard_start, shard_end))
+            shard_start = shard_end
+    if not result:
+        result.append((0, 0))
+    return result
+
+
+def delimited_shard_rows(delimited_path, data_format, start, end):
+    """
+    Rows in the shard of ``delimited_path`` between the byte offsets
+    ``start`` and ``end`` as computed by :py:func:`delimited_shards`.
+    Locations in a possible :py:exc:`cutplace.errors.DataFormatError` are
+    relative to ``start``.
+
+    :raises cutplace.errors.DataFormatError: if the shard is not valid \
+      delimited data
+    """
+    assert delimited_path is not None
+    assert data_format is not None
+    assert 0 <= start <= end
+
+    try:
+        shard_text = _decoded_shard(delimited_path, data_format.encoding, start, end)
+    except UnicodeDecodeError as error:
+        location = errors.Location(delimited_path)
+        with io.open(delimited_path, 'rb') as delimited_stream:
+            delimited_stream.seek(start)
+            line_number = delimited_stream.read(error.start).count(b'\n')
+        if line_number > 0:
+            location.advance_line(line_number)
+        raise errors.DataFormatError('cannot parse delimited file: %s' % error, location)
+    keywords = _as_delimited_keywords(data_format)
+    with io.StringIO(shard_text, newline='') as shard_stream:
+        delimited_reader = _compat.csv_reader(shard_stream, **keywords)
+        try:
+            for row in delimited_reader:
+                yield row
+        except csv.Error as error:
+            _raise_delimited_data_format_error(delimited_path, delimited_reader, error)
+
+
+def _ods_row(table_row, location):
+    """
+    Values of the cells in the ODS ``table_row`` element.
+    """
+    result = []
+    for table_cell in table_row:
+        if table_cell.tag != _OOO_TAG_TABLE_CELL:
+            continue
+        repeated_text = table_cell.attrib.get(_NUMBER_COLUMNS_REPEATED, '1')
+        try:
+            repeated_count = int(repeated_text)
+            if repeated_count < 1:
+                raise errors.DataFormatError(
+                    'table:number-columns-repeated is %s but must be at least 1'
+                    % _compat.text_repr(repeated_text), location)
+        except ValueError:
+            raise errors.DataFormatError(
+                'table:number-columns-repeated is %s but must be an integer' % _compat.text_repr(repeated_text),
+                location)
+        text_p = None
+        for cell_element in table_cell:
+            if cell_element.tag == _OOO_TAG_TEXT_P:
+                text_p = cell_element
+                break
+        if text_p is None:
+            cell_value = ''
+        else:
+            cell_value = text_p.text
+            if six.PY2:
+                # HACK: It seems that under Python 2 ElementTree.find() returns a unicode string only of the value
+                # actually contains non ASCII characters, and otherwise a binary string. To work around this we
+                # check the result for binary strings and possibly convert them to uncicode strings assuming UTF-8
+                # to be the internal encoding for the XML file. Ideally we would parse the XML header for the
+                # encoding. Considering that Python 2 is on the way out, this just doesn't seem to be worth the
+                # trouble right now.
+                if isinstance(cell_value, six.binary_type):
+                    cell_value = six.text_type(cell_value, 'utf-8')
+                else:
+                    assert isinstance(cell_value, six.text_type), 'cell_value=%r' % cell_value
+        result.extend([cell_value] * repeated_count)
+        location.advance_cell(repeated_count)
     return result
 
 
@@ -237,86 +793,67 @@ def ods_rows(source_ods_path, sheet=1):
     """
     Rows stored in ODS document ``source_ods_path`` in ``sheet``.
 
+    The content of the document is parsed incrementally, so the first rows
+    are available before the whole document has been read, and elements
+    are removed once processed. Consequently the memory needed remains
+    about the same for small and large documents.
+
     :raises cutplace.errors.DataFormarError: if ``source_ods_path`` is not \
       a valid ODS file.
     """
+    assert source_ods_path is not None
     assert sheet >= 1
 
-    def ods_content_root():
-        """
-        `ElementTree` for content.xml in `source_ods_path`.
-        """
-        assert source_ods_path is not None
-
-        location = errors.Location(source_ods_path)
+    location = errors.Location(source_ods_path)
+    try:
+        zip_archive = zipfile.ZipFile(source_ods_path, "r")
+    except Exception as error:
+        raise errors.DataFormatError('cannot uncompress ODS spreadsheet: %s' % error, location)
+    # HACK: Use ``closing()`` because of Python 2.6.
+    with closing(zip_archive):
         try:
-            # HACK: Use ``closing()`` because of Python 2.6.
-            with closing(zipfile.ZipFile(source_ods_path, "r")) as zip_archive:
+            content_stream = zip_archive.open("content.xml")
+        except Exception as error:
+            raise errors.DataFormatError('cannot extract content.xml for ODS spreadsheet: %s' % error, location)
+        with closing(content_stream):
+            # Path of the tags leading to the rows of a sheet.
+            table_path = [_OOO_TAG_DOCUMENT_CONTENT, _OOO_TAG_BODY, _OOO_TAG_SPREADSHEET, _OOO_TAG_TABLE]
+            table_row_path = table_path + [_OOO_TAG_TABLE_ROW]
+            table_count = 0
+            tag_path = []
+            element_path = []
+            events = ElementTree.iterparse(content_stream, events=('start', 'end'))
+            while True:
                 try:
-                    xml_data = zip_archive.read("content.xml")
+                    event, element = next(events)
+                except StopIteration:
+                    break
                 except Exception as error:
-                    raise errors.DataFormatError('cannot extract content.xml for ODS spreadsheet: %s' % error, location)
-        except errors.DataFormatError:
-            raise
-        except Exception as error:
-            raise errors.DataFormatError('cannot uncompress ODS spreadsheet: %s' % error, location)
-
-        with io.BytesIO(xml_data) as xml_stream:
-            try:
-                tree = ElementTree.parse(xml_stream)
-            except Exception as error:
-                raise errors.DataFormatError('cannot parse content.xml: %s' % error, location)
-
-        return tree.getroot()
-
-    content_root = ods_content_root()
-    table_elements = list(
-        _findall(content_root, 'office:body/office:spreadsheet/table:table', namespaces=_OOO_NAMESPACES))
-    table_count = len(table_elements)
+                    raise errors.DataFormatError('cannot parse content.xml: %s' % error, location)
+                if event == 'start':
+                    tag_path.append(element.tag)
+                    element_path.append(element)
+                    if tag_path == table_path:
+                        table_count += 1
+                        if table_count == sheet:
+                            location = errors.Location(source_ods_path, has_cell=True, has_sheet=True)
+                            for _ in range(sheet - 1):
+                                location.advance_sheet()
+                else:
+                    if (tag_path == table_row_path) and (table_count == sheet):
+                        yield _ods_row(element, location)
+                        location.advance_line()
+                    elif (tag_path == table_path) and (table_count == sheet):
+                        # Skip the remaining sheets.
+                        break
+                    tag_path.pop()
+                    element_path.pop()
+                    if tag_path == table_path:
+                        # Remove processed or skipped rows and other elements of sheets.
+                        element_path[-1].remove(element)
     if table_count < sheet:
         error_message = 'ODS must contain at least %d sheet(s) instead of just %d' % (sheet, table_count)
         raise errors.DataFormatError(error_message, errors.Location(source_ods_path))
-    table_element = table_elements[sheet - 1]
-    location = errors.Location(source_ods_path, has_cell=True, has_sheet=True)
-    for _ in range(sheet - 1):
-        location.advance_sheet()
-    for table_row in _findall(table_element, 'table:table-row', namespaces=_OOO_NAMESPACES):
-        row = []
-        for table_cell in _findall(table_row, 'table:table-cell', namespaces=_OOO_NAMESPACES):
-            repeated_text = table_cell.attrib.get(_NUMBER_COLUMNS_REPEATED, '1')
-            try:
-                repeated_count = int(repeated_text)
-                if repeated_count < 1:
-                    raise errors.DataFormatError(
-                        'table:number-columns-repeated is %s but must be at least 1'
-                        % _compat.text_repr(repeated_text), location)
-            except ValueError:
-                raise errors.DataFormatError(
-                    'table:number-columns-repeated is %s but must be an integer' % _compat.text_repr(repeated_text),
-                    location)
-            if six.PY2:
-                text_p = table_cell.find('{%s}p' % _OOO_NAMESPACES['text'])
-            else:
-                text_p = table_cell.find('text:p', namespaces=_OOO_NAMESPACES)
-            if text_p is None:
-                cell_value = ''
-            else:
-                cell_value = text_p.text
-                if six.PY2:
-                    # HACK: It seems that under Python 2 ElementTree.find() returns a unicode string only of the value
-                    # actually contains non ASCII characters, and otherwise a binary string. To work around this we
-                    # check the result for binary strings and possibly convert them to uncicode strings assuming UTF-8
-                    # to be the internal encoding for the XML file. Ideally we would parse the XML header for the
-                    # encoding. Considering that Python 2 is on the way out, this just doesn't seem to be worth the
-                    # trouble right now.
-                    if isinstance(cell_value, six.binary_type):
-                        cell_value = six.text_type(cell_value, 'utf-8')
-                    else:
-                        assert isinstance(cell_value, six.text_type), 'cell_value=%r' % cell_value
-            row.extend([cell_value] * repeated_count)
-            location.advance_cell(repeated_count)
-        yield row
-        location.advance_line()
 
 
 def fixed_rows(fixed_source, encoding, field_name_and_lengths, line_delimiter='any'):
@@ -328,6 +865,9 @@ def fixed_rows(fixed_source, encoding, field_name_and_lengths, line_delimiter='a
     and ``'\r\n'``, in which case other values result in a
     `errors.DataFormatError`. Additionally ``'any'`` accepts any of the
     previous values.
+
+    Except for ``'any'``, all records have the same length, so they are read
+    in large blocks from which the fields are sliced.
     """
     assert fixed_source is not None
     assert encoding is not None
@@ -337,6 +877,11 @@ def fixed_rows(fixed_source, encoding, field_name_and_lengths, line_delimiter='a
     assert line_delimiter in _VALID_FIXED_LINE_DELIMITERS, \
         'line_delimiter=%s but must be one of: %s' % (_compat.text_repr(line_delimiter), _VALID_FIXED_LINE_DELIMITERS)
 
+    if line_delimiter != data.ANY:
+        for row in _block_fixed_rows(fixed_source, encoding, field_name_and_lengths, line_delimiter):
+            yield row
+        return
+
     # Predefine variable for access in local function.
     location = errors.Location(fixed_source, has_column=True)
     fixed_file = None
@@ -448,6 +993,236 @@ def fixed_rows(fixed_source, encoding, field_name_and_lengths, line_delimiter='a
             fixed_file.close()
 
 
+def _is_single_byte_encoding(encoding):
+    """
+    ``True`` if ``encoding`` represents each character by exactly one byte.
+    """
+    assert encoding is not None
+
+    result = True
+    for some_character in ('a', '\u00e4', '\u20ac', '\u3042'):
+        try:
+            if len(some_character.encode(encoding)) != 1:
+                result = False
+                break
+        except UnicodeEncodeError:
+            # Characters that cannot be encoded do not matter.
+            pass
+    return result
+
+
+def _fixed_record_length(field_name_and_lengths, line_delimiter):
+    """
+    Number of characters used by each record of fixed data, including the
+    ``line_delimiter``, which must not be ``'any'``.
+    """
+    assert line_delimiter != data.ANY
+
+    result = sum(length for _, length in field_name_and_lengths)
+    if line_delimiter is not None:
+        result += len(line_delimiter)
+    return result
+
+
+def _sliced_fixed_rows(fixed_text, location, field_name_and_lengths, line_delimiter):
+    """
+    Rows in ``fixed_text`` with each record taking the same number of
+    characters, which requires ``line_delimiter`` to be different from
+    ``'any'``. Rows and errors are the same as with :py:func:`fixed_rows`
+    but the fields are sliced out of ``fixed_text`` without reading them
+    one by one. The line and column of ``location`` are only set in case
+    of an error, starting with the current line for the first record.
+    """
+    assert fixed_text is not None
+    assert location is not None
+    assert line_delimiter in _VALID_FIXED_LINE_DELIMITERS
+    assert line_delimiter != data.ANY
+
+    field_slices = []
+    fields_length = 0
+    for _, field_length in field_name_and_lengths:
+        field_slices.append((fields_length, fields_length + field_length))
+        fields_length += field_length
+    # Function to extract all fields of a record at once.
+    sliced_fields = operator.itemgetter(*[slice(start, end) for start, end in field_slices])
+    if len(field_slices) == 1:
+        single_sliced_field = sliced_fields
+
+        def sliced_fields(record):
+            return (single_sliced_field(record),)
+    record_length = _fixed_record_length(field_name_and_lengths, line_delimiter)
+    text_length = len(fixed_text)
+    complete_records_length = text_length - (text_length % record_length)
+    first_line = location.line
+
+    def raise_data_format_error(message, record_start, column):
+        location.set_line(first_line + record_start // record_length)
+        if column > 0:
+            location.advance_column(column)
+        raise errors.DataFormatError(message, location)
+
+    def validate_line_delimiter(record_start, actual_line_delimiter):
+        if actual_line_delimiter != line_delimiter:
+            raise_data_format_error(
+                'line delimiter is %s but must be %s'
+                % (_compat.text_repr(actual_line_delimiter), _compat.text_repr(line_delimiter)),
+                record_start, fields_length)
+
+    for record_start in range(0, complete_records_length, record_length):
+        if line_delimiter is not None:
+            validate_line_delimiter(
+                record_start, fixed_text[record_start + fields_length:record_start + record_length])
+        yield list(sliced_fields(fixed_text[record_start:record_start + fields_length]))
+
+    # Process a possibly incomplete last record.
+    if complete_records_length < text_length:
+        record_start = complete_records_length
+        available_length = text_length - record_start
+        for field_index, (field_name, field_length) in enumerate(field_name_and_lengths):
+            field_start, field_end = field_slices[field_index]
+            if available_length <= field_start:
+                assert field_index > 0
+                names = [name for name, _ in field_name_and_lengths]
+                previous_field_name = names[field_index - 1]
+                characters_needed_count = fields_length - field_start
+                list_of_missing_field_names = _tools.human_readable_list(names[field_index:], 'and')
+                raise_data_format_error(
+                    "after field '%s' %d characters must follow for: %s"
+                    % (previous_field_name, characters_needed_count, list_of_missing_field_names),
+                    record_start, field_start)
+            elif available_length < field_end:
+                item = fixed_text[record_start + field_start:]
+                raise_data_format_error(
+                    "cannot read field '%s': need %d characters but found only %d: %s"
+                    % (field_name, field_length, len(item), _compat.text_repr(item)),
+                    record_start, field_start)
+        actual_line_delimiter = fixed_text[record_start + fields_length:]
+        if actual_line_delimiter:
+            validate_line_delimiter(record_start, actual_line_delimiter)
+        yield list(sliced_fields(fixed_text[record_start:record_start + fields_length]))
+
+
+def _mapped_text_blocks(mapped, encoding, block_size):
+    """
+    Text of ``mapped`` decoded in blocks of ``block_size`` bytes, which
+    requires a single byte ``encoding``.
+    """
+    for block_start in range(0, len(mapped), block_size):
+        yield codecs.decode(mapped[block_start:block_start + block_size], encoding)
+
+
+def _fixed_text_blocks(fixed_source, encoding, block_size, location):
+    """
+    Text of ``fixed_source`` in blocks of ``block_size`` characters (except
+    for the last one). Files using a single byte encoding are mapped into
+    memory and decoded block by block without reading them into a buffer
+    first.
+    """
+    if isinstance(fixed_source, six.string_types):
+        is_mapped = False
+        if _is_single_byte_encoding(encoding):
+            with _mapped_data(fixed_source) as mapped:
+                if mapped is not None:
+                    is_mapped = True
+                    for block in _mapped_text_blocks(mapped, encoding, block_size):
+                        yield block
+        if not is_mapped:
+            # Read line delimiters as they are instead of converting them.
+            with io.open(fixed_source, 'r', encoding=encoding, newline='') as fixed_file:
+                for block in iter(lambda: fixed_file.read(block_size), ''):
+                    yield block
+    else:
+        for block in iter(lambda: fixed_source.read(block_size), ''):
+            # Ensure that the input is a text file, `io.StringIO` or something similar.
+            assert isinstance(block, six.text_type), \
+                '%s: fixed_source must yield strings but got type %s, value %r' % (location, type(block), block)
+            yield block
+
+
+def _block_fixed_rows(fixed_source, encoding, field_name_and_lengths, line_delimiter):
+    """
+    Same as :py:func:`fixed_rows` for a specific ``line_delimiter`` but
+    reading large blocks of records at once.
+    """
+    assert line_delimiter != data.ANY
+
+    location = errors.Location(fixed_source, has_column=True)
+    record_length = _fixed_record_length(field_name_and_lengths, line_delimiter)
+    block_size = max(1, _FIXED_BLOCK_SIZE // record_length) * record_length
+    pending_text = ''
+    for block in _fixed_text_blocks(fixed_source, encoding, block_size, location):
+        fixed_text = pending_text + block
+        complete_records_length = len(fixed_text) - (len(fixed_text) % record_length)
+        if complete_records_length > 0:
+            for row in _sliced_fixed_rows(
+                    fixed_text[:complete_records_length], location, field_name_and_lengths, line_delimiter):
+                yield row
+            location.advance_line(complete_records_length // record_length)
+        pending_text = fixed_text[complete_records_length:]
+    # Process the remaining text, which might be an incomplete record.
+    if pending_text:
+        for row in _sliced_fixed_rows(pending_text, location, field_name_and_lengths, line_delimiter):
+            yield row
+
+
+def fixed_shards(fixed_path, encoding, field_name_and_lengths, line_delimiter, shard_size):
+    """
+    Byte ranges ``(start, end)`` of about ``shard_size`` bytes each that
+    split the fixed data file ``fixed_path`` into shards of complete records
+    that can be read independently by :py:func:`fixed_shard_rows`.
+
+    This requires all records to have the same number of bytes, so
+    ``line_delimiter`` must not be ``'any'`` and ``encoding`` has to use a
+    single byte per character. Furthermore the first record has to end with
+    ``line_delimiter``. Otherwise the result is a single shard covering the
+    whole file.
+    """
+    assert fixed_path is not None
+    assert encoding is not None
+    assert line_delimiter in _VALID_FIXED_LINE_DELIMITERS
+    assert shard_size >= 1
+
+    file_size = os.path.getsize(fixed_path)
+    result = [(0, file_size)]
+    if (line_delimiter != data.ANY) and _is_single_byte_encoding(encoding):
+        record_length = _fixed_record_length(field_name_and_lengths, line_delimiter)
+        has_proper_first_line_delimiter = True
+        if line_delimiter is not None:
+            with io.open(fixed_path, 'rb') as fixed_stream:
+                first_record = fixed_stream.read(record_length)
+            if len(first_record) == record_length:
+                has_proper_first_line_delimiter = first_record.endswith(line_delimiter.encode(encoding))
+        if has_proper_first_line_delimiter:
+            records_per_shard = max(1, shard_size // record_length)
+            shard_length = records_per_shard * record_length
+            result = [
+                (shard_start, min(shard_start + shard_length, file_size))
+                for shard_start in range(0, file_size, shard_length)
+            ] or result
+    return result
+
+
+def fixed_shard_rows(fixed_path, encoding, field_name_and_lengths, line_delimiter, start, end):
+    """
+    Rows in the shard of ``fixed_path`` between the byte offsets ``start``
+    and ``end`` as computed by :py:func:`fixed_shards`. Locations in a
+    possible :py:exc:`cutplace.errors.DataFormatError` are relative to
+    ``start``.
+
+    :raises cutplace.errors.DataFormatError: if the shard is not valid \
+      fixed data
+    """
+    assert fixed_path is not None
+    assert encoding is not None
+    assert line_delimiter != data.ANY
+    assert 0 <= start <= end
+
+    shard_text = _decoded_shard(fixed_path, encoding, start, end)
+    location = errors.Location(fixed_path, has_column=True)
+    for row in _sliced_fixed_rows(shard_text, location, field_name_and_lengths, line_delimiter):
+        yield row
+
+
 def auto_rows(source):
     """
     Determine basic data format of `source` based on heuristics and return its contents.
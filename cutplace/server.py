@@ -0,0 +1,404 @@
+"""
+A server that validates data with CIDs kept in memory, so validating many
+small files does not have to wait for Python to start and CIDs to be read
+each time.
+
+Clients send validation jobs by HTTP to a local port or a Unix domain
+socket. A job is a JSON object that is ``POST``-ed to ``/validate``, for
+example::
+
+  {"cid": "/data/cid_customers.ods", "data": ["/data/customers_1.csv", "/data/customers_2.csv"]}
+
+The data files are validated by a pool of worker processes. For each data
+file, the response contains a line with a JSON object as soon as it has
+been validated, for example::
+
+  {"cid": "/data/cid_customers.ods", "data": "/data/customers_1.csv", "valid": true, "accepted": 12, "error": null}
+
+Paths are read by the server, so relative paths refer to its current
+folder. A ``GET`` of ``/status`` results in a single line
+``{"status": "ok"}``, which can be used to check that the server is up.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import errno
+import json
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import socket
+import stat
+
+import six
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from cutplace import checks
+from cutplace import errors
+from cutplace import interface
+from cutplace import validio
+
+#: Host the server listens on if the address only specifies a port.
+DEFAULT_HOST = '127.0.0.1'
+
+#: Content type of responses, one JSON object per line.
+JSON_LINES_CONTENT_TYPE = 'application/x-ndjson'
+
+_HOST_AND_PORT_REGEX = re.compile(r'^(?:(?P<host>[^:/]+):)?(?P<port>\d+)$')
+
+_log = logging.getLogger('cutplace.server')
+
+# Options and CIDs of a worker process, set up by `_init_worker()`.
+_worker_options = None
+_worker_path_to_cid_map = {}
+
+
+def parsed_address(address_text):
+    """
+    The address described by ``address_text`` in a form suitable for
+    :py:class:`~cutplace.server.ValidationServer`:
+
+    * ``PORT``: a tuple ``(DEFAULT_HOST, PORT)``
+    * ``HOST:PORT``: a tuple ``(HOST, PORT)``
+    * anything else: the path of a Unix domain socket
+
+    :raises ValueError: if ``address_text`` is empty or specifies an \
+      invalid port
+    """
+    assert address_text is not None
+
+    if address_text.strip() == '':
+        raise ValueError('address must not be empty')
+    host_and_port_match = _HOST_AND_PORT_REGEX.match(address_text)
+    if host_and_port_match is not None:
+        port = int(host_and_port_match.group('port'))
+        if port > 65535:
+            raise ValueError('port must be at most 65535 but is %d' % port)
+        result = (host_and_port_match.group('host') or DEFAULT_HOST, port)
+    else:
+        result = address_text
+    return result
+
+
+def _init_worker(options, cid_paths):
+    global _worker_options
+
+    # Leave handling Ctrl+C to the server process.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_options = options
+    _worker_path_to_cid_map.clear()
+    for cid_path in cid_paths:
+        _worker_cid(cid_path)
+
+
+def _modification_times(paths):
+    """
+    List of the modification times of ``paths`` with ``None`` for paths
+    that do not exist.
+    """
+    result = []
+    for path in paths:
+        try:
+            result.append(os.path.getmtime(path))
+        except OSError:
+            result.append(None)
+    return result
+
+
+def _worker_cid(cid_path):
+    """
+    The CID stored in ``cid_path``, which is only read again if its
+    modification time or the one of any other file read to declare it (see
+    :py:attr:`cutplace.interface.Cid.external_paths`) has changed since the
+    last time.
+    """
+    absolute_cid_path = os.path.abspath(cid_path)
+    cid_modification_times = [os.path.getmtime(absolute_cid_path)]
+    modification_times_and_cid = _worker_path_to_cid_map.get(absolute_cid_path)
+    if modification_times_and_cid is not None:
+        previous_modification_times, previous_cid = modification_times_and_cid
+        if previous_modification_times != \
+                cid_modification_times + _modification_times(previous_cid.external_paths):
+            modification_times_and_cid = None
+    if modification_times_and_cid is None:
+        _log.info('read CID from "%s"', cid_path)
+        cid_cache_folder = _worker_options['cid_cache_folder']
+        if cid_cache_folder is not None:
+            cid = interface.cached_cid(cid_path, cid_cache_folder)
+        else:
+            cid = interface.Cid(cid_path)
+        for check in cid.check_map.values():
+            if isinstance(check, checks.IsUniqueCheck):
+                check.max_keys_in_memory = _worker_options['max_unique_keys_in_memory']
+        modification_times = cid_modification_times + _modification_times(cid.external_paths)
+        modification_times_and_cid = (modification_times, cid)
+        _worker_path_to_cid_map[absolute_cid_path] = modification_times_and_cid
+    return modification_times_and_cid[1]
+
+
+def _validation_result(cid_path_and_data_path):
+    """
+    Result of validating a data file in a worker process as :py:class:`dict`
+    that can be converted to JSON.
+    """
+    assert _worker_options is not None
+
+    cid_path, data_path = cid_path_and_data_path
+    accepted_rows_count = 0
+    error_text = None
+    try:
+        try:
+            cid = _worker_cid(cid_path)
+        except (EnvironmentError, OSError) as error:
+            raise EnvironmentError('cannot read CID %r: %s' % (cid_path, error))
+        reader = validio.Reader(
+            cid, data_path, validate_until=_worker_options['validate_until'],
+            validation_cache_size=_worker_options['validation_cache_size'])
+        try:
+            with reader:
+                reader.validate_rows()
+        except (EnvironmentError, OSError) as error:
+            raise EnvironmentError('cannot read data file %r: %s' % (data_path, error))
+        finally:
+            accepted_rows_count = reader.accepted_rows_count or 0
+    except (EnvironmentError, OSError, errors.CutplaceError) as error:
+        error_text = six.text_type(error)
+    except Exception as error:
+        # Report unexpected errors as result too, otherwise the response would end without one.
+        _log.exception('cannot validate data file %r', data_path)
+        error_text = 'cannot validate data file %r: %s' % (data_path, error)
+    return {
+        'cid': cid_path,
+        'data': data_path,
+        'valid': error_text is None,
+        'accepted': accepted_rows_count,
+        'error': error_text,
+    }
+
+
+def _cid_path_and_data_paths(job):
+    """
+    Tuple ``(cid_path, data_paths)`` from the JSON object ``job``.
+
+    :raises ValueError: if ``job`` is broken
+    """
+    if not isinstance(job, dict):
+        raise ValueError('job must be a JSON object but is: %s' % json.dumps(job))
+    cid_path = job.get('cid')
+    if not isinstance(cid_path, six.string_types):
+        raise ValueError('job must specify the path of a CID as text with "cid"')
+    data_paths = job.get('data')
+    if isinstance(data_paths, six.string_types):
+        data_paths = [data_paths]
+    if not isinstance(data_paths, list) or \
+            not all(isinstance(data_path, six.string_types) for data_path in data_paths):
+        raise ValueError('job must specify the data path(s) as text or list of texts with "data"')
+    return cid_path, data_paths
+
+
+class _ValidationRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def _write_json_line(self, json_object):
+        self.wfile.write((json.dumps(json_object) + '\n').encode('utf-8'))
+
+    def _send_json_lines_headers(self, status):
+        self.send_response(status)
+        self.send_header('Content-Type', JSON_LINES_CONTENT_TYPE)
+        self.end_headers()
+
+    def _send_error_line(self, status, message):
+        self._send_json_lines_headers(status)
+        self._write_json_line({'error': message})
+
+    def do_GET(self):
+        if self.path == '/status':
+            self._send_json_lines_headers(200)
+            self._write_json_line({'status': 'ok'})
+        else:
+            self._send_error_line(404, 'path must be /status but is: %s' % self.path)
+
+    def do_POST(self):
+        if self.path == '/validate':
+            try:
+                content_length = int(self.headers.get('Content-Length') or 0)
+                job = json.loads(self.rfile.read(content_length).decode('utf-8'))
+                cid_path, data_paths = _cid_path_and_data_paths(job)
+            except ValueError as error:
+                self._send_error_line(400, 'cannot process job: %s' % error)
+            else:
+                self._send_json_lines_headers(200)
+                try:
+                    for result in self.server.validation_server.validation_results(cid_path, data_paths):
+                        self._write_json_line(result)
+                        self.wfile.flush()
+                except Exception as error:
+                    # The status has already been sent, so the client can only learn about the error from a line.
+                    _log.exception('cannot process job')
+                    self._write_json_line({'error': 'cannot process job: %s' % error})
+        else:
+            self._send_error_line(404, 'path must be /validate but is: %s' % self.path)
+
+    def address_string(self):
+        # Clients of Unix domain sockets have no address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'local'
+
+    def log_message(self, format, *args):
+        _log.debug('%s: %s', self.address_string(), format % args)
+
+
+def _remove_stale_unix_socket(socket_path):
+    """
+    Remove the Unix domain socket ``socket_path`` if no server listens on
+    it anymore, for example because the server that created it crashed.
+    """
+    try:
+        is_socket = stat.S_ISSOCK(os.stat(socket_path).st_mode)
+    except OSError:
+        is_socket = False
+    if is_socket:
+        probe_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe_socket.connect(socket_path)
+        except socket.error as error:
+            if error.errno == errno.ECONNREFUSED:
+                _log.info('remove stale socket "%s"', socket_path)
+                os.remove(socket_path)
+        finally:
+            probe_socket.close()
+
+
+class _HttpServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixHttpServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:  # pragma: no cover
+    _UnixHttpServer = None
+
+
+class ValidationServer(object):
+    """
+    Server listening on ``address`` for validation jobs as described in
+    :py:mod:`cutplace.server`. The address can be a tuple ``(host, port)``
+    or the path of a Unix domain socket, see
+    :py:func:`~cutplace.server.parsed_address`. A port of 0 picks any free
+    port, which :py:attr:`~.address` reflects once the server has been
+    created.
+
+    Data files are validated by ``workers`` processes. Each of them keeps
+    the CIDs it has read in memory and only reads them again if they or
+    files with choices they refer to changed. The CIDs in ``cid_paths`` are
+    read by each worker right away.
+    The remaining parameters are the same as for
+    :py:class:`cutplace.validio.Reader`,
+    :py:attr:`cutplace.checks.IsUniqueCheck.max_keys_in_memory` and
+    :py:func:`cutplace.interface.cached_cid`.
+
+    The server is a context manager. Leaving the ``with`` block stops the
+    workers and removes the Unix domain socket. A socket left over by a
+    server that crashed is removed before listening on it again.
+    """
+    def __init__(
+            self, address, workers=1, cid_paths=(), validate_until=None, validation_cache_size=None,
+            max_unique_keys_in_memory=None, cid_cache_folder=None):
+        assert address is not None
+        assert workers >= 1
+
+        if isinstance(address, six.string_types):
+            if _UnixHttpServer is None:  # pragma: no cover
+                raise EnvironmentError('Unix domain sockets are not supported on this platform: %r' % address)
+            _remove_stale_unix_socket(address)
+            self._unix_socket_path = address
+            self._http_server = _UnixHttpServer(address, _ValidationRequestHandler)
+        else:
+            self._unix_socket_path = None
+            self._http_server = _HttpServer(address, _ValidationRequestHandler)
+        self._http_server.validation_server = self
+        worker_options = {
+            'cid_cache_folder': cid_cache_folder,
+            'max_unique_keys_in_memory': max_unique_keys_in_memory,
+            'validate_until': validate_until,
+            'validation_cache_size': validation_cache_size,
+        }
+        try:
+            self._pool = multiprocessing.Pool(workers, _init_worker, (worker_options, list(cid_paths)))
+        except Exception:
+            self._close_http_server()
+            raise
+        self._is_closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def address(self):
+        """
+        The address the server listens on, either as tuple ``(host, port)``
+        or as path of a Unix domain socket.
+        """
+        return self._http_server.server_address
+
+    def validation_results(self, cid_path, data_paths):
+        """
+        Results of validating ``data_paths`` with the CID stored in
+        ``cid_path`` as described in :py:mod:`cutplace.server`, produced
+        in the same order as ``data_paths``.
+        """
+        assert cid_path is not None
+        assert data_paths is not None
+
+        return self._pool.imap(_validation_result, [(cid_path, data_path) for data_path in data_paths])
+
+    def serve_forever(self):
+        """
+        Process requests until :py:meth:`~.shutdown` is called.
+        """
+        self._http_server.serve_forever()
+
+    def shutdown(self):
+        """
+        Stop :py:meth:`~.serve_forever`, which must run in a different
+        thread.
+        """
+        self._http_server.shutdown()
+
+    def _close_http_server(self):
+        self._http_server.server_close()
+        if self._unix_socket_path is not None and os.path.exists(self._unix_socket_path):
+            os.remove(self._unix_socket_path)
+
+    def close(self):
+        """
+        Stop the workers and release all resources. When called a second
+        time, do nothing.
+        """
+        if not self._is_closed:
+            try:
+                self._pool.terminate()
+                self._pool.join()
+            finally:
+                self._close_http_server()
+            self._is_closed = True
@@ -20,26 +20,469 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
+import copy
+import functools
+import io
 import itertools
+import multiprocessing
+import os
+import sys
 
 import six
 
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Without resource module (for example on Windows) the peak memory is unknown.
+    resource = None
+
 from cutplace import data
 from cutplace import errors
+from cutplace import fields
 from cutplace import interface
 from cutplace import rowio
 from cutplace import _compat
+from cutplace import _tools
+
+#: Default number of rows in a batch produced by :py:meth:`cutplace.validio.Reader.row_batches`.
+DEFAULT_ROW_BATCH_SIZE = 10000
+
+#: Phase of a validation measured by :py:class:`ValidationStatistics`:
+#: reading the CID (if passed as path) and preparing it for validation.
+PHASE_CID = 'cid'
+#: Phase of a validation measured by :py:class:`ValidationStatistics`:
+#: reading and parsing the rows of the data.
+PHASE_READ = 'read'
+#: Phase of a validation measured by :py:class:`ValidationStatistics`:
+#: validating fields according to their format.
+PHASE_FIELDS = 'fields'
+#: Phase of a validation measured by :py:class:`ValidationStatistics`:
+#: performing row checks.
+PHASE_ROW_CHECKS = 'row_checks'
+#: Phase of a validation measured by :py:class:`ValidationStatistics`:
+#: performing checks at the end of the data.
+PHASE_END_CHECKS = 'end_checks'
+#: All phases of a validation in the order they are performed.
+PHASES = (PHASE_CID, PHASE_READ, PHASE_FIELDS, PHASE_ROW_CHECKS, PHASE_END_CHECKS)
 
 # Valid choices for ``on_error`` parameter.
 _VALID_ON_ERROR_CHOICES = ('continue', 'raise', 'yield')
 
+# Functions to measure wall and CPU time in seconds.
+_wall_time = _tools.wall_time
+_cpu_time = _tools.cpu_time
+
+# Factor to convert ``ru_maxrss`` to bytes, which is in kilobytes except on Mac OS X.
+_MAX_RSS_TO_BYTES_FACTOR = 1 if sys.platform == 'darwin' else 1024
+
+# Approximate number of bytes per shard when reading data with multiple
+# workers.
+_SHARD_SIZE = 16 * 1024 * 1024
+
+# Number of shards per worker that can be pending at the same time; this
+# limits the memory needed for rows that wait to be passed on in order.
+_PENDING_SHARDS_PER_WORKER = 2
+
+# Validation state of a worker process started by a ``Reader`` with
+# ``workers`` > 1; see `_init_shard_worker()`.
+_shard_cid = None
+_shard_field_names_and_lengths = None
+_shard_validation_plan = None
+
+
+class ValidationPlan(object):
+    """
+    The field formats and row checks of a CID compiled into flat lists of
+    prebound functions that can validate many rows with little overhead
+    per field.
+
+    The plan is meant to be built once before validating a sequence of
+    rows. Changes to the CID after that are not taken into account.
+
+    Fields with a
+    :py:attr:`~cutplace.fields.AbstractFieldFormat.validation_cache_size`
+    remember their validation results in a
+    :py:class:`~cutplace.fields.ValidationCache`. If
+    ``validation_cache_size`` is not ``None``, all other fields use an
+    adaptive cache of this size, which gives up on fields with too many
+    distinct values.
+    """
+    def __init__(self, cid, validation_cache_size=None):
+        assert cid is not None
+        assert (validation_cache_size is None) or (validation_cache_size >= 1)
+
+        self._field_names = list(cid.field_names)
+        self._expected_item_count = len(cid.field_formats)
+        self._field_names_and_validateds = []
+        self._field_names_and_validation_caches = []
+        self._column_validateds = []
+        for field_format in cid.field_formats:
+            validated = field_format.compiled_validated()
+            if field_format.validation_cache_size is not None:
+                validation_cache = fields.ValidationCache(field_format.validation_cache_size)
+            elif validation_cache_size is not None:
+                validation_cache = fields.ValidationCache(validation_cache_size, is_adaptive=True)
+            else:
+                validation_cache = None
+            if validation_cache is not None:
+                validated = validation_cache.cached(validated)
+                self._field_names_and_validation_caches.append((field_format.field_name, validation_cache))
+                self._column_validateds.append(functools.partial(_cached_validated_column, validated))
+            else:
+                self._column_validateds.append(field_format.validated_column)
+            self._field_names_and_validateds.append((field_format.field_name, validated))
+        self._check_names_and_check_rows = [
+            (check_name, cid.check_map[check_name].check_row) for check_name in cid.check_names]
+        self._check_name_to_rejected_rows_count_map = collections.Counter()
+
+    @property
+    def field_names_and_validation_caches(self):
+        """
+        List of tuples ``(field_name, validation_cache)`` for all fields
+        that use a :py:class:`~cutplace.fields.ValidationCache`.
+        """
+        return self._field_names_and_validation_caches
+
+    def validate_row(self, row, location):
+        """
+        Validate ``row`` the same way as
+        :py:meth:`cutplace.validio.BaseValidator.validate_row` does. Unless
+        an error is found, ``location`` remains unchanged.
+        """
+        self.validate_fields(row, location)
+        self.check_row(row, location)
+
+    def validate_fields(self, row, location):
+        """
+        Validate that ``row`` has the expected number of items and that each
+        item conforms to its field format.
+        """
+        self.validated_fields(row, location)
+
+    def validated_fields(self, row, location):
+        """
+        Same as :py:meth:`~.validate_fields` but return a list with the
+        native value of each field as computed by
+        :py:meth:`cutplace.fields.AbstractFieldFormat.validated`.
+        """
+        assert row is not None
+        assert location is not None
+
+        actual_item_count = len(row)
+        if actual_item_count != self._expected_item_count:
+            if actual_item_count < self._expected_item_count:
+                raise errors.DataError(
+                    'row must contain %d fields but only has %d: %s'
+                    % (self._expected_item_count, actual_item_count, row),
+                    location)
+            raise errors.DataError(
+                'row must contain %d fields but has %d, additional values are: %s'
+                % (self._expected_item_count, actual_item_count, row[self._expected_item_count:]),
+                location)
+
+        # Validate each field according to its format.
+        result = []
+        text_type = six.text_type
+        for field_index, field_value in enumerate(row):
+            field_name, validated = self._field_names_and_validateds[field_index]
+            try:
+                if not isinstance(field_value, text_type):
+                    raise errors.FieldValueError(
+                        'type must be %s instead of %s: %s'
+                        % (text_type.__name__, type(field_value).__name__, _compat.text_repr(field_value)))
+                result.append(validated(field_value))
+            except errors.FieldValueError as error:
+                location.set_cell(field_index)
+                error.prepend_message('cannot accept field %s' % _compat.text_repr(field_name), location)
+                location.set_cell(0)
+                raise
+        return result
+
+    def validate_batch(self, rows, location):
+        """
+        Validate the fields of all ``rows`` the same way as
+        :py:meth:`~.validate_fields` does but column by column using
+        :py:meth:`cutplace.fields.AbstractFieldFormat.validated_column`. In
+        case any field is broken, the rows are validated again one after
+        another in order to report the same errors as
+        :py:meth:`~.validate_fields`.
+
+        :param cutplace.errors.Location location: the location of the first \
+          row in ``rows``, which remains unchanged
+        :return: list with either a :py:exc:`cutplace.errors.DataError` or \
+          ``None`` for each row in ``rows``
+        """
+        return self._validated_batch(rows, location, False)[1]
+
+    def validated_batch(self, rows, location):
+        """
+        Same as :py:meth:`~.validate_batch` but also collect the native
+        values of the fields.
+
+        :return: tuple ``(native_rows, field_errors)`` where \
+          ``native_rows`` is a list with either a tuple of the native \
+          values or ``None`` for each row in ``rows``, and \
+          ``field_errors`` is the same as the result of \
+          :py:meth:`~.validate_batch`
+        """
+        return self._validated_batch(rows, location, True)
+
+    def _validated_batch(self, rows, location, with_native_rows):
+        assert rows is not None
+        assert location is not None
+
+        if all(len(row) == self._expected_item_count for row in rows):
+            text_types = itertools.repeat(six.text_type)
+            native_columns = []
+            try:
+                for column, column_validated in zip(zip(*rows), self._column_validateds):
+                    if not all(map(isinstance, column, text_types)):
+                        break
+                    native_columns.append(column_validated(column))
+                else:
+                    native_rows = list(zip(*native_columns)) if with_native_rows else None
+                    return native_rows, [None] * len(rows)
+            except errors.FieldValueError:
+                pass
+
+        native_rows = [] if with_native_rows else None
+        field_errors = []
+        row_location = copy.copy(location)
+        for row in rows:
+            native_row = None
+            field_error = None
+            try:
+                native_row = tuple(self.validated_fields(row, row_location))
+            except errors.DataError as error:
+                field_error = error
+            if with_native_rows:
+                native_rows.append(native_row)
+            field_errors.append(field_error)
+            row_location.advance_line()
+        return native_rows, field_errors
+
+    @property
+    def check_name_to_rejected_rows_count_map(self):
+        """
+        :py:class:`collections.Counter` with the number of rows each check
+        rejected in :py:meth:`~.check_row`.
+        """
+        return self._check_name_to_rejected_rows_count_map
+
+    @property
+    def has_row_checks(self):
+        """
+        ``True`` if the CID has any checks that validate each row.
+        """
+        return bool(self._check_names_and_check_rows)
+
+    def check_row(self, row, location):
+        """
+        Validate that ``row`` conforms to all row checks. Rows rejected by a
+        check are counted in :py:attr:`check_name_to_rejected_rows_count_map`.
+        """
+        assert row is not None
+        assert location is not None
+
+        if self._check_names_and_check_rows:
+            field_map = dict(zip(self._field_names, row))
+            for check_name, check_row in self._check_names_and_check_rows:
+                try:
+                    check_row(field_map, location)
+                except errors.CheckError:
+                    self._check_name_to_rejected_rows_count_map[check_name] += 1
+                    raise
+
+
+class ValidationStatistics(object):
+    """
+    Performance statistics of reading and validating data with a
+    :py:class:`~cutplace.validio.Reader`, for example to figure out if a
+    slow validation is caused by reading the data, a particular field or
+    the checks.
+
+    The time spent on each of the :py:data:`PHASES` is measured as wall
+    time and CPU time in seconds, provided the reader has been created with
+    ``collect_statistics=True``; otherwise it remains 0. Phases performed by worker processes
+    (see ``workers`` of :py:class:`~cutplace.validio.Reader`) are summed
+    up over all workers, so they can add up to more than the total time.
+    """
+    def __init__(self):
+        #: Number of rows that passed validation.
+        self.accepted_rows_count = 0
+        #: Number of rows that were rejected.
+        self.rejected_rows_count = 0
+        #: Number of rejected rows for each field with a broken value.
+        self.field_name_to_rejected_rows_count_map = collections.Counter()
+        #: Number of rejected rows for each check that failed.
+        self.check_name_to_rejected_rows_count_map = collections.Counter()
+        #: Number of rows rejected for other reasons, for example because
+        #: of a wrong number of fields.
+        self.other_rejected_rows_count = 0
+        #: Size of the data in bytes if they are read from a path, otherwise
+        #: ``None``.
+        self.bytes_read = None
+        #: Wall time in seconds from creating the reader until closing it.
+        self.wall_time = 0.0
+        #: CPU time in seconds from creating the reader until closing it.
+        self.cpu_time = 0.0
+        #: Maximum memory used by the process (and its terminated workers)
+        #: so far in bytes or ``None`` if it cannot be determined.
+        self.peak_rss = None
+        #: Wall time in seconds for each of the :py:data:`PHASES`.
+        self.phase_to_wall_time_map = dict((phase, 0.0) for phase in PHASES)
+        #: CPU time in seconds for each of the :py:data:`PHASES`.
+        self.phase_to_cpu_time_map = dict((phase, 0.0) for phase in PHASES)
+
+    def add_phase_time(self, phase, wall_time, cpu_time):
+        """
+        Add ``wall_time`` and ``cpu_time`` (both in seconds) to ``phase``.
+        """
+        assert phase in PHASES, 'phase=%r' % phase
+
+        self.phase_to_wall_time_map[phase] += wall_time
+        self.phase_to_cpu_time_map[phase] += cpu_time
+
+    @property
+    def rows_per_second(self):
+        """
+        Number of accepted and rejected rows per second of :py:attr:`wall_time`
+        or ``None`` if no time has been measured.
+        """
+        if self.wall_time > 0:
+            result = (self.accepted_rows_count + self.rejected_rows_count) / self.wall_time
+        else:
+            result = None
+        return result
+
+    def as_dict(self):
+        """
+        The statistics as :py:class:`dict` that can be converted to JSON.
+        """
+        return {
+            'accepted_rows': self.accepted_rows_count,
+            'rejected_rows': self.rejected_rows_count,
+            'rejected_rows_by_field': dict(self.field_name_to_rejected_rows_count_map),
+            'rejected_rows_by_check': dict(self.check_name_to_rejected_rows_count_map),
+            'other_rejected_rows': self.other_rejected_rows_count,
+            'rows_per_second': self.rows_per_second,
+            'bytes_read': self.bytes_read,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'peak_rss': self.peak_rss,
+            'phases': dict(
+                (phase, {'wall_time': self.phase_to_wall_time_map[phase], 'cpu_time': self.phase_to_cpu_time_map[phase]})
+                for phase in PHASES),
+        }
+
+
+def _peak_rss():
+    """
+    Maximum memory used by this process or any of its terminated child
+    processes in bytes, or ``None`` if it cannot be determined.
+    """
+    if resource is not None:
+        max_rss = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+        result = max_rss * _MAX_RSS_TO_BYTES_FACTOR
+    else:  # pragma: no cover
+        result = None
+    return result
+
+
+def _cached_validated_column(cached_validated, values):
+    return [cached_validated(value) for value in values]
+
+
+def _init_shard_worker(cid, validation_cache_size):
+    global _shard_cid
+    global _shard_field_names_and_lengths
+    global _shard_validation_plan
 
-def _create_field_map(field_names, field_values):
-    assert field_names
-    assert field_values
-    assert len(field_names) == len(field_values)
+    _shard_cid = cid
+    if cid.data_format.format == data.FORMAT_FIXED:
+        _shard_field_names_and_lengths = interface.field_names_and_lengths(cid)
+    _shard_validation_plan = ValidationPlan(cid, validation_cache_size)
 
-    return dict(zip(field_names, field_values))
+
+def _shard_rows(source_path, start, end):
+    data_format = _shard_cid.data_format
+    if data_format.format == data.FORMAT_DELIMITED:
+        result = rowio.delimited_shard_rows(source_path, data_format, start, end)
+    else:
+        assert data_format.format == data.FORMAT_FIXED
+        result = rowio.fixed_shard_rows(
+            source_path, data_format.encoding, _shard_field_names_and_lengths, data_format.line_delimiter,
+            start, end)
+    return result
+
+
+def _validated_shard(source_path, start, end, with_native_rows=False):
+    """
+    Rows of the shard of ``source_path`` between the byte offsets ``start``
+    and ``end`` with their fields validated in a worker process.
+
+    The result is a tuple ``(rows_and_errors, data_format_error,
+    phase_times)`` where ``rows_and_errors`` is a list of tuples
+    ``(row, native_row, error)``
+    with ``error`` being ``None`` for valid rows and ``native_row`` being
+    a tuple of the native field values of valid rows in case
+    ``with_native_rows`` is ``True`` and ``None`` otherwise. Plain tuples
+    are used because instances of :py:attr:`cutplace.validio.Reader.row_type`
+    cannot be pickled. ``data_format_error`` is a
+    :py:exc:`cutplace.errors.DataFormatError` that prevented reading the
+    remaining rows of the shard or ``None``. Locations are relative to the
+    beginning of the shard. ``phase_times`` is a list of tuples
+    ``(phase, wall_time, cpu_time)`` for reading and validating the shard.
+    """
+    assert _shard_cid is not None
+
+    location = errors.Location(source_path, has_cell=True)
+    rows = []
+    rows_and_errors = []
+    data_format_error = None
+    wall_start_time = _wall_time()
+    cpu_start_time = _cpu_time()
+    try:
+        for row in _shard_rows(source_path, start, end):
+            rows.append(row)
+    except errors.DataFormatError as error:
+        data_format_error = error
+    wall_read_time = _wall_time()
+    cpu_read_time = _cpu_time()
+    for row in rows:
+        try:
+            if with_native_rows:
+                native_row = tuple(_shard_validation_plan.validated_fields(row, location))
+            else:
+                _shard_validation_plan.validate_fields(row, location)
+                native_row = None
+            rows_and_errors.append((row, native_row, None))
+        except errors.DataError as error:
+            rows_and_errors.append((row, None, error))
+        location.advance_line()
+    phase_times = [
+        (PHASE_READ, wall_read_time - wall_start_time, cpu_read_time - cpu_start_time),
+        (PHASE_FIELDS, _wall_time() - wall_read_time, _cpu_time() - cpu_read_time),
+    ]
+    return rows_and_errors, data_format_error, phase_times
+
+
+def _line_feed_count(source_path, end):
+    """
+    Number of line feeds in the first ``end`` bytes of ``source_path``.
+    """
+    result = 0
+    with io.open(source_path, 'rb') as source_stream:
+        remaining_size = end
+        while remaining_size > 0:
+            block = source_stream.read(min(remaining_size, 1024 * 1024))
+            assert block
+            result += block.count(b'\n')
+            remaining_size -= len(block)
+    return result
 
 
 class BaseValidator(object):
@@ -56,7 +499,7 @@ class BaseValidator(object):
     It also provides a context manager and can consequently be used with the
     ``with`` statement.
     """
-    def __init__(self, cid_or_path):
+    def __init__(self, cid_or_path, validation_cache_size=None):
         assert cid_or_path is not None
 
         if isinstance(cid_or_path, six.string_types):
@@ -65,7 +508,8 @@ class BaseValidator(object):
             self._cid = cid_or_path
             assert self._cid.data_format.is_valid, \
                 'DataFormat.validate() must be called before using a CID for validation'
-        self._expected_item_count = len(self._cid.field_formats)
+        self._validation_cache_size = validation_cache_size
+        self._validation_plan = ValidationPlan(self._cid, validation_cache_size)
         self._location = None
         self._is_closed = False
 
@@ -96,6 +540,17 @@ class BaseValidator(object):
         """
         return self._location
 
+    @property
+    def field_names_and_validation_caches(self):
+        """
+        List of tuples ``(field_name, validation_cache)`` for all fields
+        that remember their validation results in a
+        :py:class:`~cutplace.fields.ValidationCache`. Caches used by other
+        processes to validate data with multiple ``workers`` are not
+        included.
+        """
+        return self._validation_plan.field_names_and_validation_caches
+
     def validate_row(self, row):
         """
         Validate a single ``row``:
@@ -115,39 +570,7 @@ class BaseValidator(object):
         assert row is not None
         assert self.location is not None
 
-        # Validate that number of fields.
-        actual_item_count = len(row)
-        if actual_item_count < self._expected_item_count:
-            raise errors.DataError(
-                'row must contain %d fields but only has %d: %s'
-                % (self._expected_item_count, actual_item_count, row),
-                self.location)
-        if actual_item_count > self._expected_item_count:
-            raise errors.DataError(
-                'row must contain %d fields but has %d, additional values are: %s'
-                % (self._expected_item_count, actual_item_count, row[self._expected_item_count:]),
-                self.location)
-
-        # Validate each field according to its format.
-        for field_index, field_value in enumerate(row):
-            self.location.set_cell(field_index)
-            field_to_validate = self.cid.field_formats[field_index]
-            try:
-                if not isinstance(field_value, six.text_type):
-                    raise errors.FieldValueError(
-                        'type must be %s instead of %s: %s'
-                        % (six.text_type.__name__, type(field_value).__name__, _compat.text_repr(field_value)))
-                field_to_validate.validated(field_value)
-            except errors.FieldValueError as error:
-                error.prepend_message(
-                    'cannot accept field %s' % _compat.text_repr(field_to_validate.field_name), self.location)
-                raise
-
-        # Validate the whole row according to row checks.
-        self.location.set_cell(0)
-        field_map = _create_field_map(self.cid.field_names, row)
-        for check_name in self.cid.check_names:
-            self.cid.check_map[check_name].check_row(field_map, self.location)
+        self._validation_plan.validate_row(row, self.location)
 
     def close(self):
         """
@@ -168,7 +591,9 @@ class BaseValidator(object):
 
 
 class Reader(BaseValidator):
-    def __init__(self, cid_or_path, source_data_stream_or_path, on_error='raise', validate_until=None):
+    def __init__(
+            self, cid_or_path, source_data_stream_or_path, on_error='raise', validate_until=None, workers=1,
+            validation_cache_size=None, collect_statistics=False):
         """
         An iterator that produces possibly validated rows from
         ``source_data_stream_or_path`` conforming to ``cid_or_path``.
@@ -185,13 +610,40 @@ class Reader(BaseValidator):
           ``None`` all rows should be validated (the default); 0 means no \
           rows should be validated
         :type: int or None
+        :param int workers: number of processes to validate the data; \
+          values above 1 only have an effect on delimited or fixed data \
+          read from a path without ``validate_until``, which is split into \
+          shards \
+          validated in parallel; the rows still are produced in the same \
+          order and row checks are performed for all rows together, so the \
+          result is the same as with a single process
+        :param validation_cache_size: number of distinct values to \
+          remember the validation results for in fields without a \
+          :py:attr:`~cutplace.fields.AbstractFieldFormat.validation_cache_size` \
+          of their own; fields with too many distinct values stop caching \
+          after a while; ``None`` means only fields with their own \
+          cache size are cached (the default)
+        :type: int or None
+        :param bool collect_statistics: if ``True``, measure the time \
+          spent reading the data, validating fields and performing checks \
+          for the :py:attr:`~.statistics`; this slows down validation \
+          noticeably, so by default only the rejected rows, total time and \
+          memory are collected
         """
         assert cid_or_path is not None
         assert source_data_stream_or_path is not None
         assert on_error in _VALID_ON_ERROR_CHOICES, 'on_error=%r' % on_error
         assert (validate_until is None) or (validate_until >= 0)
+        assert workers >= 1
 
-        super(Reader, self).__init__(cid_or_path)
+        self._statistics = ValidationStatistics()
+        self._collect_statistics = collect_statistics
+        self._wall_start_time = _wall_time()
+        self._cpu_start_time = _cpu_time()
+        super(Reader, self).__init__(cid_or_path, validation_cache_size)
+        if collect_statistics:
+            self._statistics.add_phase_time(
+                PHASE_CID, _wall_time() - self._wall_start_time, _cpu_time() - self._cpu_start_time)
         # TODO: Consolidate obtaining source path with other code segments that do similar things.
         if isinstance(source_data_stream_or_path, six.string_types):
             source_path = source_data_stream_or_path
@@ -204,6 +656,8 @@ class Reader(BaseValidator):
         self._source_data_stream_or_path = source_data_stream_or_path
         self._on_error = on_error
         self._validate_until = validate_until
+        self._workers = workers
+        self._row_type = None
         self.accepted_rows_count = None
         self.rejected_rows_count = None
 
@@ -227,6 +681,179 @@ class Reader(BaseValidator):
         else:
             assert False, 'format=%r' % format
 
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def statistics(self):
+        """
+        :py:class:`~cutplace.validio.ValidationStatistics` of the
+        validation so far. After :py:meth:`~.close`, they also include the
+        checks at the end of the data and the total time.
+        """
+        self._statistics.accepted_rows_count = self.accepted_rows_count or 0
+        self._statistics.rejected_rows_count = self.rejected_rows_count or 0
+        self._statistics.check_name_to_rejected_rows_count_map = collections.Counter(
+            self._validation_plan.check_name_to_rejected_rows_count_map)
+        return self._statistics
+
+    def close(self):
+        """
+        Same as :py:meth:`cutplace.validio.BaseValidator.close` but also
+        complete the :py:attr:`~.statistics`.
+        """
+        if not self._is_closed:
+            try:
+                self._timed(PHASE_END_CHECKS, super(Reader, self).close)()
+            finally:
+                statistics = self._statistics
+                statistics.wall_time = _wall_time() - self._wall_start_time
+                statistics.cpu_time = _cpu_time() - self._cpu_start_time
+                statistics.peak_rss = _peak_rss()
+                if isinstance(self._source_data_stream_or_path, six.string_types):
+                    try:
+                        statistics.bytes_read = os.path.getsize(self._source_data_stream_or_path)
+                    except OSError:
+                        pass
+
+    @property
+    def row_type(self):
+        """
+        A :py:func:`collections.namedtuple` with the names of the fields in
+        :py:attr:`~cutplace.validio.BaseValidator.cid` used for the rows
+        produced by :py:meth:`~.native_rows`. Unlike a :py:class:`dict` it
+        does not need any memory per row beyond the field values themselves.
+        """
+        if self._row_type is None:
+            self._row_type = collections.namedtuple('Row', [str(field_name) for field_name in self.cid.field_names])
+        return self._row_type
+
+    def _shards(self):
+        """
+        Byte ranges of the shards to validate in parallel or ``None`` if the
+        data have to be validated sequentially.
+        """
+        result = None
+        data_format = self.cid.data_format
+        source_path = self._source_data_stream_or_path
+        if (self._workers > 1) and isinstance(source_path, six.string_types) and (self._validate_until is None):
+            if data_format.format == data.FORMAT_DELIMITED:
+                result = rowio.delimited_shards(source_path, data_format, _SHARD_SIZE)
+            elif data_format.format == data.FORMAT_FIXED:
+                result = rowio.fixed_shards(
+                    source_path, data_format.encoding, interface.field_names_and_lengths(self.cid),
+                    data_format.line_delimiter, _SHARD_SIZE)
+            if (result is not None) and (len(result) == 1):
+                result = None
+        return result
+
+    def _rows_and_field_errors_from_shards(self, shards, with_native_rows):
+        """
+        Rows, their native values (if ``with_native_rows``) and possible
+        errors found by :py:meth:`~.ValidationPlan.validate_fields` for all
+        ``shards`` with locations relative to the whole data. The shards are
+        validated by a pool of worker processes, keeping only a limited
+        number of shards pending in order to preserve memory.
+        """
+        assert shards
+
+        source_path = self._source_data_stream_or_path
+        pool = multiprocessing.Pool(self._workers, _init_shard_worker, (self.cid, self._validation_cache_size))
+        try:
+            shards_to_submit = iter(shards)
+            pending_shards = collections.deque()
+
+            def submit_next_shard():
+                shard = next(shards_to_submit, None)
+                if shard is not None:
+                    start, end = shard
+                    pending_shards.append(
+                        (start, pool.apply_async(_validated_shard, (source_path, start, end, with_native_rows))))
+
+            for _ in range(self._workers * _PENDING_SHARDS_PER_WORKER):
+                submit_next_shard()
+            row_offset = 0
+            while pending_shards:
+                start, pending_result = pending_shards.popleft()
+                rows_and_errors, data_format_error, phase_times = pending_result.get()
+                if self._collect_statistics:
+                    for phase, wall_time, cpu_time in phase_times:
+                        self._statistics.add_phase_time(phase, wall_time, cpu_time)
+                submit_next_shard()
+                for row, native_row, error in rows_and_errors:
+                    if error is not None:
+                        error.location.set_line(error.location.line + row_offset)
+                    yield row, native_row, error
+                if data_format_error is not None:
+                    if self.cid.data_format.format == data.FORMAT_FIXED:
+                        # Fixed shards consist of complete records, one per line.
+                        line_offset = row_offset
+                    else:
+                        line_offset = _line_feed_count(source_path, start)
+                    data_format_error.location.set_line(data_format_error.location.line + line_offset)
+                    raise data_format_error
+                row_offset += len(rows_and_errors)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _rows_and_field_errors_from_batches(self, batch_size, with_native_rows):
+        """
+        Rows, their native values (if ``with_native_rows``) and possible
+        errors found by :py:meth:`~.ValidationPlan.validated_batch` for
+        batches of up to ``batch_size`` rows. Header rows and rows after
+        ``validate_until`` are not validated and have no native values.
+        """
+        assert batch_size >= 1
+
+        raw_rows = iter(self._raw_rows())
+        location = copy.copy(self._location)
+        header_row_count = self._cid.data_format.header
+        if self._validate_until is None:
+            rows_to_validate_count = None
+        else:
+            # Just like ``rows()``, ``validate_until`` includes the header rows.
+            rows_to_validate_count = max(0, self._validate_until - header_row_count)
+        validated_batch = self._timed(PHASE_FIELDS, functools.partial(
+            self._validation_plan._validated_batch, with_native_rows=with_native_rows))
+        # On a broken row, ``extend()`` keeps the rows read before it.
+        read_batch = self._timed(PHASE_READ, lambda batch: batch.extend(itertools.islice(raw_rows, batch_size)))
+        for header_row in itertools.islice(raw_rows, header_row_count):
+            yield header_row, None, None
+            location.advance_line()
+        data_format_error = None
+        while data_format_error is None:
+            batch = []
+            try:
+                read_batch(batch)
+            except errors.DataFormatError as error:
+                # Produce the rows before the broken one first, so errors
+                # are reported in the same order as with ``rows()``.
+                data_format_error = error
+            if not batch:
+                break
+            if rows_to_validate_count is None:
+                native_rows, field_errors = validated_batch(batch, location)
+            elif rows_to_validate_count > 0:
+                rows_to_validate = batch[:rows_to_validate_count]
+                native_rows, field_errors = validated_batch(rows_to_validate, location)
+                unvalidated_nones = [None] * (len(batch) - len(rows_to_validate))
+                field_errors += unvalidated_nones
+                if native_rows is not None:
+                    native_rows += unvalidated_nones
+                rows_to_validate_count -= len(rows_to_validate)
+            else:
+                native_rows = None
+                field_errors = [None] * len(batch)
+            if native_rows is None:
+                native_rows = itertools.repeat(None)
+            for row_native_row_and_field_error in zip(batch, native_rows, field_errors):
+                yield row_native_row_and_field_error
+            location.advance_line(len(batch))
+        if data_format_error is not None:
+            raise data_format_error
+
     def rows(self):
         """
         Data rows of ``source_path``.
@@ -239,24 +866,153 @@ class Reader(BaseValidator):
 
         :raises cutplace.errors.DataError: on broken data
         """
+        return self._rows(None)
+
+    def row_batches(self, size=DEFAULT_ROW_BATCH_SIZE):
+        """
+        Same as :py:meth:`~.rows` but producing lists of up to ``size``
+        rows (or errors in case ``on_error`` is ``'yield'``). The fields of
+        each batch are validated column by column, which amortizes the
+        effort needed to validate each field over many rows. Row checks
+        still process one row after another in the original order, and
+        errors refer to the same locations.
+
+        If the data are validated by multiple ``workers``, the rows are
+        validated the same way as by :py:meth:`~.rows` and only collected
+        in batches.
+
+        :raises cutplace.errors.DataError: on broken data; rows before the \
+          broken one are produced before the error is raised
+        """
+        assert size >= 1
+
+        batch = []
+        try:
+            for row_or_error in self._rows(size):
+                batch.append(row_or_error)
+                if len(batch) == size:
+                    yield batch
+                    batch = []
+        except errors.DataError as error:
+            if batch:
+                yield batch
+            raise error
+        if batch:
+            yield batch
+
+    def native_rows(self, batch_size=DEFAULT_ROW_BATCH_SIZE):
+        """
+        Same as :py:meth:`~.rows` but producing the native values of the
+        fields computed during validation instead of the text read from the
+        data, for example an :py:class:`int` for an ``Integer`` field or
+        ``None`` for an empty field. Each row is a :py:attr:`~.row_type`,
+        so fields can be accessed by name (``row.customer_id``) as well as
+        by index (``row[0]``).
+
+        The fields are validated in batches of up to ``batch_size`` rows
+        the same way as by :py:meth:`~.row_batches`. Because the native
+        values are only available for validated rows, ``validate_until``
+        must be ``None``.
+
+        :raises cutplace.errors.DataError: on broken data
+        """
+        assert batch_size >= 1
+        assert self._validate_until is None, 'native rows require all rows to be validated'
+
+        return self._rows(batch_size, True)
+
+    def _timed(self, phase, function):
+        """
+        ``function`` changed to add the time each call takes to ``phase``
+        of the :py:attr:`~.statistics` if they are collected, otherwise
+        ``function`` itself.
+        """
+        if self._collect_statistics:
+            add_phase_time = self._statistics.add_phase_time
+
+            def timed_function(*arguments):
+                wall_start_time = _wall_time()
+                cpu_start_time = _cpu_time()
+                try:
+                    return function(*arguments)
+                finally:
+                    add_phase_time(phase, _wall_time() - wall_start_time, _cpu_time() - cpu_start_time)
+
+            result = timed_function
+        else:
+            result = function
+        return result
+
+    def _rows_and_field_errors_from_raw_rows(self):
+        """
+        Rows read one after another without validating their fields.
+        """
+        raw_rows = iter(self._raw_rows())
+        next_raw_row = self._timed(PHASE_READ, functools.partial(next, raw_rows, None))
+        while True:
+            row = next_raw_row()
+            if row is None:
+                break
+            yield row, None, None
+
+    def _count_rejected_row(self, error):
+        """
+        Count a row rejected because of ``error``, even if the error is
+        raised, both in :py:attr:`~.rejected_rows_count` and in the
+        :py:attr:`~.statistics` by field or check.
+        """
+        self.rejected_rows_count += 1
+        statistics = self._statistics
+        if isinstance(error, errors.FieldValueError) and (error.location is not None):
+            # Field errors refer to the cell of the broken field.
+            field_name = self.cid.field_names[error.location.cell]
+            statistics.field_name_to_rejected_rows_count_map[field_name] += 1
+        elif not isinstance(error, errors.CheckError):
+            # Rows rejected by checks are counted by the validation plan.
+            statistics.other_rejected_rows_count += 1
+
+    def _rows(self, batch_size, with_native_rows=False):
         self.accepted_rows_count = 0
         self.rejected_rows_count = 0
         for check in self.cid.check_map.values():
             check.reset()
         header_row_count = self._cid.data_format.header
-        for row_count, row in enumerate(self._raw_rows(), 1):
+        shards = self._shards()
+        validate_fields = None
+        if shards is not None:
+            rows_and_field_errors = self._rows_and_field_errors_from_shards(shards, with_native_rows)
+        elif batch_size is not None:
+            rows_and_field_errors = self._rows_and_field_errors_from_batches(batch_size, with_native_rows)
+        else:
+            assert not with_native_rows
+            rows_and_field_errors = self._rows_and_field_errors_from_raw_rows()
+            validate_fields = self._validation_plan.validate_fields
+        if validate_fields is not None:
+            validate_fields = self._timed(PHASE_FIELDS, validate_fields)
+        if self._validation_plan.has_row_checks:
+            check_row = self._timed(PHASE_ROW_CHECKS, self._validation_plan.check_row)
+        else:
+            check_row = None
+        location = self._location
+        make_native_row = self.row_type._make if with_native_rows else None
+        for row_count, (row, native_row, field_error) in enumerate(rows_and_field_errors, 1):
             try:
                 is_after_header_row = (row_count > header_row_count)
                 is_before_validate_until = (self._validate_until is None) or (row_count <= self._validate_until)
                 if is_after_header_row:
                     if is_before_validate_until:
-                        self.validate_row(row)
+                        if field_error is not None:
+                            raise field_error
+                        if validate_fields is not None:
+                            validate_fields(row, location)
+                        if check_row is not None:
+                            check_row(row, location)
                     self.accepted_rows_count += 1
-                    yield row
+                    yield row if make_native_row is None else make_native_row(native_row)
             except errors.DataError as error:
+                self._count_rejected_row(error)
                 if self.on_error == 'raise':
                     raise
-                self.rejected_rows_count += 1
                 if self.on_error == 'yield':
                     yield error
                 else:
@@ -274,7 +1030,7 @@ class Reader(BaseValidator):
 
         :raises cutplace.errors.DataError: on broken data
         """
-        for _ in self.rows():
+        for _ in self.row_batches():
             pass
 
 
@@ -288,6 +1044,7 @@ class Writer(BaseValidator):
         data_format = cid_or_path.data_format
         assert self.cid.data_format.is_valid
         self._header = data_format.header
+        self._is_fixed = (data_format.format == data.FORMAT_FIXED)
         self._delegated_writer = None
         if data_format.format == data.FORMAT_DELIMITED:
             self._delegated_writer = rowio.DelimitedRowWriter(target, data_format)
@@ -326,7 +1083,7 @@ class Writer(BaseValidator):
 
         if self.location.line >= self._header:
             self.validate_row(row_to_write)
-        if self.cid.data_format.format == data.FORMAT_FIXED:
+        if self._is_fixed:
             actual_row_to_write = self._padded_fixed_row(row_to_write)
         else:
             actual_row_to_write = row_to_write
@@ -347,7 +1104,8 @@ class Writer(BaseValidator):
                 self._delegated_writer = None
 
 
-def rows(cid_or_path, data_stream_or_path, on_error='raise', validate_until=None):
+def rows(cid_or_path, data_stream_or_path, on_error='raise', validate_until=None, workers=1,
+         validation_cache_size=None):
     """
     Rows read from ``data`` and validated against ``cid_or_path``.
 
@@ -358,6 +1116,9 @@ def rows(cid_or_path, data_stream_or_path, on_error='raise', validate_until=None
     :param str on_error: same as ``on_error`` for :py:class:`cutplace.Reader`
     :param validate_until: same as ``validate_until`` for \
       :py:class:`cutplace.Reader`
+    :param int workers: same as ``workers`` for :py:class:`cutplace.Reader`
+    :param validation_cache_size: same as ``validation_cache_size`` for \
+      :py:class:`cutplace.Reader`
     :raises cutplace.errors.DataError: on broken data but only in case \
       ``on_error='raise'`` (the default)
     :raises cutplace.errors.InterfaceError: on a broken CID
@@ -367,12 +1128,12 @@ def rows(cid_or_path, data_stream_or_path, on_error='raise', validate_until=None
     assert on_error in _VALID_ON_ERROR_CHOICES, 'on_error=%r' % on_error
     assert (validate_until is None) or (validate_until >= 0)
 
-    with Reader(cid_or_path, data_stream_or_path, on_error, validate_until) as reader:
+    with Reader(cid_or_path, data_stream_or_path, on_error, validate_until, workers, validation_cache_size) as reader:
         for row in reader.rows():
             yield row
 
 
-def validate(cid_or_path, data_stream_or_path, validate_until=None):
+def validate(cid_or_path, data_stream_or_path, validate_until=None, workers=1, validation_cache_size=None):
     """
     Validate that ``data_or_path`` conform to ``cid_or_path``.
 
@@ -380,14 +1141,20 @@ def validate(cid_or_path, data_stream_or_path, validate_until=None):
       describing a path pointing to a CID
     :param data_stream_or_path: filelike object or :py:class:`str` \
       describing a path pointing to the data to be read
+    :param int workers: same as ``workers`` for :py:class:`cutplace.Reader`
+    :param validation_cache_size: same as ``validation_cache_size`` for \
+      :py:class:`cutplace.Reader`
     :raises cutplace.errors.DataError: on broken data
     :raises cutplace.errors.InterfaceError: on a broken CID
     """
     assert cid_or_path is not None
     assert data_stream_or_path is not None
     assert (validate_until is None) or (validate_until >= 0)
+    assert workers >= 1
 
-    with Reader(cid_or_path, data_stream_or_path, validate_until=validate_until) as reader:
+    with Reader(
+            cid_or_path, data_stream_or_path, validate_until=validate_until, workers=workers,
+            validation_cache_size=validation_cache_size) as reader:
         rows_to_validate = reader.rows()
         if validate_until is not None:
             rows_to_validate = itertools.islice(rows_to_validate, validate_until)
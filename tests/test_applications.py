@@ -20,8 +20,11 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import json
 import logging
 import os
+import signal
+import threading
 import unittest
 
 import six
@@ -69,6 +72,44 @@ class CutplaceAppTest(unittest.TestCase):
         self._cutplace_app.validate(_valid_customers_csv_path)
         self.assertFalse(self._cutplace_app.all_validations_were_ok)
 
+    def _validate_all_and_log_messages(self, data_paths):
+        log_messages = []
+        log_handler = logging.Handler()
+        log_handler.emit = lambda record: log_messages.append(record.getMessage())
+        cutplace_log = logging.getLogger('cutplace')
+        original_log_level = cutplace_log.level
+        cutplace_log.addHandler(log_handler)
+        cutplace_log.setLevel(logging.INFO)
+        try:
+            self._cutplace_app.validate_all(data_paths)
+        finally:
+            cutplace_log.setLevel(original_log_level)
+            cutplace_log.removeHandler(log_handler)
+        return log_messages
+
+    def test_can_validate_multiple_data_files_in_parallel(self):
+        data_paths = [_valid_customers_csv_path, dev_test.path_to_test_data('broken_customers.csv')] * 2
+        sequential_log_messages = self._validate_all_and_log_messages(data_paths)
+        self.assertFalse(self._cutplace_app.all_validations_were_ok)
+
+        self._cutplace_app.all_validations_were_ok = True
+        self._cutplace_app.jobs = 3
+        parallel_log_messages = self._validate_all_and_log_messages(data_paths)
+        self.assertFalse(self._cutplace_app.all_validations_were_ok)
+        self.assertEqual(sequential_log_messages, parallel_log_messages)
+        self.assertEqual(4, len([message for message in parallel_log_messages if message.startswith('validate ')]))
+
+    def test_can_validate_multiple_valid_data_files_in_parallel(self):
+        self._cutplace_app.jobs = 2
+        self._cutplace_app.validate_all([_valid_customers_csv_path] * 3)
+        self.assertTrue(self._cutplace_app.all_validations_were_ok)
+
+    def test_fails_on_non_existent_data_file_in_parallel(self):
+        self._cutplace_app.jobs = 2
+        dev_test.assert_raises_and_fnmatches(
+            self, EnvironmentError, "cannot read data file *no_such_data.csv*",
+            self._cutplace_app.validate_all, [_valid_customers_csv_path, 'no_such_data.csv', _valid_customers_csv_path])
+
 
 class CutplaceProcessTest(unittest.TestCase):
     """
@@ -119,6 +160,47 @@ class CutplaceProcessTest(unittest.TestCase):
         exit_code = applications.process(['test_can_validate_proper_csv', cid_path, csv_path])
         self.assertEqual(0, exit_code)
 
+    def test_can_validate_proper_csv_with_jobs(self):
+        cid_path = dev_test.CID_CUSTOMERS_ODS_PATH
+        csv_path = dev_test.CUSTOMERS_CSV_PATH
+        exit_code = applications.process(['test_can_validate_proper_csv_with_jobs', '--jobs', '2', cid_path, csv_path])
+        self.assertEqual(0, exit_code)
+
+    def test_fails_on_jobs_less_than_1(self):
+        cid_path = dev_test.CID_CUSTOMERS_ODS_PATH
+        self._test_process_exits_with(['--jobs', '0', cid_path], 2)
+
+    def test_can_validate_proper_csv_with_cache(self):
+        cid_path = dev_test.CID_CUSTOMERS_ODS_PATH
+        csv_path = dev_test.CUSTOMERS_CSV_PATH
+        exit_code = applications.process(['test_can_validate_proper_csv_with_cache', '--cache', '10', cid_path, csv_path])
+        self.assertEqual(0, exit_code)
+
+    def test_fails_on_cache_less_than_0(self):
+        cid_path = dev_test.CID_CUSTOMERS_ODS_PATH
+        self._test_process_exits_with(['--cache', '-1', cid_path], 2)
+
+    def test_fails_on_duplicates_with_unique_keys(self):
+        cid_path = dev_test.CID_CUSTOMERS_XLS_PATH
+        csv_path = dev_test.path_to_test_data('broken_customers_with_duplicates.csv')
+        for unique_keys in ('0', '2'):
+            exit_code = applications.process(
+                ['test_fails_on_duplicates_with_unique_keys', '--unique-keys', unique_keys, cid_path, csv_path])
+            self.assertEqual(1, exit_code)
+
+    def test_fails_on_unique_keys_less_than_0(self):
+        cid_path = dev_test.CID_CUSTOMERS_ODS_PATH
+        self._test_process_exits_with(['--unique-keys', '-1', cid_path], 2)
+
+    def test_can_validate_proper_csv_with_cid_cache(self):
+        cid_path = dev_test.CID_CUSTOMERS_ODS_PATH
+        csv_path = dev_test.CUSTOMERS_CSV_PATH
+        cache_folder = dev_test.path_to_test_result('application_cid_cache')
+        for _ in range(2):
+            exit_code = applications.process(
+                ['test_can_validate_proper_csv_with_cid_cache', '--cid-cache', cache_folder, cid_path, csv_path])
+            self.assertEqual(0, exit_code)
+
     def test_can_read_cid_with_plugins(self):
         cid_path = dev_test.path_to_example('cid_colors.ods')
         exit_code = applications.process(
@@ -215,6 +297,35 @@ class CutplaceMainTest(unittest.TestCase):
     def test_can_deal_with_non_existent_data(self):
         self.assertEqual(3, applications.main(['test', _customers_cid_path, 'no_such_data.xxx']))
 
+    def test_can_deal_with_non_existent_data_in_parallel(self):
+        self.assertEqual(3, applications.main([
+            'test', '--jobs', '2', _customers_cid_path, _valid_customers_csv_path, 'no_such_data.xxx']))
+
+    def test_can_validate_multiple_data_files_in_parallel(self):
+        broken_customers_csv_path = dev_test.path_to_test_data('broken_customers.csv')
+        self.assertEqual(0, applications.main([
+            'test', '--jobs', '2', _customers_cid_path, _valid_customers_csv_path, _valid_customers_csv_path]))
+        self.assertEqual(1, applications.main([
+            'test', '--jobs', '2', _customers_cid_path, _valid_customers_csv_path, broken_customers_csv_path]))
+
+    def test_can_write_statistics(self):
+        broken_customers_csv_path = dev_test.path_to_test_data('broken_customers.csv')
+        stats_path = dev_test.path_to_test_result('test_can_write_statistics.json')
+        for jobs in ('1', '2'):
+            self.assertEqual(1, applications.main([
+                'test', '--jobs', jobs, '--stats', stats_path, _customers_cid_path, _valid_customers_csv_path,
+                broken_customers_csv_path]))
+            with open(stats_path) as stats_file:
+                statistics = json.load(stats_file)
+            self.assertEqual(_customers_cid_path, statistics['cid']['path'])
+            valid_statistics, broken_statistics = statistics['data']
+            self.assertEqual(
+                (_valid_customers_csv_path, True, 0), (
+                    valid_statistics['path'], valid_statistics['valid'], valid_statistics['rejected_rows']))
+            self.assertEqual((broken_customers_csv_path, False), (broken_statistics['path'], broken_statistics['valid']))
+            self.assertEqual({'customer_id': 1}, broken_statistics['rejected_rows_by_field'])
+            self.assertTrue(broken_statistics['phases']['read']['wall_time'] > 0)
+
     def _test_fails_with_system_exit(self, expected_code, argv):
         try:
             applications.main(argv)
@@ -231,6 +342,26 @@ class CutplaceMainTest(unittest.TestCase):
     def test_fails_without_any_arguments(self):
         self._test_fails_with_system_exit(2, ['test'])
 
+    @unittest.skipUnless(hasattr(os, 'kill') and (os.name == 'posix'), 'SIGTERM must be able to stop the server')
+    def test_can_serve_until_terminated(self):
+        terminate_timer = threading.Timer(1.0, os.kill, (os.getpid(), signal.SIGTERM))
+        terminate_timer.start()
+        try:
+            self.assertEqual(0, applications.main(['test', '--serve', '127.0.0.1:0', _customers_cid_path]))
+        finally:
+            terminate_timer.join()
+
+    def test_fails_on_serve_with_data_file(self):
+        self._test_fails_with_system_exit(
+            2, ['test', '--serve', '8778', _customers_cid_path, _valid_customers_csv_path])
+
+    def test_fails_on_serve_with_stats(self):
+        self._test_fails_with_system_exit(
+            2, ['test', '--serve', '8778', '--stats', 'stats.json', _customers_cid_path])
+
+    def test_fails_on_broken_serve_address(self):
+        self._test_fails_with_system_exit(2, ['test', '--serve', '65536'])
+
 
 if __name__ == '__main__':  # pragma: no cover
     logging.basicConfig(level=logging.INFO)
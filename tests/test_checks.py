@@ -25,6 +25,7 @@ import unittest
 
 from cutplace import checks
 from cutplace import errors
+from tests import dev_test
 
 _TEST_FIELD_NAMES = 'branch_id customer_id first_name surname gender date_of_birth'.split()
 
@@ -140,6 +141,84 @@ class IsUniqueCheckTest(_AbstractCheckTest):
         self.assertRaises(errors.InterfaceError, checks.IsUniqueCheck, "test check", broken_unique_field_names,
                 field_names)
 
+    def _spilling_unique_check_and_location(self, customer_ids, max_keys_in_memory=2):
+        """
+        ``IsUniqueCheck`` for ``customer_id`` that has checked all rows with
+        ``customer_ids`` and the location after the last row.
+        """
+        field_names = ['customer_id']
+        check = checks.IsUniqueCheck('test check', 'customer_id', field_names)
+        check.max_keys_in_memory = max_keys_in_memory
+        location = errors.Location('test', has_cell=True)
+        for customer_id in customer_ids:
+            check.check_row(_create_field_map(field_names, [customer_id]), location)
+            location.advance_line()
+        return check, location
+
+    def test_can_check_unique_keys_in_temporary_files(self):
+        check, location = self._spilling_unique_check_and_location(range(10))
+        check.check_at_end(location)
+        check.cleanup()
+
+    def test_fails_on_duplicate_in_memory_with_temporary_files(self):
+        check, location = self._spilling_unique_check_and_location(range(4), max_keys_in_memory=3)
+        try:
+            check.check_row(_create_field_map(['customer_id'], [3]), location)
+            self.fail('duplicate row must cause CheckError')
+        except errors.CheckError as error:
+            self.assertEqual(3, error.see_also_location.line)
+        check.cleanup()
+
+    def test_fails_on_duplicate_in_temporary_file(self):
+        check, location = self._spilling_unique_check_and_location([1, 2, 3, 4, 5])
+        try:
+            check.check_row(_create_field_map(['customer_id'], [2]), location)
+            self.fail('duplicate row must cause CheckError')
+        except errors.CheckError as error:
+            self.assertEqual(5, error.location.line)
+            self.assertEqual(1, error.see_also_location.line)
+        check.cleanup()
+
+    def _accepted_ids_and_duplicate_lines(self, customer_ids, max_keys_in_memory):
+        """
+        Tuple ``(accepted_ids, duplicate_lines)`` after checking rows with
+        ``customer_ids``, where ``duplicate_lines`` holds tuples ``(line,
+        line_of_first_occurrence)`` for rejected rows.
+        """
+        field_names = ['customer_id']
+        check = checks.IsUniqueCheck('test check', 'customer_id', field_names)
+        check.max_keys_in_memory = max_keys_in_memory
+        location = errors.Location('test', has_cell=True)
+        accepted_ids = []
+        duplicate_lines = []
+        try:
+            for customer_id in customer_ids:
+                try:
+                    check.check_row(_create_field_map(field_names, [customer_id]), location)
+                    accepted_ids.append(customer_id)
+                except errors.CheckError as error:
+                    duplicate_lines.append((error.location.line, error.see_also_location.line))
+                location.advance_line()
+            check.check_at_end(location)
+        finally:
+            check.cleanup()
+        return accepted_ids, duplicate_lines
+
+    def test_can_find_same_duplicates_with_temporary_files_as_in_memory(self):
+        customer_ids = ['a', 'b', 'c', 'd', 'a', 'a', 'b']
+        expected_result = (['a', 'b', 'c', 'd'], [(4, 0), (5, 0), (6, 1)])
+        self.assertEqual(expected_result, self._accepted_ids_and_duplicate_lines(customer_ids, None))
+        self.assertEqual(expected_result, self._accepted_ids_and_duplicate_lines(customer_ids, 2))
+
+        # Repeat keys spread across many runs.
+        customer_ids = [customer_id % 37 for customer_id in range(0, 500, 3)] + list(range(0, 100, 7))
+        expected_result = self._accepted_ids_and_duplicate_lines(customer_ids, None)
+        self.assertTrue(len(expected_result[1]) >= 100)
+        for max_keys_in_memory in (1, 2, 5, 30):
+            self.assertEqual(
+                expected_result, self._accepted_ids_and_duplicate_lines(customer_ids, max_keys_in_memory),
+                'max_keys_in_memory=%d' % max_keys_in_memory)
+
 
 class DistinctCountCheckTest(unittest.TestCase):
     def test_fails_on_too_many_distinct_values(self):
@@ -166,6 +245,71 @@ class DistinctCountCheckTest(unittest.TestCase):
                 "branch_id ! broken ^ 5ynt4x ?!?", field_names)
         self.assertRaises(errors.InterfaceError, checks.DistinctCountCheck, "broken", "branch_id + 123", field_names)
 
+    def test_can_merge_distinct_values(self):
+        field_names = ['branch_id']
+        location = errors.Location(self.test_can_merge_distinct_values, has_cell=True)
+        check = checks.DistinctCountCheck("test check", "branch_id <= 3", field_names)
+        other_check = checks.DistinctCountCheck("test check", "branch_id <= 3", field_names)
+        for branch_id in [1, 2, 2]:
+            check.check_row(_create_field_map(field_names, [branch_id]), location)
+        for branch_id in [2, 3]:
+            other_check.check_row(_create_field_map(field_names, [branch_id]), location)
+        check.merge(other_check)
+        check.check_at_end(location)
+        other_check.check_row(_create_field_map(field_names, [4]), location)
+        check.merge(other_check)
+        self.assertRaises(errors.CheckError, check.check_at_end, location)
+
+
+class ApproximateDistinctCountCheckTest(unittest.TestCase):
+    def _check_with_customer_ids(self, rule, customer_ids):
+        field_names = ['customer_id']
+        location = errors.Location('test', has_cell=True)
+        result = checks.ApproximateDistinctCountCheck('test check', rule, field_names)
+        for customer_id in customer_ids:
+            result.check_row(_create_field_map(field_names, ['%d' % customer_id]), location)
+        return result, location
+
+    def test_can_estimate_distinct_count(self):
+        check, location = self._check_with_customer_ids('customer_id >= 9500', range(10000))
+        check.check_at_end(location)
+        check, location = self._check_with_customer_ids('customer_id <= 10500', list(range(10000)) * 2)
+        check.check_at_end(location)
+
+    def test_fails_on_too_many_distinct_values(self):
+        check, location = self._check_with_customer_ids('customer_id < 9000', range(10000))
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.CheckError, "*distinct count is approximately * but check requires: 'count < 9000'",
+            check.check_at_end, location)
+
+    def test_can_merge_sketches(self):
+        check, location = self._check_with_customer_ids('customer_id >= 9500', range(6000))
+        other_check, _ = self._check_with_customer_ids('customer_id >= 9500', range(4000, 10000))
+        self.assertRaises(errors.CheckError, check.check_at_end, location)
+        check.merge(other_check)
+        check.check_at_end(location)
+
+    def test_can_set_relative_error(self):
+        check, location = self._check_with_customer_ids('customer_id < 2', [])
+        check.relative_error = 0.1
+        self.assertEqual(0.1, check.relative_error)
+        check.check_row(_create_field_map(['customer_id'], ['1']), location)
+        check.check_at_end(location)
+
+    def test_can_specify_relative_error_in_rule(self):
+        check, location = self._check_with_customer_ids('customer_id in (9999, 10000), 0.05', range(10000))
+        self.assertEqual(0.05, check.relative_error)
+        self.assertEqual(checks.DEFAULT_RELATIVE_DISTINCT_COUNT_ERROR, checks.ApproximateDistinctCountCheck(
+            'test check', 'customer_id in (1, 2)', ['customer_id']).relative_error)
+
+    def test_fails_on_broken_relative_error_in_rule(self):
+        for relative_error_text in ('0', '1', '-0.1', '1.5', 'x', ''):
+            dev_test.assert_raises_and_fnmatches(
+                self, errors.InterfaceError,
+                "*relative error is '%s' but must be a number greater than 0 and less than 1" % relative_error_text,
+                checks.ApproximateDistinctCountCheck, 'test check', 'customer_id > 1, ' + relative_error_text,
+                ['customer_id'])
+
 if __name__ == "__main__":  # pragma: no cover
     logging.basicConfig(level=logging.INFO)
     unittest.main()
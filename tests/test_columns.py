@@ -0,0 +1,114 @@
+"""
+Tests for :py:mod:`cutplace.columns`.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import array
+import decimal
+import io
+import unittest
+
+from cutplace import columns
+from cutplace import errors
+from cutplace import interface
+from tests import dev_test
+
+_NUMBERS_CID = interface.create_cid_from_string('\n'.join([
+    'd,format,delimited',
+    'f,tiny,,,,Integer,-128...127',
+    'f,small,,,,Integer,0...32767',
+    'f,huge,,,,Integer,0...9223372036854775807',
+    'f,optional,,X,,Integer,1...9',
+    'f,open,,,,Integer,1...',
+    'f,amount,,,,Decimal',
+    'f,birth,,X,,DateTime,YYYY-MM-DD',
+    'f,name',
+]))
+
+_NUMBERS_DATA = '\n'.join([
+    '-128,1,9223372036854775807,,1,1.5,1970-01-02,a',
+    '127,32767,0,9,123456789012345678901234567890,-2,,b',
+])
+
+
+def _numbers_stream():
+    return io.StringIO(_NUMBERS_DATA)
+
+
+class ColumnTypeTest(unittest.TestCase):
+    def test_can_derive_column_types(self):
+        self.assertEqual(
+            ['int8', 'int16', 'int64', 'object', 'object', 'object', 'datetime64[s]', 'object'],
+            [columns.column_type(field_format) for field_format in _NUMBERS_CID.field_formats])
+
+
+class ReadColumnsTest(unittest.TestCase):
+    def test_can_read_array_columns(self):
+        actual_columns = columns.read_columns(_NUMBERS_CID, _numbers_stream(), columns.CONTAINER_ARRAY)
+        self.assertEqual(list(_NUMBERS_CID.field_names), list(actual_columns.keys()))
+        tiny_column = actual_columns['tiny']
+        self.assertTrue(isinstance(tiny_column, array.array))
+        self.assertEqual(1, tiny_column.itemsize)
+        self.assertEqual([-128, 127], list(tiny_column))
+        self.assertEqual([None, 9], actual_columns['optional'])
+        self.assertEqual([decimal.Decimal('1.5'), decimal.Decimal('-2')], actual_columns['amount'])
+        self.assertEqual([1970, None], [
+            None if birth is None else birth.tm_year for birth in actual_columns['birth']])
+
+    def test_can_read_columns_of_empty_data(self):
+        actual_columns = columns.read_columns(_NUMBERS_CID, io.StringIO(''), columns.CONTAINER_ARRAY)
+        self.assertEqual([0] * len(_NUMBERS_CID.field_names), [len(column) for column in actual_columns.values()])
+
+    def test_can_read_column_chunks(self):
+        digits_cid = interface.create_cid_from_string('\n'.join(['d,format,delimited', 'f,digit,,,,Integer,0...9']))
+        chunks = list(columns.column_chunks(
+            digits_cid, io.StringIO('\n'.join('%d' % (index % 10) for index in range(25))),
+            chunk_size=10, container=columns.CONTAINER_ARRAY))
+        self.assertEqual([10, 10, 5], [len(chunk['digit']) for chunk in chunks])
+        self.assertEqual([0, 1, 2, 3, 4], list(chunks[-1]['digit']))
+
+    def test_fails_on_broken_data(self):
+        broken_data = io.StringIO(_NUMBERS_DATA.replace('-128', 'x'))
+        self.assertRaises(
+            errors.FieldValueError, columns.read_columns, _NUMBERS_CID, broken_data, columns.CONTAINER_ARRAY)
+
+    @unittest.skipIf(columns.has_pandas, 'pandas must not be installed')
+    def test_fails_on_data_frame_without_pandas(self):
+        dev_test.assert_raises_and_fnmatches(
+            self, ImportError, '*pandas packages must be installed*', columns.column_chunks,
+            _NUMBERS_CID, _numbers_stream(), None, columns.CONTAINER_PANDAS)
+
+    @unittest.skipUnless(columns.has_numpy, 'numpy must be installed')
+    def test_can_read_numpy_columns(self):
+        actual_columns = columns.read_columns(_NUMBERS_CID, _numbers_stream())
+        for field_format in _NUMBERS_CID.field_formats:
+            self.assertEqual(
+                columns.column_type(field_format), actual_columns[field_format.field_name].dtype.name)
+        self.assertEqual([-128, 127], actual_columns['tiny'].tolist())
+        self.assertEqual([9223372036854775807, 0], actual_columns['huge'].tolist())
+        self.assertEqual(
+            ['1970-01-02T00:00:00', 'NaT'], [str(birth) for birth in actual_columns['birth']])
+        self.assertEqual(['a', 'b'], actual_columns['name'].tolist())
+
+    @unittest.skipUnless(columns.has_pandas, 'pandas must be installed')
+    def test_can_read_data_frame(self):
+        data_frame = columns.read_columns(_NUMBERS_CID, _numbers_stream(), columns.CONTAINER_PANDAS)
+        self.assertEqual(list(_NUMBERS_CID.field_names), list(data_frame.columns))
+        self.assertEqual([-128, 127], data_frame['tiny'].tolist())
@@ -229,6 +229,8 @@ class DataFormatTest(unittest.TestCase):
         excel_format = data.DataFormat(data.FORMAT_EXCEL)
         excel_format.set_property(data.KEY_SHEET, '1')
         self.assertEqual(excel_format.sheet, 1)
+        excel_format.set_property(data.KEY_SHEET, '2')
+        self.assertEqual(excel_format.sheet, 2)
 
     def test_fails_on_non_numeric_sheet(self):
         excel_format = data.DataFormat(data.FORMAT_EXCEL)
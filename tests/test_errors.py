@@ -20,7 +20,9 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import copy
 import io
+import pickle
 import unittest
 
 from cutplace import errors
@@ -72,6 +74,29 @@ class LocationTest(unittest.TestCase):
         self.assertEqual(location.__eq__(location_other), True)
         self.assertEqual(location.__lt__(location_other), False)
 
+    def test_can_set_line_and_keep_cell(self):
+        location = errors.Location("eggs.csv", has_cell=True)
+        location.set_cell(2)
+        location.set_line(9)
+        self.assertEqual(str(location), "eggs.csv (R10C3)")
+
+    def test_can_copy_location_at_line(self):
+        location = errors.Location("eggs.ods", has_cell=True, has_sheet=True)
+        location._set_sheet(2)
+        location.advance_line(7)
+        location.set_cell(4)
+        location_at_line = location.copy_at_line(3)
+        self.assertEqual(str(location_at_line), "eggs.ods (Sheet3!R4C1)")
+        self.assertEqual(str(location), "eggs.ods (Sheet3!R8C5)")
+
+    def test_can_copy_and_pickle_location(self):
+        location = errors.Location("eggs.txt", has_column=True)
+        location.advance_line(2)
+        location.advance_column(5)
+        for copied_location in (copy.copy(location), pickle.loads(pickle.dumps(location, 2))):
+            self.assertEqual(location, copied_location)
+            self.assertEqual(str(location), str(copied_location))
+
     def test_can_create_caller_location(self):
         location = errors.create_caller_location()
         dev_test.assert_fnmatches(self, str(location), 'test_errors.py ([1-9]*)')
@@ -99,6 +124,15 @@ class CutplaceErrorTest(unittest.TestCase):
             'eggs.ods (Sheet1!R4C3): cannot do something '
             + '(see also: spam.ods (Sheet1!R1C1): something must be something else)')
 
+    def test_can_pickle_cutplace_error(self):
+        location = errors.Location('eggs.csv', has_cell=True)
+        location.advance_line(3)
+        error = errors.FieldValueError('something must be something else', location)
+        error.prepend_message('cannot accept field', location)
+        unpickled_error = pickle.loads(pickle.dumps(error))
+        self.assertEqual(type(error), type(unpickled_error))
+        self.assertEqual(str(error), str(unpickled_error))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -21,8 +21,11 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import datetime
 import decimal
+import io
 import logging
+import time
 import unittest
 
 import six
@@ -97,6 +100,24 @@ class AbstractFieldFormatTest(unittest.TestCase):
         field_format = fields.AbstractFieldFormat('x', False, '3...5', '', _ANY_FORMAT)
         self.assertEqual(six.text_type(field_format), "AbstractFieldFormat('x', False, Range('3...5'), '')")
 
+    def test_can_use_compiled_validated(self):
+        data_format = data.DataFormat(data.FORMAT_DELIMITED)
+        data_format.set_property(data.KEY_ALLOWED_CHARACTERS, '"0"..."9"')
+        field_format = fields.IntegerFieldFormat('x', True, '1...3', '', data_format)
+        validated = field_format.compiled_validated()
+        self.assertEqual(123, validated('123'))
+        self.assertEqual(None, validated(''))
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.FieldValueError, "character 'a' * must be an allowed character: 48...57", validated, '1a')
+        self.assertRaises(errors.FieldValueError, validated, '1234')
+
+    def test_can_use_compiled_validated_with_fixed_format(self):
+        field_format = fields.IntegerFieldFormat('x', False, '3', '', _FIXED_FORMAT)
+        validated = field_format.compiled_validated()
+        self.assertEqual(12, validated(' 12'))
+        self.assertRaises(errors.FieldValueError, validated, '')
+        self.assertRaises(errors.FieldValueError, validated, '1234')
+
 
 class DateTimeFieldFormatTest(unittest.TestCase):
     """
@@ -129,6 +150,165 @@ class DateTimeFieldFormatTest(unittest.TestCase):
         field_format = fields.DateTimeFieldFormat("x", False, None, "%YYYY-MM-DD", _ANY_FORMAT)
         field_format.validated("%2000-01-01")
 
+    def test_can_parse_same_as_strptime(self):
+        for rule, value in (
+                ("YYYY-MM-DD", "2016-02-29"),
+                ("DD.MM.YY", "31.12.68"),
+                ("DD.MM.YY", "01.01.69"),
+                ("YYYYMMDDhhmmss", "20151231235961"),
+                ("hh:mm", "23:59"),
+                ("DD.MM", "29.02"),
+                ("YYYY-MM-DD", "2000-1-1")):
+            field_format = fields.DateTimeFieldFormat("x", False, None, rule, _ANY_FORMAT)
+            self.assertEqual(time.strptime(value, field_format.strptime_format), field_format.validated(value))
+
+    def test_fails_on_broken_compiled_dates(self):
+        field_format = fields.DateTimeFieldFormat("x", False, None, "DD.MM.YYYY hh:mm", _ANY_FORMAT)
+        for value in ("29.02.1900 12:00", "31.04.2000 12:00", "01.13.2000 12:00", "01.01.2000 24:00",
+                      "01.01.2000 12:60", "01.01.2000 12-00", "01.01.2000 12:00 "):
+            self.assertRaises(errors.FieldValueError, field_format.validated, value)
+
+    def test_can_limit_parsed_value_cache(self):
+        field_format = fields.DateTimeFieldFormat("x", False, None, "YYYY-MM-DD", _ANY_FORMAT)
+        first_date = datetime.date(2000, 1, 1)
+        for day in range(fields.DateTimeFieldFormat.PARSED_VALUE_CACHE_SIZE + 10):
+            value = (first_date + datetime.timedelta(days=day)).isoformat()
+            self.assertEqual(field_format.validated(value), field_format.validated(value))
+        self.assertEqual(
+            fields.DateTimeFieldFormat.PARSED_VALUE_CACHE_SIZE, len(field_format._value_to_parsed_time_map))
+
+
+class ValidatedColumnTest(unittest.TestCase):
+    """
+    Tests for `AbstractFieldFormat.validated_column()`.
+    """
+    def _assert_same_as_validated(self, field_format, values):
+        expected_results = []
+        expected_error_messages = set()
+        for value in values:
+            try:
+                expected_results.append(field_format.validated(value))
+            except errors.FieldValueError as error:
+                expected_error_messages.add(six.text_type(error))
+        if expected_error_messages:
+            try:
+                field_format.validated_column(values)
+                self.fail("FieldValueError expected")
+            except errors.FieldValueError as anticipated_error:
+                self.assertIn(six.text_type(anticipated_error), expected_error_messages)
+        else:
+            self.assertEqual(expected_results, field_format.validated_column(values))
+
+    def test_can_validate_column(self):
+        limited_data_format = data.DataFormat(data.FORMAT_DELIMITED)
+        limited_data_format.set_property(data.KEY_ALLOWED_CHARACTERS, "32...126")
+        limited_data_format.validate()
+        for field_format in (
+                fields.ChoiceFieldFormat("x", True, "...3", "a, bb, ccc", _ANY_FORMAT),
+                fields.ChoiceFieldFormat("x", False, "", "ignore_case: a, b", limited_data_format),
+                fields.DateTimeFieldFormat("x", True, "", "YYYY-MM-DD", _ANY_FORMAT),
+                fields.DecimalFieldFormat("x", False, "", "1...10", _ANY_FORMAT),
+                fields.IntegerFieldFormat("x", True, "...2", "1...10", _ANY_FORMAT),
+                fields.IntegerFieldFormat("x", False, "", "1...3, 5", limited_data_format),
+                fields.PatternFieldFormat("x", False, "", "?b*", _ANY_FORMAT),
+                fields.RegExFieldFormat("x", True, "", "[0-9]+", _ANY_FORMAT),
+                fields.TextFieldFormat("x", True, "1...2", "", limited_data_format)):
+            for values in (
+                    [], ["a", "bb", "ccc", "a"], ["A", "b", "B"], ["a", "", "bb"], ["1", "5", "10"], ["4", "1", ""],
+                    ["0", "11"], ["1", "x"], ["ab", "ab", "bb"], ["2000-01-01", "2000-01-01", ""], ["2000-02-30"],
+                    ["123", "1\t"], ["\u20ac"]):
+                self._assert_same_as_validated(field_format, values)
+
+    def test_can_validate_large_integer_column_with_gaps(self):
+        field_format = fields.IntegerFieldFormat("x", False, "", "1...3, 5, 10...", _ANY_FORMAT)
+        values = ["1", "2", "3", "5", "10", "12345"] * 1000
+        self._assert_same_as_validated(field_format, values)
+        self._assert_same_as_validated(field_format, values + ["4"])
+
+    def test_can_validate_large_decimal_column_with_gaps(self):
+        field_format = fields.DecimalFieldFormat("x", False, "", "...-1, 0.5...3.25, 10...", _ANY_FORMAT)
+        values = ["-1", "-1.5", "0.5", "3.25", "10", "12345.678"] * 1000
+        self._assert_same_as_validated(field_format, values)
+        for broken_value in ("-0.99", "0.49", "3.26", "9.999", "1.2.3", "NaN", "x"):
+            self._assert_same_as_validated(field_format, values + [broken_value])
+
+    def test_can_validate_decimal_column_with_separators(self):
+        field_format = _create_german_decimal_format()
+        self._assert_same_as_validated(field_format, ["1", "1,5", "-12,25", "1.234,5"])
+        for broken_value in ("1,2,3", "1,2.3"):
+            self._assert_same_as_validated(field_format, ["1,5", broken_value])
+
+    def test_can_validate_fixed_column(self):
+        field_format = fields.IntegerFieldFormat("x", True, "3", "1...100", _FIXED_FORMAT)
+        self._assert_same_as_validated(field_format, ["1  ", " 2 ", "   ", "100"])
+        self._assert_same_as_validated(field_format, ["1  ", "1000"])
+
+    def test_can_validate_column_with_own_validated_value(self):
+        class UpperTextFieldFormat(fields.TextFieldFormat):
+            def validated_value(self, value):
+                if value != value.upper():
+                    raise errors.FieldValueError("value must be upper case: %s" % value)
+                return value
+
+        upper_field_format = UpperTextFieldFormat("x", False, "", "", _ANY_FORMAT)
+        self.assertEqual(["A", "B"], upper_field_format.validated_column(["A", "B"]))
+        self.assertRaises(errors.FieldValueError, upper_field_format.validated_column, ["A", "b"])
+
+
+class ValidationCacheTest(unittest.TestCase):
+    """
+    Tests for `ValidationCache`.
+    """
+    def setUp(self):
+        self._field_format = fields.IntegerFieldFormat("x", False, None, "1...10", _ANY_FORMAT)
+
+    def test_can_remember_valid_values(self):
+        validation_cache = fields.ValidationCache(2)
+        validated = validation_cache.cached(self._field_format.validated)
+        self.assertEqual(1, validated("1"))
+        self.assertEqual(1, validated("1"))
+        self.assertEqual(2, validated("2"))
+        self.assertEqual(1, validation_cache.hit_count)
+        self.assertEqual(2, validation_cache.miss_count)
+        self.assertAlmostEqual(1 / 3, validation_cache.hit_ratio)
+
+    def test_can_remember_broken_values(self):
+        validation_cache = fields.ValidationCache(2)
+        validated = validation_cache.cached(self._field_format.validated)
+        for _ in range(3):
+            try:
+                validated("11")
+                self.fail("FieldValueError expected")
+            except errors.FieldValueError as anticipated_error:
+                # Make sure that changes to the error do not end up in the cache.
+                anticipated_error.prepend_message("prefix", errors.Location("test"))
+                self.assertEqual("test (1): prefix: value is 11 but must be within range: 1...10", str(anticipated_error))
+        self.assertEqual(2, validation_cache.hit_count)
+
+    def test_can_forget_values_remembered_first(self):
+        validation_cache = fields.ValidationCache(2)
+        validated = validation_cache.cached(self._field_format.validated)
+        for value in ("1", "2", "1", "3", "2", "1"):
+            validated(value)
+        self.assertEqual(2, validation_cache.hit_count)
+        self.assertEqual(4, validation_cache.miss_count)
+
+    def test_can_stop_adaptive_caching_of_many_distinct_values(self):
+        validation_cache = fields.ValidationCache(2, is_adaptive=True)
+        validated = validation_cache.cached(self._field_format.validated)
+        for value_index in range(100):
+            self.assertEqual(value_index % 10 + 1, validated(str(value_index % 10 + 1)))
+        self.assertFalse(validation_cache.is_active)
+        self.assertEqual(0, validation_cache.hit_count)
+
+    def test_can_keep_adaptive_caching_of_few_distinct_values(self):
+        validation_cache = fields.ValidationCache(2, is_adaptive=True)
+        validated = validation_cache.cached(self._field_format.validated)
+        for value_index in range(100):
+            validated(str(value_index % 2 + 1))
+        self.assertTrue(validation_cache.is_active)
+        self.assertEqual(98, validation_cache.hit_count)
+
 
 class DecimalFieldFormatTest(unittest.TestCase):
     """
@@ -193,6 +373,28 @@ class DecimalFieldFormatTest(unittest.TestCase):
         self.assertEqual(field_format.valid_range.upper_limit, decimal.Decimal('9999999999999999999.999999999999'))
         self.assertEqual(field_format.valid_range.lower_limit, decimal.Decimal('-9999999999999999999.999999999999'))
 
+    def test_can_validate_decimals_with_thousands_separator(self):
+        english_data_format = data.DataFormat(data.FORMAT_DELIMITED)
+        english_data_format.set_property(data.KEY_THOUSANDS_SEPARATOR, ",")
+        english_data_format.validate()
+        field_format = fields.DecimalFieldFormat("x", False, None, "", english_data_format)
+        self.assertEqual(decimal.Decimal("1234567.89"), field_format.validated("1,234,567.89"))
+        self.assertEqual(decimal.Decimal("-1234"), field_format.validated("-1,234"))
+
+    def test_fails_on_first_misplaced_separator(self):
+        german_decimal_field_format = _create_german_decimal_format()
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.FieldValueError, "*must contain only one decimal separator*",
+            german_decimal_field_format.validated, "1,2,3.4")
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.FieldValueError, "*must contain thousands separator*",
+            german_decimal_field_format.validated, "1,2.3,4")
+
+    def test_fails_on_not_a_number(self):
+        field_format = fields.DecimalFieldFormat("x", False, None, "", _ANY_FORMAT)
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.FieldValueError, "*must be a decimal number*", field_format.validated, "NaN")
+
 
 class IntegerFieldFormatTest(unittest.TestCase):
     """
@@ -382,6 +584,44 @@ class ChoiceFieldFormatTest(unittest.TestCase):
         self.assertEqual(field_format.validated("red"), "red")
         self.assertEqual(field_format.validated(""), "")
 
+    def test_can_match_choice_ignoring_case(self):
+        field_format = fields.ChoiceFieldFormat("color", False, None, "ignore_case: red, grEEn", _ANY_FORMAT)
+        self.assertTrue(field_format.ignore_case)
+        self.assertEqual(field_format.validated("Red"), "Red")
+        self.assertEqual(field_format.validated("GREEN"), "GREEN")
+        self.assertRaises(errors.FieldValueError, field_format.validated, "blue")
+
+    def test_can_match_choice_named_ignore_case(self):
+        field_format = fields.ChoiceFieldFormat("option", False, None, "ignore_case, other", _ANY_FORMAT)
+        self.assertFalse(field_format.ignore_case)
+        self.assertEqual(field_format.validated("ignore_case"), "ignore_case")
+        self.assertRaises(errors.FieldValueError, field_format.validated, "IGNORE_CASE")
+
+    def test_can_read_choices_from_file(self):
+        choices_path = dev_test.path_to_test_result('choices_for_test_can_read_choices_from_file.txt')
+        with io.open(choices_path, 'w', encoding='utf-8') as choices_file:
+            for product_index in range(1000):
+                choices_file.write('P%04d\n' % product_index)
+            choices_file.write('\n')
+        rule = '"none", @"%s"' % choices_path.replace('\\', '\\\\')
+        field_format = fields.ChoiceFieldFormat("product", False, None, rule, _ANY_FORMAT)
+        self.assertEqual(1001, len(field_format.choices))
+        self.assertEqual('none', field_format.choices[0])
+        self.assertEqual(field_format.validated("P0999"), "P0999")
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.FieldValueError,
+            "value is 'P1000' but must be one of 1001 choices, for example: 'none', 'P0000', *, 'P0017' or 'P0018'",
+            field_format.validated, "P1000")
+
+    def test_fails_on_missing_choices_file(self):
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.InterfaceError, "cannot read choices from 'no_such_choices.txt': *",
+            fields.ChoiceFieldFormat, "color", False, None, '@"no_such_choices.txt"', _ANY_FORMAT)
+
+    def test_fails_on_at_sign_without_path(self):
+        self.assertRaises(errors.InterfaceError, fields.ChoiceFieldFormat, "color", False, None, "@red", _ANY_FORMAT)
+        self.assertRaises(errors.InterfaceError, fields.ChoiceFieldFormat, "color", False, None, "red, @", _ANY_FORMAT)
+
     def test_fails_on_empty_rule(self):
         self.assertRaises(errors.InterfaceError, fields.ChoiceFieldFormat, "color", False, None, "", _ANY_FORMAT)
         self.assertRaises(errors.InterfaceError, fields.ChoiceFieldFormat, "color", False, None, " ", _ANY_FORMAT)
@@ -22,7 +22,9 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import fnmatch
+import io
 import os.path
+import shutil
 import unittest
 
 import six
@@ -37,6 +39,61 @@ from cutplace import rowio
 from tests import dev_test
 
 
+class CachedCidTest(unittest.TestCase):
+    def setUp(self):
+        self._cache_folder = dev_test.path_to_test_result('cid_cache')
+        if os.path.exists(self._cache_folder):
+            shutil.rmtree(self._cache_folder)
+        self._cid_path = dev_test.path_to_test_result('cached_cid.csv')
+        self._write_cid(['some'])
+
+    def _write_cid(self, field_names):
+        with io.open(self._cid_path, 'w', encoding='utf-8') as cid_stream:
+            cid_stream.write('d,format,delimited\n')
+            for field_name in field_names:
+                cid_stream.write('f,%s\n' % field_name)
+
+    def _cache_paths(self):
+        return [os.path.join(self._cache_folder, file_name) for file_name in os.listdir(self._cache_folder)]
+
+    def test_can_read_cached_cid(self):
+        cid = interface.cached_cid(self._cid_path, self._cache_folder)
+        self.assertEqual(['some'], cid.field_names)
+        self.assertEqual(1, len(self._cache_paths()))
+        cached_cid = interface.cached_cid(self._cid_path, self._cache_folder)
+        self.assertEqual(['some'], cached_cid.field_names)
+
+    def test_can_read_changed_cid(self):
+        interface.cached_cid(self._cid_path, self._cache_folder)
+        self._write_cid(['some', 'other'])
+        cid = interface.cached_cid(self._cid_path, self._cache_folder)
+        self.assertEqual(['some', 'other'], cid.field_names)
+        self.assertEqual(1, len(self._cache_paths()))
+
+    def test_can_read_cid_with_changed_choices(self):
+        choices_path = dev_test.path_to_test_result('cached_colors.txt')
+        with io.open(choices_path, 'w', encoding='utf-8') as choices_stream:
+            choices_stream.write('red\ngreen\n')
+        with io.open(self._cid_path, 'w', encoding='utf-8') as cid_stream:
+            cid_stream.write('d,format,delimited\nf,color,,,,Choice,"@""cached_colors.txt"""\n')
+        cid = interface.cached_cid(self._cid_path, self._cache_folder)
+        self.assertEqual([os.path.abspath(choices_path)], cid.external_paths)
+        self.assertEqual(['red', 'green'], cid.field_formats[0].choices)
+
+        with io.open(choices_path, 'a', encoding='utf-8') as choices_stream:
+            choices_stream.write('blue\n')
+        cid = interface.cached_cid(self._cid_path, self._cache_folder)
+        self.assertEqual(['red', 'green', 'blue'], cid.field_formats[0].choices)
+
+    def test_can_ignore_broken_cache_file(self):
+        interface.cached_cid(self._cid_path, self._cache_folder)
+        cache_path = self._cache_paths()[0]
+        with io.open(cache_path, 'wb') as cache_stream:
+            cache_stream.write(b'broken')
+        cid = interface.cached_cid(self._cid_path, self._cache_folder)
+        self.assertEqual(['some'], cid.field_names)
+
+
 class CidTest(unittest.TestCase):
 
     """
@@ -431,6 +488,32 @@ class CidTest(unittest.TestCase):
         self._test_fails_on_broken_cid_from_text(
             cid_text, "*check type is '' but must be one of: *'DistinctCountCheck'*'IsUniqueCheck'*")
 
+    def test_can_declare_approximate_distinct_count_check(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'D,Format,%s' % data.FORMAT_DELIMITED,
+            'F,some',
+            'C,few values,ApproximateDistinctCount,some < 10',
+        ]))
+        self.assertTrue(isinstance(cid.check_map['few values'], checks.ApproximateDistinctCountCheck))
+        self.assertEqual(checks.DEFAULT_RELATIVE_DISTINCT_COUNT_ERROR, cid.check_map['few values'].relative_error)
+
+    def test_can_declare_approximate_distinct_count_check_with_relative_error(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'D,Format,%s' % data.FORMAT_DELIMITED,
+            'F,some',
+            'C,few values,ApproximateDistinctCount,"some < 10, 0.05"',
+        ]))
+        self.assertEqual(0.05, cid.check_map['few values'].relative_error)
+
+    def test_fails_on_approximate_distinct_count_check_with_broken_relative_error(self):
+        cid_text = '\n'.join([
+            'D,Format,%s' % data.FORMAT_DELIMITED,
+            'F,some',
+            'C,few values,ApproximateDistinctCount,"some < 10, 2"',
+        ])
+        self._test_fails_on_broken_cid_from_text(
+            cid_text, "*(R3C2): relative error is '2' but must be a number greater than 0 and less than 1")
+
     def test_fails_on_check_without_rule(self):
         cid_text = '\n'.join([
             ',CID with a check without a description',
@@ -451,6 +534,20 @@ class CidTest(unittest.TestCase):
         self._test_fails_on_broken_cid_from_text(
             cid_text, "*check description must be used only once: 'duplicate_check' (see also: *: first declaration)")
 
+    def test_can_read_choices_relative_to_cid_folder(self):
+        cid_folder = dev_test.path_to_test_result('cid_with_choices')
+        if not os.path.exists(cid_folder):
+            os.mkdir(cid_folder)
+        with io.open(os.path.join(cid_folder, 'colors.txt'), 'w', encoding='utf-8') as choices_stream:
+            choices_stream.write('red\ngreen\n')
+        cid_path = os.path.join(cid_folder, 'cid_colors.csv')
+        with io.open(cid_path, 'w', encoding='utf-8') as cid_stream:
+            cid_stream.write('d,format,delimited\nf,color,,,,Choice,"@""colors.txt"""\n')
+        self.assertNotEqual(os.path.abspath(os.getcwd()), os.path.abspath(cid_folder))
+        cid = interface.Cid(cid_path)
+        self.assertEqual(os.path.abspath(cid_folder), cid.data_format.cid_folder)
+        self.assertEqual(['red', 'green'], cid.field_formats[0].choices)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -25,6 +25,9 @@ import logging
 import os.path
 import pstats
 import random
+import subprocess
+import sys
+import timeit
 import unittest
 
 import six
@@ -37,6 +40,21 @@ from cutplace import _tools
 from tests import dev_test
 
 _log = logging.getLogger("cutplace.dev_reports")
+
+#: Modules that should not be needed to just ``import cutplace``.
+_MODULES_NOT_TO_IMPORT_ON_STARTUP = (
+    'cutplace.gui',
+    'cutplace.sql',
+    'importlib.metadata',
+    'numpy',
+    'pkg_resources',
+    'tkinter',
+    'xlrd',
+    'xlsxwriter',
+    'xml.etree.ElementTree',
+    'zipfile',
+)
+
 # Import "best" profiler available.
 try:
     import cProfile as profile
@@ -74,6 +92,43 @@ def _build_and_validate_many_customers():
         raise ValueError("exit code of performance test must be 0 but is %d" % exit_code)
 
 
+def _best_run_time(command, run_count=5):
+    """
+    Shortest time in seconds it took to run ``command`` in a new process
+    ``run_count`` times.
+    """
+    assert command
+    assert run_count >= 1
+
+    result = None
+    for _ in range(run_count):
+        start_time = timeit.default_timer()
+        subprocess.check_output(command, stderr=subprocess.STDOUT)
+        run_time = timeit.default_timer() - start_time
+        if (result is None) or (run_time < result):
+            result = run_time
+    return result
+
+
+def _benchmark_startup(target_report_path):
+    """
+    Measure how long it takes to ``import cutplace`` and to run
+    ``cutplace --version`` compared to just starting Python, and write a
+    report to ``target_report_path``.
+    """
+    python_time = _best_run_time([sys.executable, '-c', 'pass'])
+    import_time = _best_run_time([sys.executable, '-c', 'import cutplace'])
+    # Run the application as module so it also works without the "cutplace" script installed.
+    version_time = _best_run_time([sys.executable, '-m', 'cutplace.applications', '--version'])
+    _log.info('startup: import=%.3fs, version=%.3fs, python=%.3fs', import_time, version_time, python_time)
+    with io.open(target_report_path, 'w', encoding='utf-8') as target_report_file:
+        for name, run_time in [
+                ('python -c "pass"', python_time),
+                ('python -c "import cutplace"', import_time),
+                ('cutplace --version', version_time)]:
+            target_report_file.write('%-30s %6.3f s (%+.3f s)\n' % (name, run_time, run_time - python_time))
+
+
 class PerformanceTest(unittest.TestCase):
     """
     Test case for performance profiling.
@@ -93,6 +148,18 @@ class PerformanceTest(unittest.TestCase):
             if not six.PY2:
                 stats.sort_stats("cumulative").print_stats("cutplace", 20)
 
+    def test_can_start_quickly(self):
+        target_report_path = os.path.join("build", "site", "reports", "startup.txt")
+        _tools.mkdirs(os.path.dirname(target_report_path))
+        _benchmark_startup(target_report_path)
+
+    def test_does_not_import_optional_modules_on_startup(self):
+        imported_module_names = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys; import cutplace; print(" ".join(sorted(sys.modules)))']).decode('ascii').split()
+        self.assertEqual(
+            [], [name for name in _MODULES_NOT_TO_IMPORT_ON_STARTUP if name in imported_module_names])
+
 
 if __name__ == '__main__':  # pragma: no cover
     logging.basicConfig(level=logging.INFO)
@@ -184,6 +184,58 @@ class RangeTest(unittest.TestCase):
         self.assertRaises(errors.RangeValueError, multi_range.validate, "x", 10)
         self.assertRaises(errors.RangeValueError, multi_range.validate, "x", 723)
 
+    def test_can_check_contains(self):
+        single_range = ranges.Range("3...5")
+        self.assertTrue(single_range.contains(3))
+        self.assertTrue(single_range.contains(5))
+        self.assertFalse(single_range.contains(2))
+        self.assertFalse(single_range.contains(6))
+        self.assertTrue(ranges.Range("").contains(-(2 ** 40)))
+
+    def test_can_check_contains_with_open_limits(self):
+        open_range = ranges.Range("...-10, 0...3, 20...")
+        self.assertTrue(open_range.contains(-(2 ** 40)))
+        self.assertTrue(open_range.contains(-10))
+        self.assertFalse(open_range.contains(-9))
+        self.assertTrue(open_range.contains(2))
+        self.assertFalse(open_range.contains(19))
+        self.assertTrue(open_range.contains(2 ** 40))
+
+    def test_can_check_contains_with_many_items(self):
+        codes = list(range(0, 1000, 7)) + list(range(2000, 3000, 3))
+        description = ', '.join(six.text_type(code) for code in reversed(codes)) + ', 4000...4010, 4011...4020'
+        many_range = ranges.Range(description)
+        for value in range(-5, 4100):
+            expected = (value in codes) or (4000 <= value <= 4020)
+            self.assertEqual(expected, many_range.contains(value), 'value=%d' % value)
+
+    def test_can_check_contains_all(self):
+        for description in ("3...5", "...5", "3...", "3...5, 7", "...3, 5...", ""):
+            some_range = ranges.Range(description)
+            for values in ([3, 4, 5], [3, 6], [6], [2, 4], [7, 3], [], [-(2 ** 40)], [2 ** 40]):
+                self.assertEqual(
+                    all(some_range.contains(value) for value in values), some_range.contains_all(values),
+                    'description=%r, values=%r' % (description, values))
+
+    def test_can_find_invalid_character(self):
+        invalid_character_regex = ranges.Range("'a'...'c', 'x'").invalid_character_regex()
+        self.assertIsNone(invalid_character_regex.search('abcx'))
+        self.assertEqual(2, invalid_character_regex.search('abdx').start())
+        self.assertEqual('y', invalid_character_regex.search('xy').group())
+
+    def test_can_find_invalid_character_with_open_limits(self):
+        self.assertIsNone(ranges.Range("...10, 32...").invalid_character_regex().search('\t\u20ac'))
+        self.assertEqual('\n', ranges.Range("...9, 32...").invalid_character_regex().search('\t\n').group())
+        self.assertEqual('a', ranges.Range("-10...-1").invalid_character_regex().search('a').group())
+
+    def test_can_find_invalid_special_regex_character(self):
+        invalid_character_regex = ranges.Range("'-', ']', '^', 92").invalid_character_regex()
+        self.assertIsNone(invalid_character_regex.search('-]^\\'))
+        self.assertEqual('a', invalid_character_regex.search('-a').group())
+
+    def test_can_accept_any_character_with_empty_range(self):
+        self.assertIsNone(ranges.Range('').invalid_character_regex())
+
     def test_can_create_range_from_length(self):
         self.assertEqual(ranges.create_range_from_length(ranges.Range("1...")).items, None)
         self.assertEqual(ranges.create_range_from_length(ranges.Range("1...1")).items, [(0, 9)])
@@ -223,6 +275,64 @@ class RangeTest(unittest.TestCase):
         self.assertEqual(six.text_type(upper_none_range), "1..., None")
 
 
+@unittest.skipUnless(ranges.has_numpy, 'numpy must be installed')
+class NumpyRangeTest(unittest.TestCase):
+    def setUp(self):
+        self._gaps_range = ranges.Range("...-100, 1...5, 7, 10...20, 1000...")
+
+    def test_can_check_contains_all_with_numpy(self):
+        contained_values = [-1000, -100, 1, 3, 5, 7, 10, 20, 1000, 2 ** 40] * ranges.MIN_NUMPY_VALUE_COUNT
+        self.assertTrue(self._gaps_range._can_use_numpy_for(contained_values))
+        self.assertTrue(self._gaps_range.contains_all(contained_values))
+        for not_contained_value in (-99, 0, 6, 8, 21, 999):
+            values = contained_values + [not_contained_value]
+            self.assertFalse(self._gaps_range.contains_all(values), 'value=%d' % not_contained_value)
+
+    def test_can_check_contains_all_beyond_int64(self):
+        values = [1] * ranges.MIN_NUMPY_VALUE_COUNT + [2 ** 70]
+        self.assertIsNone(self._gaps_range._numpy_contains_all(values))
+        self.assertTrue(self._gaps_range.contains_all(values))
+        self.assertFalse(ranges.Range("1...5, %d" % (2 ** 70)).contains_all(values[:-1] + [6]))
+
+    def _assert_numpy_contains_same_as_contains(self, range_to_check, values):
+        contained_values = [value for value in values if range_to_check.contains(value)]
+        padding = contained_values[:1] * ranges.MIN_NUMPY_VALUE_COUNT
+        for value in values:
+            values_to_check = padding + [value]
+            self.assertTrue(range_to_check._can_use_numpy_for(values_to_check))
+            self.assertEqual(
+                range_to_check.contains(value), range_to_check._numpy_contains_all(values_to_check),
+                'range=%s, value=%r' % (range_to_check, value))
+        numpy_contains_each = range_to_check._numpy_contains_each(values, range_to_check._numpy_array(values))
+        self.assertEqual([range_to_check.contains(value) for value in values], list(numpy_contains_each))
+
+    def test_can_check_integer_boundaries_with_numpy(self):
+        for description in ("1...5", "...-100", "1000...", "...-100, 1...5, 7, 10...20, 1000...", "1...3, 4...6"):
+            range_to_check = ranges.Range(description)
+            values = [ranges._MIN_INT64, ranges._MAX_INT64]
+            for limit in range_to_check._limits:
+                values.extend([limit - 1, limit, limit + 1])
+            self._assert_numpy_contains_same_as_contains(range_to_check, values)
+
+    def test_can_check_decimal_boundaries_with_numpy(self):
+        tiny = decimal.Decimal('1e-20')
+        for description in ("...-100.5, 0.01...99.99, 1000...", "0...0.1, 0.2...0.3", "...0, 1e30..."):
+            range_to_check = ranges.DecimalRange(description)
+            values = [decimal.Decimal('-1e400'), decimal.Decimal('1e400')]
+            for limit in range_to_check._limits:
+                # Values next to the limit round to the same float as the limit itself.
+                values.extend([limit - decimal.Decimal('0.01'), limit - tiny, limit, limit + tiny])
+            self._assert_numpy_contains_same_as_contains(range_to_check, values)
+
+    def test_can_check_single_interval_with_numpy(self):
+        range_to_check = ranges.Range("1...5")
+        values = [1, 3, 5] * ranges.MIN_NUMPY_VALUE_COUNT
+        self.assertTrue(range_to_check._can_use_numpy_for(values))
+        self.assertTrue(range_to_check.contains_all(values))
+        self.assertFalse(range_to_check.contains_all(values + [0]))
+        self.assertFalse(range_to_check.contains_all(values + [6]))
+
+
 class DecimalRangeTest(unittest.TestCase):
 
     def test_can_handle_proper_decimal_ranges(self):
@@ -425,6 +535,16 @@ class DecimalRangeTest(unittest.TestCase):
         upper_none_range.items.append(None)
         self.assertEqual(six.text_type(upper_none_range), "1, None")
 
+    def test_can_check_contains(self):
+        decimal_range = ranges.DecimalRange("...-1.5, 0.1...0.2, 1.25, 3...")
+        self.assertTrue(decimal_range.contains(decimal.Decimal('-1.5')))
+        self.assertFalse(decimal_range.contains(decimal.Decimal('-1.49')))
+        self.assertTrue(decimal_range.contains(decimal.Decimal('0.15')))
+        self.assertFalse(decimal_range.contains(decimal.Decimal('0.21')))
+        self.assertTrue(decimal_range.contains(decimal.Decimal('1.25')))
+        self.assertFalse(decimal_range.contains(decimal.Decimal('1.26')))
+        self.assertTrue(decimal_range.contains(decimal.Decimal('3')))
+
     def test_fails_on_non_decimal_value_to_validate(self):
         decimal_range = ranges.DecimalRange("1.1...2.2")
         self.assertRaises(errors.RangeValueError, decimal_range.validate, "x", "a")
@@ -20,11 +20,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import datetime
 import io
 import os
 import unittest
+import zipfile
 
 import six
+import xlsxwriter
 
 from cutplace import data
 from cutplace import interface
@@ -61,6 +64,135 @@ class ExcelRowsTest(_BaseRowsTest):
                 _, excel_value, cutplace_value = row
                 self.assertEqual(cutplace_value, excel_value)
 
+    def test_can_read_excel_rows_from_empty_later_sheet(self):
+        field_types_path = dev_test.path_to_test_data('fieldtypes.xls')
+        self.assertEqual([], list(rowio.excel_rows(field_types_path, 2)))
+
+    def test_can_read_same_xlsx_rows_as_xls_rows(self):
+        xls_path = dev_test.path_to_test_data('valid_customers.xls')
+        xlsx_path = dev_test.path_to_test_data('valid_customers.xlsx')
+        self.assertEqual(list(rowio.excel_rows(xls_path)), list(rowio.excel_rows(xlsx_path)))
+
+    def test_can_read_xlsx_rows_from_later_sheet(self):
+        xlsx_path = ExcelRowsTest._create_test_xlsx('test_can_read_xlsx_rows_from_later_sheet.xlsx')
+        self.assertEqual([['second sheet']], list(rowio.excel_rows(xlsx_path, 2)))
+
+    def test_can_compute_xlsx_column_index(self):
+        for cell_reference, expected_column_index in (('A1', 0), ('Z9', 25), ('AA1', 26), ('AB12', 27), ('XFD3', 16383)):
+            self.assertEqual(expected_column_index, rowio._xlsx_column_index(cell_reference), cell_reference)
+
+    def test_can_extract_all_xlsx_cell_types(self):
+        xlsx_path = ExcelRowsTest._create_test_xlsx('test_can_extract_all_xlsx_cell_types.xlsx')
+        # The first row is yielded before the wider second row has been read, so it is not padded.
+        self.assertEqual([
+            ['text', '12', '12.5', '1'],
+            ['2016-03-04 05:06:07', '05:06:07', '24', 'ab', '#DIV/0!'],
+            ['', '', '', '', ''],
+            ['', '  spaced  ', '', 'rich text', ''],
+        ], list(rowio.excel_rows(xlsx_path)))
+
+    @staticmethod
+    def _create_test_xlsx(name):
+        """
+        Create a XLSX document with two sheets and various cell types in
+        the first sheet and return its path. The formatted blank cell
+        after the last value is included in the dimension of the sheet but
+        must not result in additional columns.
+        """
+        test_build_folder = dev_test.path_to_test_folder('build')
+        _tools.mkdirs(test_build_folder)
+        result = os.path.join(test_build_folder, name)
+        with xlsxwriter.Workbook(result) as workbook:
+            date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+            time_format = workbook.add_format({'num_format': 'hh:mm:ss'})
+            first_sheet = workbook.add_worksheet()
+            first_sheet.write_string(0, 0, 'text')
+            first_sheet.write_number(0, 1, 12)
+            first_sheet.write_number(0, 2, 12.5)
+            first_sheet.write_boolean(0, 3, True)
+            first_sheet.write_datetime(1, 0, datetime.datetime(2016, 3, 4, 5, 6, 7), date_format)
+            first_sheet.write_datetime(1, 1, datetime.datetime(1899, 12, 31, 5, 6, 7), time_format)
+            first_sheet.write_formula(1, 2, '=B1*2', None, 24)
+            first_sheet.write_formula(1, 3, '="a"&"b"', None, 'ab')
+            first_sheet.write_formula(1, 4, '=1/0', None, '#DIV/0!')
+            first_sheet.write_string(3, 1, '  spaced  ')
+            first_sheet.write_rich_string(3, 3, 'rich ', workbook.add_format({'bold': True}), 'text')
+            first_sheet.write_blank(5, 7, None, date_format)
+            second_sheet = workbook.add_worksheet()
+            second_sheet.write_string(0, 0, 'second sheet')
+        return result
+
+    @staticmethod
+    def _create_changed_test_xlsx(name, change_sheet_xml):
+        """
+        Create a XLSX document with two rows of shared strings and return
+        its path. The XML of the worksheet is changed by the function
+        ``change_sheet_xml`` in order to simulate broken documents.
+        """
+        test_build_folder = dev_test.path_to_test_folder('build')
+        _tools.mkdirs(test_build_folder)
+        original_path = os.path.join(test_build_folder, 'original_' + name)
+        with xlsxwriter.Workbook(original_path) as workbook:
+            sheet = workbook.add_worksheet()
+            sheet.write_row(0, 0, ['a', 'b'])
+            sheet.write_row(1, 0, ['c', 'd'])
+        result = os.path.join(test_build_folder, name)
+        with zipfile.ZipFile(original_path, 'r') as original_archive:
+            with zipfile.ZipFile(result, 'w') as changed_archive:
+                for part_name in original_archive.namelist():
+                    part_data = original_archive.read(part_name)
+                    if part_name == 'xl/worksheets/sheet1.xml':
+                        part_data = change_sheet_xml(part_data.decode('utf-8')).encode('utf-8')
+                    changed_archive.writestr(part_name, part_data)
+        return result
+
+    def test_can_read_xlsx_rows_before_end_of_sheet_with_overstated_dimension(self):
+        def overstate_dimension_and_break_end(sheet_xml):
+            self.assertIn('<dimension ref="A1:B2"/>', sheet_xml)
+            sheet_xml = sheet_xml.replace('<dimension ref="A1:B2"/>', '<dimension ref="A1:Z2"/>')
+            end_of_first_row_index = sheet_xml.index('</row>') + len('</row>')
+            return sheet_xml[:end_of_first_row_index] + '<row r="2"><broken'
+
+        xlsx_path = ExcelRowsTest._create_changed_test_xlsx(
+            'test_can_read_xlsx_rows_before_end_of_sheet_with_overstated_dimension.xlsx',
+            overstate_dimension_and_break_end)
+        rows = rowio.excel_rows(xlsx_path)
+        self.assertEqual(['a', 'b'], next(rows))
+        self.assertRaises(errors.DataFormatError, next, rows)
+
+    def test_fails_on_xlsx_with_broken_shared_string_index(self):
+        def break_shared_string_index(sheet_xml):
+            self.assertIn('<c r="B2" t="s"><v>3</v></c>', sheet_xml)
+            return sheet_xml.replace('<c r="B2" t="s"><v>3</v></c>', '<c r="B2" t="s"><v>99</v></c>')
+
+        xlsx_path = ExcelRowsTest._create_changed_test_xlsx(
+            'test_fails_on_xlsx_with_broken_shared_string_index.xlsx', break_shared_string_index)
+        try:
+            list(rowio.excel_rows(xlsx_path))
+            self.fail()
+        except errors.DataFormatError as anticipated_error:
+            dev_test.assert_fnmatches(
+                self, str(anticipated_error),
+                '*(R2C2): cannot read Excel file: shared string index 99 must be between 0 and 3')
+
+    def test_fails_on_excel_with_missing_sheet(self):
+        field_types_path = dev_test.path_to_test_data('fieldtypes.xls')
+        try:
+            list(rowio.excel_rows(field_types_path, 4))
+            self.fail()
+        except errors.DataFormatError as anticipated_error:
+            dev_test.assert_fnmatches(
+                self, str(anticipated_error), '*: Excel must contain at least 4 sheet(s) instead of just 3')
+
+    def test_fails_on_xlsx_with_missing_sheet(self):
+        xlsx_path = ExcelRowsTest._create_test_xlsx('test_fails_on_xlsx_with_missing_sheet.xlsx')
+        try:
+            list(rowio.excel_rows(xlsx_path, 3))
+            self.fail()
+        except errors.DataFormatError as anticipated_error:
+            dev_test.assert_fnmatches(
+                self, str(anticipated_error), '*: Excel must contain at least 3 sheet(s) instead of just 2')
+
     def test_fails_on_excel_from_csv(self):
         csv_path = dev_test.CUSTOMERS_CSV_PATH
         try:
@@ -123,6 +255,30 @@ class OdsRowsTest(_BaseRowsTest):
             self.assertTrue(
                 'ODS must contain at least' in error_message, 'error_message=%r' % error_message)
 
+    def test_can_read_ods_sheet_without_parsing_later_sheets(self):
+        ods_path = dev_test.path_to_test_result('can_read_ods_sheet_without_parsing_later_sheets.ods')
+        table_namespace = 'urn:oasis:names:tc:opendocument:xmlns:table:1.0'
+        text_namespace = 'urn:oasis:names:tc:opendocument:xmlns:text:1.0'
+
+        def table_xml(values):
+            return '<table:table>' + ''.join(
+                '<table:table-row><table:table-cell><text:p>%s</text:p></table:table-cell></table:table-row>' % value
+                for value in values) + '</table:table>'
+
+        # The content ends after the second sheet without closing the
+        # remaining elements, so it can only be read up to there.
+        content_xml = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+            'xmlns:table="%s" xmlns:text="%s"><office:body><office:spreadsheet>'
+            % (table_namespace, text_namespace)
+            + table_xml(['a', 'b']) + table_xml(['c', 'd', 'e']))
+        with zipfile.ZipFile(ods_path, 'w') as ods_archive:
+            ods_archive.writestr('content.xml', content_xml.encode('utf-8'))
+        self.assertEqual([['c'], ['d'], ['e']], list(rowio.ods_rows(ods_path, 2)))
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.DataFormatError, '*: cannot parse content.xml: *', list, rowio.ods_rows(ods_path, 3))
+
     def test_fails_on_ods_from_excel(self):
         excel_path = dev_test.path_to_test_data('valid_customers.xls')
         try:
@@ -151,6 +307,54 @@ class DelimitedRowsTest(_BaseRowsTest):
                 'cannot parse delimited file' in error_message, 'error_message=%r' % error_message)
 
 
+class DelimitedShardsTest(unittest.TestCase):
+    def setUp(self):
+        self._data_format = data.DataFormat(data.FORMAT_DELIMITED)
+        self._data_format.set_property(data.KEY_ENCODING, 'utf-8')
+        self._data_format.validate()
+        self._delimited_path = dev_test.path_to_test_result('test_delimited_shards.csv')
+        with io.open(self._delimited_path, 'w', encoding='utf-8', newline='') as delimited_stream:
+            delimited_stream.write(
+                'a,"multi\nline"\r\n'
+                'b,"quoted ""\n"" quote"\r\n'
+                'c,' + _EURO_SIGN + '\r\n'
+                'd,"\n\n\n"\r\n'
+                'e,end')
+
+    def _shard_rows(self, shard_size):
+        shards = rowio.delimited_shards(self._delimited_path, self._data_format, shard_size)
+        result = []
+        for start, end in shards:
+            result.extend(rowio.delimited_shard_rows(self._delimited_path, self._data_format, start, end))
+        return shards, result
+
+    def test_can_split_delimited_into_shards(self):
+        expected_rows = list(rowio.delimited_rows(self._delimited_path, self._data_format))
+        for shard_size in range(1, 40):
+            shards, actual_rows = self._shard_rows(shard_size)
+            self.assertEqual(expected_rows, actual_rows, 'shard_size=%d' % shard_size)
+        shards, _ = self._shard_rows(1)
+        self.assertEqual(5, len(shards))
+        self.assertEqual(0, shards[0][0])
+        self.assertEqual(os.path.getsize(self._delimited_path), shards[-1][1])
+
+    def test_can_use_single_shard_with_escape_character(self):
+        self._data_format = data.DataFormat(data.FORMAT_DELIMITED)
+        self._data_format.set_property(data.KEY_ESCAPE_CHARACTER, '\\')
+        self._data_format.validate()
+        shards = rowio.delimited_shards(self._delimited_path, self._data_format, 1)
+        self.assertEqual([(0, os.path.getsize(self._delimited_path))], shards)
+
+    def test_fails_on_shard_with_unterminated_quote(self):
+        broken_delimited_path = dev_test.path_to_test_data('broken_customers_with_unterminated_quote.csv')
+        customer_cid = interface.Cid(dev_test.CID_CUSTOMERS_ODS_PATH)
+        data_format = customer_cid.data_format
+        shards = rowio.delimited_shards(broken_delimited_path, data_format, 1)
+        start, end = shards[-1]
+        self.assertRaises(
+            errors.DataFormatError, list, rowio.delimited_shard_rows(broken_delimited_path, data_format, start, end))
+
+
 class FixedRowsTest(_BaseRowsTest):
     @staticmethod
     def _create_fixed_data_format_and_fields_for_name_and_height(line_delimiter='any', validate=True):
@@ -238,6 +442,35 @@ class FixedRowsTest(_BaseRowsTest):
                 data_io, data_format.encoding, field_names_and_lengths, data_format.line_delimiter))
         self.assertEqual([['john', '172'], ['mary', '163']], rows)
 
+    def test_can_read_fixed_shards(self):
+        _, field_names_and_lengths = FixedRowsTest._create_fixed_data_format_and_fields_for_name_and_height()
+        fixed_path = dev_test.path_to_test_result('can_read_fixed_shards.txt')
+        with io.open(fixed_path, 'w', encoding='cp1252', newline='') as fixed_stream:
+            fixed_stream.write('john172\r\nm\u00e4ry163\r\nbill167\r\njane184')
+        shards = rowio.fixed_shards(fixed_path, 'cp1252', field_names_and_lengths, '\r\n', 20)
+        self.assertEqual([(0, 18), (18, 34)], shards)
+        rows = []
+        for start, end in shards:
+            rows.extend(rowio.fixed_shard_rows(fixed_path, 'cp1252', field_names_and_lengths, '\r\n', start, end))
+        self.assertEqual([['john', '172'], ['m\u00e4ry', '163'], ['bill', '167'], ['jane', '184']], rows)
+
+    def test_can_use_single_fixed_shard_for_multi_byte_encoding(self):
+        _, field_names_and_lengths = FixedRowsTest._create_fixed_data_format_and_fields_for_name_and_height()
+        fixed_path = dev_test.path_to_test_result('can_use_single_fixed_shard_for_multi_byte_encoding.txt')
+        with io.open(fixed_path, 'w', encoding='utf-8', newline='') as fixed_stream:
+            fixed_stream.write('john172\nm\u00e4ry163\n')
+        shards = rowio.fixed_shards(fixed_path, 'utf-8', field_names_and_lengths, '\n', 1)
+        self.assertEqual([(0, 17)], shards)
+
+    def test_fails_on_fixed_shard_with_broken_last_record(self):
+        _, field_names_and_lengths = FixedRowsTest._create_fixed_data_format_and_fields_for_name_and_height()
+        fixed_path = dev_test.path_to_test_result('fails_on_fixed_shard_with_broken_last_record.txt')
+        with io.open(fixed_path, 'w', encoding='ascii', newline='') as fixed_stream:
+            fixed_stream.write('john172\nmary16')
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.DataFormatError, "* (2;5): cannot read field 'size': need 3 characters but found only 2: '16'",
+            list, rowio.fixed_shard_rows(fixed_path, 'ascii', field_names_and_lengths, '\n', 0, 15))
+
     def _fails_on_fixed_rows_from_stringio(self, data_text, expected_error_pattern='*', data_format=None):
         assert (data_format is None) or data_format.is_valid
 
@@ -273,6 +506,58 @@ class FixedRowsTest(_BaseRowsTest):
         self._fails_on_fixed_rows_from_stringio(
             'john', "*after field 'name' 3 characters must follow for: 'size'", data_format)
 
+    def test_can_read_fixed_rows_in_several_blocks(self):
+        original_fixed_block_size = rowio._FIXED_BLOCK_SIZE
+        rowio._FIXED_BLOCK_SIZE = 20
+        try:
+            _, field_names_and_lengths = FixedRowsTest._create_fixed_data_format_and_fields_for_name_and_height()
+            data_text = ''.join('r%03d%03d\n' % (row_index, row_index) for row_index in range(50))
+            with io.StringIO(data_text) as data_io:
+                rows = list(rowio.fixed_rows(data_io, 'ascii', field_names_and_lengths, '\n'))
+            self.assertEqual(50, len(rows))
+            self.assertEqual(['r049', '049'], rows[-1])
+            with io.StringIO(data_text + 'x') as data_io:
+                dev_test.assert_raises_and_fnmatches(
+                    self, errors.DataFormatError, "<io> (51;1): cannot read field 'name': *",
+                    list, rowio.fixed_rows(data_io, 'ascii', field_names_and_lengths, '\n'))
+        finally:
+            rowio._FIXED_BLOCK_SIZE = original_fixed_block_size
+
+    def test_can_read_fixed_rows_with_crlf_line_delimiter_from_path(self):
+        _, field_names_and_lengths = FixedRowsTest._create_fixed_data_format_and_fields_for_name_and_height()
+        fixed_path = dev_test.path_to_test_result('can_read_fixed_rows_with_crlf_line_delimiter_from_path.txt')
+        with io.open(fixed_path, 'w', encoding='ascii', newline='') as fixed_stream:
+            fixed_stream.write('hugo172\r\nsepp163\r\n')
+        rows = list(rowio.fixed_rows(fixed_path, 'ascii', field_names_and_lengths, '\r\n'))
+        self.assertEqual([['hugo', '172'], ['sepp', '163']], rows)
+
+    def test_can_read_mapped_fixed_rows_from_path(self):
+        original_fixed_block_size = rowio._FIXED_BLOCK_SIZE
+        rowio._FIXED_BLOCK_SIZE = 20
+        try:
+            _, field_names_and_lengths = FixedRowsTest._create_fixed_data_format_and_fields_for_name_and_height()
+            fixed_path = dev_test.path_to_test_result('can_read_mapped_fixed_rows_from_path.txt')
+            with io.open(fixed_path, 'w', encoding='cp1252', newline='') as fixed_stream:
+                for row_index in range(20):
+                    fixed_stream.write('%s%03d\n' % (_EURO_SIGN * 4, row_index))
+            rows = list(rowio.fixed_rows(fixed_path, 'cp1252', field_names_and_lengths, '\n'))
+            self.assertEqual(20, len(rows))
+            self.assertEqual([_EURO_SIGN * 4, '019'], rows[-1])
+        finally:
+            rowio._FIXED_BLOCK_SIZE = original_fixed_block_size
+
+    def test_can_read_empty_fixed_rows_from_path(self):
+        _, field_names_and_lengths = FixedRowsTest._create_fixed_data_format_and_fields_for_name_and_height()
+        fixed_path = dev_test.path_to_test_result('can_read_empty_fixed_rows_from_path.txt')
+        with io.open(fixed_path, 'w', encoding='cp1252'):
+            pass
+        self.assertEqual([], list(rowio.fixed_rows(fixed_path, 'cp1252', field_names_and_lengths, '\n')))
+
+    def test_fails_on_fixed_rows_with_broken_line_delimiter_location(self):
+        data_format, _ = FixedRowsTest._create_fixed_data_format_and_fields_for_name_and_height('crlf')
+        self._fails_on_fixed_rows_from_stringio(
+            'hugo172\r\nsepp163\rx', r"<io> (2;8): line delimiter is '\rx' but must be '\r\n'", data_format)
+
     def test_can_read_fixed_rows_without_line_delimiter(self):
         data_format = data.DataFormat(data.FORMAT_FIXED)
         data_format.set_property(data.KEY_LINE_DELIMITER, 'none')
@@ -0,0 +1,247 @@
+"""
+Tests for :py:mod:`cutplace.server`.
+"""
+# Copyright (C) 2009-2015 Thomas Aglassinger
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from six.moves import http_client
+
+from cutplace import server
+from tests import dev_test
+
+_CUSTOMERS_CID_PATH = dev_test.CID_CUSTOMERS_ODS_PATH
+_VALID_CUSTOMERS_CSV_PATH = dev_test.path_to_example('customers.csv')
+_BROKEN_CUSTOMERS_CSV_PATH = dev_test.path_to_test_data('broken_customers.csv')
+
+
+class _UnixHttpConnection(http_client.HTTPConnection):
+    """
+    HTTP connection to a Unix domain socket.
+    """
+    def __init__(self, socket_path):
+        http_client.HTTPConnection.__init__(self, 'localhost')
+        self._socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self._socket_path)
+
+
+def _status_and_json_lines(connection, method, path, body=None):
+    connection.request(method, path, body)
+    response = connection.getresponse()
+    try:
+        json_lines = [json.loads(line.decode('utf-8')) for line in response.read().splitlines()]
+    finally:
+        connection.close()
+    return response.status, json_lines
+
+
+class ParsedAddressTest(unittest.TestCase):
+    def test_can_parse_port(self):
+        self.assertEqual((server.DEFAULT_HOST, 8778), server.parsed_address('8778'))
+
+    def test_can_parse_host_and_port(self):
+        self.assertEqual(('localhost', 8778), server.parsed_address('localhost:8778'))
+
+    def test_can_parse_unix_socket_path(self):
+        self.assertEqual('/tmp/cutplace.sock', server.parsed_address('/tmp/cutplace.sock'))
+
+    def test_fails_on_empty_address(self):
+        self.assertRaises(ValueError, server.parsed_address, '')
+
+    def test_fails_on_too_big_port(self):
+        self.assertRaises(ValueError, server.parsed_address, '65536')
+
+
+class ValidationServerTest(unittest.TestCase):
+    def _start_server(self, address, **keywords):
+        validation_server = server.ValidationServer(address, **keywords)
+        self.addCleanup(validation_server.close)
+        server_thread = threading.Thread(target=validation_server.serve_forever)
+        server_thread.start()
+        self.addCleanup(server_thread.join)
+        self.addCleanup(validation_server.shutdown)
+        return validation_server
+
+    def _start_tcp_server(self, **keywords):
+        validation_server = self._start_server((server.DEFAULT_HOST, 0), **keywords)
+        host, port = validation_server.address
+        return lambda: http_client.HTTPConnection(host, port)
+
+    def test_can_validate_data_files(self):
+        connection_factory = self._start_tcp_server(workers=2, cid_paths=[_CUSTOMERS_CID_PATH])
+        job = {
+            'cid': _CUSTOMERS_CID_PATH,
+            'data': [_VALID_CUSTOMERS_CSV_PATH, _BROKEN_CUSTOMERS_CSV_PATH, 'no_such_data.csv'],
+        }
+        status, results = _status_and_json_lines(connection_factory(), 'POST', '/validate', json.dumps(job))
+        self.assertEqual(200, status)
+        self.assertEqual(job['data'], [result['data'] for result in results])
+        self.assertEqual([True, False, False], [result['valid'] for result in results])
+        self.assertEqual(None, results[0]['error'])
+        self.assertTrue(results[0]['accepted'] >= 1)
+        dev_test.assert_fnmatches(self, results[1]['error'], '*(R3C1): cannot accept field *customer_id*')
+        dev_test.assert_fnmatches(self, results[2]['error'], "cannot read data file *no_such_data.csv*")
+
+    def test_can_validate_single_data_file_with_until(self):
+        connection_factory = self._start_tcp_server(validate_until=1)
+        job = {'cid': _CUSTOMERS_CID_PATH, 'data': _BROKEN_CUSTOMERS_CSV_PATH}
+        _, results = _status_and_json_lines(connection_factory(), 'POST', '/validate', json.dumps(job))
+        self.assertEqual(1, len(results))
+        self.assertTrue(results[0]['valid'])
+
+    def test_can_report_broken_cid(self):
+        connection_factory = self._start_tcp_server()
+        job = {'cid': 'no_such_cid.ods', 'data': _VALID_CUSTOMERS_CSV_PATH}
+        _, results = _status_and_json_lines(connection_factory(), 'POST', '/validate', json.dumps(job))
+        self.assertFalse(results[0]['valid'])
+        dev_test.assert_fnmatches(self, results[0]['error'], "cannot read CID *no_such_cid.ods*")
+
+    def test_can_reread_changed_cid(self):
+        temp_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_folder)
+        cid_path = os.path.join(temp_folder, 'cid_customers.ods')
+        shutil.copy(_CUSTOMERS_CID_PATH, cid_path)
+        connection_factory = self._start_tcp_server(cid_paths=[cid_path])
+        job = json.dumps({'cid': cid_path, 'data': _VALID_CUSTOMERS_CSV_PATH})
+        _, results = _status_and_json_lines(connection_factory(), 'POST', '/validate', job)
+        self.assertTrue(results[0]['valid'])
+
+        with open(cid_path, 'w') as broken_cid_file:
+            broken_cid_file.write('broken')
+        os.utime(cid_path, (0, 0))
+        _, results = _status_and_json_lines(connection_factory(), 'POST', '/validate', job)
+        self.assertFalse(results[0]['valid'])
+
+    def test_can_reread_cid_with_changed_choices(self):
+        temp_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_folder)
+        cid_path = os.path.join(temp_folder, 'cid_colors.csv')
+        with io.open(cid_path, 'w', encoding='utf-8') as cid_file:
+            cid_file.write('d,format,delimited\nf,color,,,,Choice,"@""colors.txt"""\n')
+        choices_path = os.path.join(temp_folder, 'colors.txt')
+        with io.open(choices_path, 'w', encoding='utf-8') as choices_file:
+            choices_file.write('red\n')
+        data_path = os.path.join(temp_folder, 'colors.csv')
+        with io.open(data_path, 'w', encoding='utf-8') as data_file:
+            data_file.write('blue\n')
+        connection_factory = self._start_tcp_server(cid_paths=[cid_path])
+        job = json.dumps({'cid': cid_path, 'data': data_path})
+        _, results = _status_and_json_lines(connection_factory(), 'POST', '/validate', job)
+        self.assertFalse(results[0]['valid'])
+
+        with io.open(choices_path, 'a', encoding='utf-8') as choices_file:
+            choices_file.write('blue\n')
+        os.utime(choices_path, (0, 0))
+        _, results = _status_and_json_lines(connection_factory(), 'POST', '/validate', job)
+        self.assertTrue(results[0]['valid'])
+
+    def test_can_report_status(self):
+        connection_factory = self._start_tcp_server()
+        self.assertEqual((200, [{'status': 'ok'}]), _status_and_json_lines(connection_factory(), 'GET', '/status'))
+
+    def test_fails_on_broken_job(self):
+        connection_factory = self._start_tcp_server()
+        for broken_job in ['[]', '{"cid": 1, "data": "x.csv"}', '{"cid": "x.ods", "data": [1]}', 'broken']:
+            status, results = _status_and_json_lines(connection_factory(), 'POST', '/validate', broken_job)
+            self.assertEqual(400, status)
+            dev_test.assert_fnmatches(self, results[0]['error'], 'cannot process job: *')
+
+    def test_fails_on_unknown_path(self):
+        connection_factory = self._start_tcp_server()
+        self.assertEqual(404, _status_and_json_lines(connection_factory(), 'GET', '/no_such_path')[0])
+        self.assertEqual(404, _status_and_json_lines(connection_factory(), 'POST', '/no_such_path', '{}')[0])
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix domain sockets must be supported')
+    def test_can_validate_using_unix_socket(self):
+        temp_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_folder)
+        socket_path = os.path.join(temp_folder, 'cutplace.sock')
+        validation_server = self._start_server(socket_path)
+        self.assertEqual(socket_path, validation_server.address)
+        job = {'cid': _CUSTOMERS_CID_PATH, 'data': _VALID_CUSTOMERS_CSV_PATH}
+        _, results = _status_and_json_lines(_UnixHttpConnection(socket_path), 'POST', '/validate', json.dumps(job))
+        self.assertTrue(results[0]['valid'])
+        validation_server.shutdown()
+        validation_server.close()
+        self.assertFalse(os.path.exists(socket_path))
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix domain sockets must be supported')
+    def test_can_replace_stale_unix_socket(self):
+        temp_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_folder)
+        socket_path = os.path.join(temp_folder, 'cutplace.sock')
+        # Simulate a crashed server, which leaves its socket behind.
+        crashed_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        crashed_socket.bind(socket_path)
+        crashed_socket.close()
+        self.assertTrue(os.path.exists(socket_path))
+        self._start_server(socket_path)
+        status, _ = _status_and_json_lines(_UnixHttpConnection(socket_path), 'GET', '/status')
+        self.assertEqual(200, status)
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix domain sockets must be supported')
+    def test_fails_on_unix_socket_in_use(self):
+        temp_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_folder)
+        socket_path = os.path.join(temp_folder, 'cutplace.sock')
+        self._start_server(socket_path)
+        self.assertRaises(EnvironmentError, server.ValidationServer, socket_path)
+        status, _ = _status_and_json_lines(_UnixHttpConnection(socket_path), 'GET', '/status')
+        self.assertEqual(200, status)
+
+    def test_can_report_unexpected_error_in_worker(self):
+        previous_worker_options = server._worker_options
+        self.addCleanup(setattr, server, '_worker_options', previous_worker_options)
+        server._worker_options = {}
+        # A CID path of None is not possible with JSON jobs but results in a TypeError.
+        result = server._validation_result((None, _VALID_CUSTOMERS_CSV_PATH))
+        self.assertFalse(result['valid'])
+        dev_test.assert_fnmatches(self, result['error'], 'cannot validate data file *customers.csv*: *')
+
+    def test_can_report_unexpected_error_after_results(self):
+        validation_server = self._start_server((server.DEFAULT_HOST, 0))
+
+        def broken_validation_results(cid_path, data_paths):
+            yield {'cid': cid_path, 'data': data_paths[0], 'valid': True, 'accepted': 0, 'error': None}
+            raise RuntimeError('something is broken')
+
+        validation_server.validation_results = broken_validation_results
+        host, port = validation_server.address
+        job = {'cid': _CUSTOMERS_CID_PATH, 'data': [_VALID_CUSTOMERS_CSV_PATH] * 2}
+        status, results = _status_and_json_lines(
+            http_client.HTTPConnection(host, port), 'POST', '/validate', json.dumps(job))
+        self.assertEqual(200, status)
+        self.assertEqual(2, len(results))
+        self.assertTrue(results[0]['valid'])
+        self.assertEqual({'error': 'cannot process job: something is broken'}, results[1])
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -22,6 +22,7 @@ from __future__ import unicode_literals
 
 import os.path
 import random
+import sys
 import unittest
 
 from cutplace import _tools
@@ -84,6 +85,29 @@ class ToolsTest(unittest.TestCase):
         self.assertEqual(2, _tools.length_of_int(-1))
         self.assertEqual(155, _tools.length_of_int(2 ** 512))
 
+    def test_can_check_module_availability(self):
+        self.assertTrue(_tools.is_module_available('unittest'))
+        self.assertFalse(_tools.is_module_available('no_such_module_for_cutplace'))
+
+
+class LazyModuleTest(unittest.TestCase):
+    def test_can_import_on_first_attribute_access(self):
+        lazy_tests = _tools.LazyModule('tests._ods')
+        had_module_before = 'tests._ods' in sys.modules
+        self.assertTrue(had_module_before or ('not imported yet' in repr(lazy_tests)))
+        self.assertTrue(callable(lazy_tests.main))
+        self.assertTrue('tests._ods' in sys.modules)
+        self.assertTrue(lazy_tests.main is sys.modules['tests._ods'].main)
+        self.assertTrue('not imported yet' not in repr(lazy_tests))
+
+    def test_fails_on_missing_attribute(self):
+        lazy_os = _tools.LazyModule('os')
+        self.assertRaises(AttributeError, getattr, lazy_os, 'no_such_attribute')
+
+    def test_fails_on_missing_module_only_when_used(self):
+        lazy_missing = _tools.LazyModule('no_such_module_for_cutplace')
+        self.assertRaises(ImportError, getattr, lazy_missing, 'anything')
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -20,9 +20,13 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import fnmatch
 import io
+import os
 import unittest
 
+import six
+
 from cutplace import interface
 from cutplace import errors
 from cutplace import validio
@@ -193,6 +197,334 @@ class ReaderTest(unittest.TestCase):
                         "* (R3C1): cannot accept field 'digit': value must be an integer number: 'a'")
 
 
+class ValidationPlanTest(unittest.TestCase):
+    def setUp(self):
+        self._plan = validio.ValidationPlan(_DIGIT_CID)
+        self._location = errors.Location('test', has_cell=True)
+
+    def test_can_validate_row(self):
+        self._plan.validate_row(['1'], self._location)
+
+    def test_fails_on_broken_field(self):
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.FieldValueError, "test (R1C1): cannot accept field 'digit': *",
+            self._plan.validate_row, ['a'], self._location)
+        self.assertEqual(0, self._location.cell)
+
+    def test_fails_on_wrong_item_count(self):
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.DataError, "*row must contain 1 fields but has 2, additional values are: *",
+            self._plan.validate_row, ['1', '2'], self._location)
+
+    def test_can_validate_batch(self):
+        self.assertEqual([None, None], self._plan.validate_batch([['1'], ['2']], self._location))
+
+    def test_can_validate_broken_batch(self):
+        self._location.advance_line(10)
+        field_errors = self._plan.validate_batch([['1'], ['a'], ['2', '3'], [4]], self._location)
+        self.assertIsNone(field_errors[0])
+        for field_error, expected_message_pattern in zip(field_errors[1:], [
+                "test (R12C1): cannot accept field 'digit': *",
+                "test (R13C1): row must contain 1 fields but has 2*",
+                "test (R14C1): cannot accept field 'digit': type must be * instead of int: 4"]):
+            actual_message = six.text_type(field_error)
+            self.assertTrue(
+                fnmatch.fnmatch(actual_message, expected_message_pattern),
+                'actual_message=%r, expected_message_pattern=%r' % (actual_message, expected_message_pattern))
+        self.assertEqual(10, self._location.line)
+
+    def test_can_validate_batch_with_native_values(self):
+        native_rows, field_errors = self._plan.validated_batch([['1'], ['2']], self._location)
+        self.assertEqual([(1,), (2,)], native_rows)
+        self.assertEqual([None, None], field_errors)
+
+    def test_can_validate_broken_batch_with_native_values(self):
+        native_rows, field_errors = self._plan.validated_batch([['1'], ['a']], self._location)
+        self.assertEqual([(1,), None], native_rows)
+        self.assertIsNone(field_errors[0])
+        self.assertTrue(isinstance(field_errors[1], errors.FieldValueError))
+
+    def test_can_use_validation_caches(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,digit,,,1,Integer',
+            'f,letter,,,1',
+        ]))
+        cid.field_formats[0].validation_cache_size = 10
+        self.assertEqual([], validio.ValidationPlan(cid).field_names_and_validation_caches[1:])
+        plan = validio.ValidationPlan(cid, validation_cache_size=20)
+        (digit_name, digit_cache), (letter_name, letter_cache) = plan.field_names_and_validation_caches
+        self.assertEqual(('digit', 10, False), (digit_name, digit_cache.size, digit_cache.is_adaptive))
+        self.assertEqual(('letter', 20, True), (letter_name, letter_cache.size, letter_cache.is_adaptive))
+        for _ in range(3):
+            plan.validate_row(['1', 'a'], self._location)
+            dev_test.assert_raises_and_fnmatches(
+                self, errors.FieldValueError, "test (R1C1): cannot accept field 'digit': *",
+                plan.validate_row, ['x', 'a'], self._location)
+        self.assertEqual(4, digit_cache.hit_count)
+        self.assertEqual(2, letter_cache.hit_count)
+
+
+class RowBatchesTest(unittest.TestCase):
+    def setUp(self):
+        self._cid = interface.Cid(dev_test.CID_CUSTOMERS_ODS_PATH)
+
+    def _rows_and_error_texts(self, rows_or_errors):
+        return [
+            six.text_type(row_or_error) if isinstance(row_or_error, errors.DataError) else row_or_error
+            for row_or_error in rows_or_errors]
+
+    def test_can_read_same_rows_in_batches(self):
+        broken_path = dev_test.path_to_test_data('broken_customers.csv')
+        with validio.Reader(self._cid, broken_path, on_error='yield') as reader:
+            expected_rows_and_errors = self._rows_and_error_texts(reader.rows())
+        for size in (1, 3, 100):
+            with validio.Reader(self._cid, broken_path, on_error='yield') as reader:
+                batches = list(reader.row_batches(size))
+            self.assertTrue(all(len(batch) == size for batch in batches[:-1]))
+            actual_rows_and_errors = self._rows_and_error_texts(
+                row_or_error for batch in batches for row_or_error in batch)
+            self.assertEqual(expected_rows_and_errors, actual_rows_and_errors)
+
+    def test_can_validate_until_in_batches(self):
+        digits_cid = interface.create_cid_from_string('\n'.join([_DIGIT_CID_TEXT, 'd,header,1']))
+        digits_stream = io.StringIO('\n'.join(['digit', '1', '2', 'x', 'y']))
+        with validio.Reader(digits_cid, digits_stream, on_error='yield', validate_until=4) as reader:
+            rows_and_errors = self._rows_and_error_texts(
+                row_or_error for batch in reader.row_batches(2) for row_or_error in batch)
+        self.assertEqual(['1'], rows_and_errors[0])
+        self.assertEqual(
+            "<io> (R4C1): cannot accept field 'digit': value must be an integer number: 'x'", rows_and_errors[2])
+        self.assertEqual(['y'], rows_and_errors[3])
+
+    def test_fails_on_broken_row_after_producing_previous_rows(self):
+        digits_stream = io.StringIO('\n'.join(['1', '2', 'x', '3']))
+        rows = []
+        with validio.Reader(_DIGIT_CID, digits_stream) as reader:
+            try:
+                for batch in reader.row_batches(3):
+                    rows.extend(batch)
+                self.fail('FieldValueError expected')
+            except errors.FieldValueError as anticipated_error:
+                self.assertEqual(
+                    "<io> (R3C1): cannot accept field 'digit': value must be an integer number: 'x'",
+                    six.text_type(anticipated_error))
+        self.assertEqual([['1'], ['2']], rows)
+
+    def test_can_report_broken_field_before_later_broken_data_format(self):
+        cid = interface.create_cid_from_string('d,format,delimited\nf,id,,,,Integer\nf,name')
+        data_text = '1,a\nx,b\n3,c\n4,"unterminated\n'
+        with io.StringIO(data_text) as partially_broken_data:
+            with validio.Reader(cid, partially_broken_data) as reader:
+                dev_test.assert_raises_and_fnmatches(
+                    self, errors.FieldValueError, "<io> (R2C1): cannot accept field 'id': *", reader.validate_rows)
+        rows_and_errors = []
+        with io.StringIO(data_text) as partially_broken_data:
+            with validio.Reader(cid, partially_broken_data, on_error='yield') as reader:
+                try:
+                    for batch in reader.row_batches():
+                        rows_and_errors.extend(batch)
+                    self.fail('DataFormatError expected')
+                except errors.DataFormatError:
+                    pass
+        rows_and_errors = self._rows_and_error_texts(rows_and_errors)
+        self.assertEqual(3, len(rows_and_errors))
+        self.assertEqual(['1', 'a'], rows_and_errors[0])
+        dev_test.assert_fnmatches(self, rows_and_errors[1], "<io> (R2C1): cannot accept field 'id': *")
+        self.assertEqual(['3', 'c'], rows_and_errors[2])
+
+
+class NativeRowsTest(unittest.TestCase):
+    def setUp(self):
+        self._cid = interface.Cid(dev_test.CID_CUSTOMERS_ODS_PATH)
+
+    def test_can_read_native_rows(self):
+        digits_stream = io.StringIO('\n'.join(['1', '2']))
+        with validio.Reader(_DIGIT_CID, digits_stream) as reader:
+            native_rows = list(reader.native_rows())
+        self.assertEqual([(1,), (2,)], native_rows)
+        self.assertEqual(1, native_rows[0].digit)
+
+    def test_can_read_same_native_rows_in_batches(self):
+        field_formats = self._cid.field_formats
+        with validio.Reader(self._cid, dev_test.CUSTOMERS_CSV_PATH) as reader:
+            expected_native_rows = [
+                tuple(field_format.validated(value) for field_format, value in zip(field_formats, row))
+                for row in reader.rows()]
+        for batch_size in (1, 3, 100):
+            with validio.Reader(self._cid, dev_test.CUSTOMERS_CSV_PATH) as reader:
+                native_rows = list(reader.native_rows(batch_size))
+            self.assertEqual(expected_native_rows, [tuple(native_row) for native_row in native_rows])
+            self.assertEqual(list(self._cid.field_names), list(reader.row_type._fields))
+
+    def test_can_yield_errors_instead_of_native_rows(self):
+        digits_stream = io.StringIO('\n'.join(['1', 'x', '3']))
+        with validio.Reader(_DIGIT_CID, digits_stream, on_error='yield') as reader:
+            native_rows_and_errors = list(reader.native_rows(2))
+        self.assertEqual((1,), native_rows_and_errors[0])
+        self.assertTrue(isinstance(native_rows_and_errors[1], errors.FieldValueError))
+        self.assertEqual((3,), native_rows_and_errors[2])
+
+    def test_can_skip_header_in_native_rows(self):
+        digits_cid = interface.create_cid_from_string('\n'.join([_DIGIT_CID_TEXT, 'd,header,1']))
+        digits_stream = io.StringIO('\n'.join(['digit', '1']))
+        with validio.Reader(digits_cid, digits_stream) as reader:
+            self.assertEqual([(1,)], list(reader.native_rows()))
+
+
+class ParallelReaderTest(unittest.TestCase):
+    def setUp(self):
+        self._original_shard_size = validio._SHARD_SIZE
+        # Use tiny shards so even small test data end up in several of them.
+        validio._SHARD_SIZE = 64
+        self._cid = interface.Cid(dev_test.CID_CUSTOMERS_XLS_PATH)
+
+    def tearDown(self):
+        validio._SHARD_SIZE = self._original_shard_size
+
+    def _write_digits(self, text):
+        result = dev_test.path_to_test_result('test_parallel_reader_digits.csv')
+        with io.open(result, 'w', encoding='ascii', newline='') as digits_stream:
+            digits_stream.write(text)
+        return result
+
+    def test_can_read_same_rows_as_single_worker(self):
+        customers_path = dev_test.path_to_test_data('lots_of_customers.csv')
+        expected_rows = list(validio.rows(self._cid, customers_path))
+        actual_rows = list(validio.rows(self._cid, customers_path, workers=2))
+        self.assertEqual(expected_rows, actual_rows)
+
+    def test_can_read_same_fixed_rows_as_single_worker(self):
+        fixed_cid = interface.create_cid_from_string('\n'.join([
+            'd,format,fixed',
+            'd,line_delimiter,lf',
+            'f,digit,,,1,Integer',
+            'f,letter,,,1',
+        ]))
+        fixed_path = dev_test.path_to_test_result('can_read_same_fixed_rows_as_single_worker.txt')
+        with io.open(fixed_path, 'w', encoding='ascii', newline='') as fixed_stream:
+            for row_index in range(100):
+                fixed_stream.write('%da\n' % (row_index % 10))
+        expected_rows = list(validio.rows(fixed_cid, fixed_path))
+        actual_rows = list(validio.rows(fixed_cid, fixed_path, workers=2))
+        self.assertEqual(expected_rows, actual_rows)
+
+    def test_fails_on_duplicates_in_different_shards(self):
+        duplicates_path = dev_test.path_to_test_data('broken_customers_with_duplicates.csv')
+        with validio.Reader(self._cid, duplicates_path, workers=2) as reader:
+            self.assertRaises(errors.CheckError, reader.validate_rows)
+
+    def test_fails_on_broken_field_with_proper_location(self):
+        digits_path = self._write_digits('\n'.join(['1'] * 100 + ['x'] + ['1'] * 100))
+        dev_test.assert_raises_and_fnmatches(
+            self, errors.FieldValueError, "* (R101C1): cannot accept field 'digit': *",
+            validio.validate, _DIGIT_CID, digits_path, None, 2)
+
+    def test_can_yield_errors_in_proper_order(self):
+        digits_path = self._write_digits('\n'.join(['1', 'x'] * 100))
+        with validio.Reader(_DIGIT_CID, digits_path, on_error='yield', workers=3) as reader:
+            rows_and_errors = list(reader.rows())
+        self.assertEqual(200, len(rows_and_errors))
+        for row_index, row_or_error in enumerate(rows_and_errors):
+            if row_index % 2 == 0:
+                self.assertEqual(['1'], row_or_error)
+            else:
+                self.assertTrue(isinstance(row_or_error, errors.FieldValueError))
+                self.assertEqual(row_index, row_or_error.location.line)
+        self.assertEqual(100, reader.accepted_rows_count)
+        self.assertEqual(100, reader.rejected_rows_count)
+
+    def test_can_read_same_native_rows_as_single_worker(self):
+        customers_path = dev_test.path_to_test_data('lots_of_customers.csv')
+        with validio.Reader(self._cid, customers_path) as reader:
+            expected_native_rows = list(reader.native_rows())
+        with validio.Reader(self._cid, customers_path, workers=2) as reader:
+            actual_native_rows = list(reader.native_rows())
+        self.assertEqual(expected_native_rows, actual_native_rows)
+
+    def test_can_read_same_rows_with_validation_cache(self):
+        customers_path = dev_test.path_to_test_data('lots_of_customers.csv')
+        expected_rows = list(validio.rows(self._cid, customers_path))
+        actual_rows = list(validio.rows(self._cid, customers_path, workers=2, validation_cache_size=10))
+        self.assertEqual(expected_rows, actual_rows)
+
+    def test_fails_on_broken_data_format_with_proper_location(self):
+        digits_path = self._write_digits('\n'.join(['1'] * 100 + ['"1']))
+        error_messages = []
+        for workers in (1, 2):
+            try:
+                validio.validate(_DIGIT_CID, digits_path, workers=workers)
+                self.fail('DataFormatError expected')
+            except errors.DataFormatError as anticipated_error:
+                error_messages.append(str(anticipated_error))
+        self.assertEqual(error_messages[0], error_messages[1])
+
+
+class ValidationStatisticsTest(unittest.TestCase):
+    def test_can_count_rejected_rows(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,id,,,,Integer',
+            'f,name',
+            'c,unique id,IsUnique,id',
+        ]))
+        with io.StringIO('1,a\nx,b\n1,c\n2\n3,d\n') as partially_broken_data:
+            with validio.Reader(cid, partially_broken_data, on_error='continue') as reader:
+                self.assertEqual(2, len(list(reader.rows())))
+        statistics = reader.statistics
+        self.assertEqual(2, statistics.accepted_rows_count)
+        self.assertEqual(3, statistics.rejected_rows_count)
+        self.assertEqual({'id': 1}, statistics.field_name_to_rejected_rows_count_map)
+        self.assertEqual({'unique id': 1}, statistics.check_name_to_rejected_rows_count_map)
+        self.assertEqual(1, statistics.other_rejected_rows_count)
+        self.assertIsNone(statistics.bytes_read)
+        self.assertEqual(0.0, sum(statistics.phase_to_wall_time_map.values()))
+
+    def test_can_count_same_rejected_rows_as_reader(self):
+        cid = interface.create_cid_from_string('\n'.join([
+            'd,format,delimited',
+            'f,id,,,,Integer',
+        ]))
+        for on_error, expected_rejected_rows_count in (('raise', 1), ('yield', 2), ('continue', 2)):
+            for use_row_batches in (False, True):
+                with io.StringIO('1\nx\n2\ny\n') as partially_broken_data:
+                    with validio.Reader(cid, partially_broken_data, on_error=on_error) as reader:
+                        try:
+                            if use_row_batches:
+                                for _ in reader.row_batches():
+                                    pass
+                            else:
+                                for _ in reader.rows():
+                                    pass
+                        except errors.FieldValueError:
+                            self.assertEqual('raise', on_error)
+                    statistics = reader.statistics
+                    description = 'on_error=%r, use_row_batches=%r' % (on_error, use_row_batches)
+                    self.assertEqual(expected_rejected_rows_count, reader.rejected_rows_count, description)
+                    self.assertEqual(reader.rejected_rows_count, statistics.rejected_rows_count, description)
+                    self.assertEqual(reader.rejected_rows_count, statistics.as_dict()['rejected_rows'], description)
+                    self.assertEqual({'id': expected_rejected_rows_count}, statistics.field_name_to_rejected_rows_count_map)
+
+    def test_can_collect_phase_times(self):
+        for use_row_batches in (False, True):
+            with validio.Reader(
+                    dev_test.CID_CUSTOMERS_ODS_PATH, dev_test.CUSTOMERS_CSV_PATH, collect_statistics=True) as reader:
+                if use_row_batches:
+                    reader.validate_rows()
+                else:
+                    for _ in reader.rows():
+                        pass
+            statistics_map = reader.statistics.as_dict()
+            self.assertTrue(statistics_map['accepted_rows'] >= 1)
+            self.assertEqual(0, statistics_map['rejected_rows'])
+            self.assertEqual(os.path.getsize(dev_test.CUSTOMERS_CSV_PATH), statistics_map['bytes_read'])
+            self.assertEqual(set(validio.PHASES), set(statistics_map['phases'].keys()))
+            for phase in (validio.PHASE_CID, validio.PHASE_READ, validio.PHASE_FIELDS):
+                self.assertTrue(statistics_map['phases'][phase]['wall_time'] > 0, 'phase=%r' % phase)
+            self.assertTrue(statistics_map['wall_time'] >= statistics_map['phases'][validio.PHASE_READ]['wall_time'])
+            self.assertTrue(statistics_map['rows_per_second'] > 0)
+
+
 class WriterTest(unittest.TestCase):
     def setUp(self):
         standard_delimited_cid_text = '\n'.join([